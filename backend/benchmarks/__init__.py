@@ -0,0 +1 @@
+"""Load-test and benchmark tooling (not part of the deployed app)"""
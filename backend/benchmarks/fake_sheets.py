@@ -0,0 +1,220 @@
+"""
+In-Memory Google Sheets Emulator
+Implements the subset of the gspread Spreadsheet/Worksheet API that
+SheetsService uses (including values_batch_get), with blocking per-call latency (gspread is synchronous)
+and per-minute read/write quotas that fail with a 429 APIError like Google does.
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+import gspread
+import requests
+from gspread.utils import a1_range_to_grid_range
+
+from services.sheets_service import SheetsService
+
+
+class SheetsQuota:
+    """Sliding one-minute request quota, shared by every worksheet of a spreadsheet"""
+
+    def __init__(self, limit_per_minute: int):
+        self.limit = limit_per_minute
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def acquire(self, kind: str):
+        if not self.limit:
+            return
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.limit:
+                self.rejected += 1
+                raise _quota_error(kind)
+            self._calls.append(now)
+
+
+def _api_error(code: int, status: str, message: str) -> gspread.exceptions.APIError:
+    """Build an APIError the way gspread does from an HTTP error response"""
+    response = requests.Response()
+    response.status_code = code
+    response._content = json.dumps({"error": {"code": code, "status": status, "message": message}}).encode()
+    return gspread.exceptions.APIError(response)
+
+
+def _quota_error(kind: str) -> gspread.exceptions.APIError:
+    return _api_error(429, "RESOURCE_EXHAUSTED", f"Quota exceeded for quota metric '{kind} requests' per minute")
+
+
+class FakeSpreadsheet:
+    """Stand-in for gspread.Spreadsheet"""
+
+    def __init__(self, latency_ms: float = 120, jitter_ms: float = 40,
+                 read_quota_per_minute: int = 300, write_quota_per_minute: int = 300):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.read_quota = SheetsQuota(read_quota_per_minute)
+        self.write_quota = SheetsQuota(write_quota_per_minute)
+        self.calls: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._worksheets: Dict[str, FakeWorksheet] = {}
+
+    def _call(self, method: str, kind: str):
+        """Count, rate limit and delay one API call"""
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        (self.read_quota if kind == "read" else self.write_quota).acquire(kind)
+        delay_ms = max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms))
+        time.sleep(delay_ms / 1000)
+
+    def worksheets(self) -> List["FakeWorksheet"]:
+        self._call("worksheets", "read")
+        return list(self._worksheets.values())
+
+    def worksheet(self, title: str) -> "FakeWorksheet":
+        self._call("worksheet", "read")
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26) -> "FakeWorksheet":
+        self._call("add_worksheet", "write")
+        with self._lock:
+            if title in self._worksheets:
+                raise _api_error(400, "INVALID_ARGUMENT", f'A sheet with the name "{title}" already exists.')
+            worksheet = FakeWorksheet(self, title, next(self._ids))
+            self._worksheets[title] = worksheet
+        return worksheet
+
+    def values_batch_get(self, ranges: List[str], params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """values:batchGet for whole-sheet ("'Title'") or A1 ("'Title'!A1:D100") ranges, one API call for all"""
+        self._call("values_batch_get", "read")
+        value_ranges = []
+        for range_name in ranges:
+            title, _, cells = range_name.partition("!")
+            if title.startswith("'") and title.endswith("'"):
+                title = title[1:-1].replace("''", "'")
+            if title not in self._worksheets:
+                raise _api_error(400, "INVALID_ARGUMENT", f"Unable to parse range: {range_name}")
+            value_range = {"range": range_name, "majorDimension": "ROWS"}
+            values = self._worksheets[title].values(a1_range_to_grid_range(cells) if cells else None)
+            if values:
+                value_range["values"] = values
+            value_ranges.append(value_range)
+        return {"spreadsheetId": "fake", "valueRanges": value_ranges}
+
+    def seed(self, title: str, rows: List[List[Any]]) -> "FakeWorksheet":
+        """Create a worksheet with initial rows, without latency or quota"""
+        worksheet = FakeWorksheet(self, title, next(self._ids))
+        worksheet.rows = [[str(cell) for cell in row] for row in rows]
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+class FakeWorksheet:
+    """Stand-in for gspread.Worksheet; values are stored as strings like the real API returns them"""
+
+    def __init__(self, spreadsheet: FakeSpreadsheet, title: str, sheet_id: int):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def append_row(self, values: List[Any], **kwargs):
+        self.spreadsheet._call("append_row", "write")
+        with self._lock:
+            self.rows.append(["" if value is None else str(value) for value in values])
+        return {"updates": {"updatedRows": 1}}
+
+    def append_rows(self, values: List[List[Any]], **kwargs):
+        self.spreadsheet._call("append_rows", "write")
+        with self._lock:
+            self.rows.extend(["" if value is None else str(value) for value in row] for row in values)
+        return {"updates": {"updatedRows": len(values)}}
+
+    def values(self, grid: Dict[str, int] = None) -> List[List[str]]:
+        """Rows (optionally a grid range of them) as the values API returns them:
+        trailing empty cells and rows trimmed (no latency)"""
+        grid = grid or {}
+        columns = slice(grid.get("startColumnIndex", 0), grid.get("endColumnIndex"))
+        with self._lock:
+            rows = [row[columns] for row in self.rows[grid.get("startRowIndex", 0):grid.get("endRowIndex")]]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def get_all_values(self, **kwargs) -> List[List[str]]:
+        self.spreadsheet._call("get_all_values", "read")
+        with self._lock:
+            width = max((len(row) for row in self.rows), default=0)
+            return [row + [""] * (width - len(row)) for row in self.rows]
+
+    def get_all_records(self, **kwargs) -> List[Dict[str, Any]]:
+        self.spreadsheet._call("get_all_records", "read")
+        with self._lock:
+            if not self.rows:
+                return []
+            headers = self.rows[0]
+            return [
+                {header: _numericise(row[i]) if i < len(row) else "" for i, header in enumerate(headers)}
+                for row in self.rows[1:]
+            ]
+
+    def col_values(self, col: int, **kwargs) -> List[str]:
+        self.spreadsheet._call("col_values", "read")
+        with self._lock:
+            values = [row[col - 1] if len(row) >= col else "" for row in self.rows]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def clear(self):
+        self.spreadsheet._call("clear", "write")
+        with self._lock:
+            self.rows = []
+
+
+def _numericise(value: str):
+    """Mirror gspread's default numericise() for get_all_records"""
+    if value == "":
+        return ""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def build_fake_spreadsheet(**options) -> FakeSpreadsheet:
+    """A spreadsheet seeded with the worksheets the app expects on a fresh deployment"""
+    spreadsheet = FakeSpreadsheet(**options)
+
+    spreadsheet.seed("User_Profiles", [["UserID", "Name", "Email", "Age", "Experience", "Phone", "Consent", "Timestamp"]])
+
+    fixed_questions = SheetsService()._get_mock_likert_questions()
+    spreadsheet.seed("Fixed_Questions", [["QuestionID", "LeftStatement", "RightStatement", "Theme"]] + [
+        [q["QuestionID"], q["LeftStatement"], q["RightStatement"], q["Theme"]] for q in fixed_questions
+    ])
+
+    spreadsheet.seed("User_Response_Initial", [["UserId", "QuestionID", "Response", "Timestamp"]])
+    spreadsheet.seed("Final_Results", [])
+    return spreadsheet
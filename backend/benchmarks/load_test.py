@@ -0,0 +1,287 @@
+"""
+End-to-End Load Test
+Runs N concurrent candidates through the full assessment journey against the
+FastAPI app in-process, with Google Sheets replaced by an in-memory emulator
+and OpenRouter by a local mock server, then reports throughput and
+p50/p95/p99 latency per endpoint.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --candidates 20
+    python -m benchmarks.load_test --candidates 50 --llm-latency-ms 1500 --sheets-latency-ms 200 --json
+    python -m benchmarks.load_test --candidates 5 --cold-follow-up
+
+--cold-follow-up drops each candidate's in-memory rankings before the round 1
+questions, as if the request landed on another gunicorn worker (or after a
+restart), so the rankings have to be rebuilt from the stored initial responses.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+import main
+from .fake_sheets import build_fake_spreadsheet
+from .mock_openrouter import MockOpenRouter
+
+
+class LatencyRecorder:
+    """Collects per-endpoint request latencies and status codes"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float, status_code: int):
+        self.samples.setdefault(endpoint, []).append(seconds)
+        if status_code >= 400 and status_code != 404:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def report(self, wall_seconds: float) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for endpoint, samples in self.samples.items():
+            ordered = sorted(samples)
+            report[endpoint] = {
+                "count": len(ordered),
+                "errors": self.errors.get(endpoint, 0),
+                "rps": len(ordered) / wall_seconds if wall_seconds else 0.0,
+                "p50_ms": _percentile(ordered, 50) * 1000,
+                "p95_ms": _percentile(ordered, 95) * 1000,
+                "p99_ms": _percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000
+            }
+        return report
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+async def _request(client: httpx.AsyncClient, recorder: LatencyRecorder, endpoint: str,
+                   method: str, url: str, **kwargs) -> httpx.Response:
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    recorder.record(endpoint, time.perf_counter() - started, response.status_code)
+    return response
+
+
+async def _job_request(client: httpx.AsyncClient, recorder: LatencyRecorder, endpoint: str,
+                       method: str, url: str, **kwargs) -> Tuple[int, Any]:
+    """Submit with "Prefer: respond-async" and long-poll the job, like the frontend does.
+    Records the time to accept (202) and the end-to-end time until the result is available."""
+    started = time.perf_counter()
+    response = await client.request(method, url, headers={"Prefer": "respond-async"}, **kwargs)
+    recorder.record(f"{endpoint} (accept)", time.perf_counter() - started, response.status_code)
+
+    if response.status_code != 202:
+        status_code = response.status_code
+        result = response.json() if response.is_success else None
+    else:
+        job = response.json()
+        while job["status"] in ("queued", "running"):
+            job = (await client.get(f"/api/jobs/{job['jobId']}", params={"wait": 20})).json()
+        status_code = 200 if job["status"] == "succeeded" else 500
+        result = job.get("result")
+
+    recorder.record(endpoint, time.perf_counter() - started, status_code)
+    return status_code, result
+
+
+async def run_candidate(client: httpx.AsyncClient, recorder: LatencyRecorder, index: int,
+                        cold_follow_up: bool = False):
+    """One candidate's full journey, mirroring the frontend's call sequence"""
+    def now():
+        return datetime.now().isoformat()
+
+    response = await _request(client, recorder, "POST /api/users", "POST", "/api/users", json={
+        "name": f"Load Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "age": 30,
+        "experience": 5,
+        "phone": "5550100100",
+        "consent": True
+    })
+    response.raise_for_status()
+    user_id = response.json()["userId"]
+
+    response = await _request(client, recorder, "GET /api/questions/fixed", "GET", "/api/questions/fixed")
+    questions = response.json()
+
+    await _job_request(client, recorder, "POST /api/responses/initial", "POST", "/api/responses/initial", json={
+        "userId": user_id,
+        "responses": [
+            {"questionId": q["QuestionID"], "response": random.randint(1, 5), "timestamp": now()}
+            for q in questions
+        ]
+    })
+    await _job_request(client, recorder, "GET /api/summary/initial/{user_id}", "GET", f"/api/summary/initial/{user_id}")
+
+    for round_num in (1, 2):
+        if cold_follow_up and round_num == 1:
+            main.assessment_service.user_trait_rankings.pop(user_id, None)
+        status_code, follow_up_questions = await _job_request(
+            client, recorder, f"POST /api/questions/follow-up/{round_num}",
+            "POST", f"/api/questions/follow-up/{round_num}", json={"userId": user_id}
+        )
+        if status_code != 200:
+            if cold_follow_up and round_num == 1:
+                raise RuntimeError(f"round 1 questions failed ({status_code}) without in-memory rankings")
+            follow_up_questions = []
+
+        if round_num == 1:
+            responses = [
+                {"questionId": q.get("QuestionID", ""), "firstChoice": "A", "secondChoice": random.choice("BCD"),
+                 "timestamp": now()}
+                for q in follow_up_questions
+            ]
+        else:
+            responses = [
+                {"questionId": q.get("QuestionID", ""), "timestamp": now(),
+                 "response": "I stepped in, mapped out the options and agreed next steps with the team."}
+                for q in follow_up_questions
+            ]
+
+        await _job_request(
+            client, recorder, f"POST /api/responses/follow-up/{round_num}",
+            "POST", f"/api/responses/follow-up/{round_num}", json={"userId": user_id, "responses": responses}
+        )
+        await _job_request(
+            client, recorder, "GET /api/summary/follow-up/{user_id}/{round}",
+            "GET", f"/api/summary/follow-up/{user_id}/{round_num}"
+        )
+
+    response = await _request(client, recorder, "GET /api/report/{user_id}", "GET", f"/api/report/{user_id}")
+    etag = response.headers.get("etag")
+    if etag:
+        await _request(client, recorder, "GET /api/report/{user_id} (If-None-Match)", "GET",
+                       f"/api/report/{user_id}", headers={"If-None-Match": etag})
+
+
+async def run_load_test(candidates: int, concurrency: int, sheets_options: Dict[str, Any],
+                        llm_options: Dict[str, Any], cold_follow_up: bool = False) -> Dict[str, Any]:
+    """Run the journey for every candidate with at most `concurrency` in flight"""
+    mock_llm = MockOpenRouter(**llm_options).start()
+    spreadsheet = build_fake_spreadsheet(**sheets_options)
+    recorder = LatencyRecorder()
+    failures = []
+
+    try:
+        async with main.lifespan(main.app):
+            # Swap in the stand-ins before the background warm-up task first runs
+            main.sheets_service.spreadsheet = spreadsheet
+            main.ai_service.api_key = "load-test"
+            main.ai_service.base_url = mock_llm.url
+
+            transport = httpx.ASGITransport(app=main.app)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=600) as client:
+                async def candidate(index: int):
+                    async with semaphore:
+                        try:
+                            await run_candidate(client, recorder, index, cold_follow_up)
+                        except Exception as e:
+                            failures.append(f"candidate {index}: {type(e).__name__}: {e}")
+
+                started = time.perf_counter()
+                await asyncio.gather(*(candidate(i) for i in range(candidates)))
+                wall_seconds = time.perf_counter() - started
+    finally:
+        mock_llm.stop()
+
+    return {
+        "candidates": candidates,
+        "concurrency": concurrency,
+        "wall_seconds": wall_seconds,
+        "journeys_per_minute": (candidates - len(failures)) / wall_seconds * 60 if wall_seconds else 0.0,
+        "failed_journeys": failures,
+        "endpoints": recorder.report(wall_seconds),
+        "sheets": {
+            "calls": dict(spreadsheet.calls),
+            "total_calls": spreadsheet.total_calls,
+            "quota_rejections": spreadsheet.read_quota.rejected + spreadsheet.write_quota.rejected
+        },
+        "llm": {
+            "requests": mock_llm.requests,
+            "prompt_tokens": mock_llm.prompt_tokens,
+            "completion_tokens": mock_llm.completion_tokens,
+            "peak_concurrency": mock_llm.peak_active,
+            "throttled": mock_llm.throttled
+        }
+    }
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\n{result['candidates']} candidates, concurrency {result['concurrency']}: "
+          f"{result['wall_seconds']:.1f}s wall, {result['journeys_per_minute']:.1f} journeys/min")
+    print(f"{'endpoint':<56} {'n':>5} {'err':>4} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in result["endpoints"].items():
+        print(f"{endpoint:<56} {stats['count']:>5} {stats['errors']:>4} {stats['rps']:>7.2f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+    sheets = result["sheets"]
+    llm = result["llm"]
+    print(f"\nSheets API calls: {sheets['total_calls']} ({sheets['quota_rejections']} rejected by quota) {sheets['calls']}")
+    print(f"LLM requests: {llm['requests']}, prompt tokens: {llm['prompt_tokens']}, "
+          f"completion tokens: {llm['completion_tokens']}, peak concurrency: {llm['peak_concurrency']}, "
+          f"throttled (429): {llm['throttled']}")
+    for failure in result["failed_journeys"]:
+        print(f"FAILED {failure}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="End-to-end load test with local Sheets and OpenRouter stand-ins")
+    parser.add_argument("--candidates", type=int, default=10, help="number of candidate journeys")
+    parser.add_argument("--concurrency", type=int, default=None, help="journeys in flight (default: all)")
+    parser.add_argument("--sheets-latency-ms", type=float, default=120)
+    parser.add_argument("--sheets-jitter-ms", type=float, default=40)
+    parser.add_argument("--sheets-read-quota", type=int, default=300, help="read requests per minute (0 = unlimited)")
+    parser.add_argument("--sheets-write-quota", type=int, default=300, help="write requests per minute (0 = unlimited)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=80)
+    parser.add_argument("--llm-max-output-tokens", type=int, default=None, help="truncate completions (finish_reason=length)")
+    parser.add_argument("--llm-capacity", type=int, default=None, help="concurrent LLM requests before the mock answers 429")
+    parser.add_argument("--cold-follow-up", action="store_true",
+                        help="drop in-memory rankings before round 1 questions (another worker / a restart)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    result = asyncio.run(run_load_test(
+        candidates=args.candidates,
+        concurrency=args.concurrency or args.candidates,
+        sheets_options={
+            "latency_ms": args.sheets_latency_ms,
+            "jitter_ms": args.sheets_jitter_ms,
+            "read_quota_per_minute": args.sheets_read_quota,
+            "write_quota_per_minute": args.sheets_write_quota
+        },
+        llm_options={
+            "latency_ms": args.llm_latency_ms,
+            "tokens_per_second": args.llm_tokens_per_second,
+            "max_output_tokens": args.llm_max_output_tokens,
+            "capacity": args.llm_capacity
+        },
+        cold_follow_up=args.cold_follow_up
+    ))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main_cli()
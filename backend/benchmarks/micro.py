@@ -0,0 +1,301 @@
+"""
+Micro-Benchmarks for CPU Hot Paths
+Times the pure-CPU scoring, parsing, normalization and serialization paths
+against LLM-output fixtures and gates on stored baselines.
+
+Timings are normalised by a fixed pure-Python calibration workload, so
+baselines recorded on one machine remain comparable on another.
+
+Usage (from backend/):
+    python -m benchmarks.micro                  # run and print
+    python -m benchmarks.micro --check          # exit 1 if any benchmark regressed
+    python -m benchmarks.micro --update         # re-record baselines.json
+    python -m benchmarks.micro -k parse         # only benchmarks whose name contains "parse"
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from services.ai_prompts_service import get_all_strengths, validate_strength_profile
+from services.assessment_service import AssessmentService
+from services.nvidia_ai_service import NvidiaAIService
+from services.serialization_service import COLUMNS_LAYOUT, FastJSONResponse, results_content
+from services.sheets_service import SheetsService
+from services.team_fit_service import TeamFitService
+from services.question_bank_service import QuestionBank, SEED_QUESTIONS
+from services.trait_ranking_service import trait_registry
+from models.schemas import TraitScore
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+# Allowed slowdown relative to the baseline before --check fails
+DEFAULT_TOLERANCE = 0.5
+TARGET_SECONDS = 0.1  # per repeat
+REPEATS = 5
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function that returns the zero-argument callable to time"""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def _run_coroutine(coro):
+    """Drive a coroutine that never actually suspends, without event loop overhead"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("benchmarked coroutine suspended")
+
+
+def _services():
+    ai_service = NvidiaAIService()
+    return ai_service, AssessmentService(SheetsService(), ai_service)
+
+
+def _sample_rankings(seed: int = 0) -> Dict[str, int]:
+    traits = get_all_strengths()
+    order = traits[seed:] + traits[:seed]
+    return {trait: rank for rank, trait in enumerate(order, 1)}
+
+
+def _calibration():
+    """Fixed pure-Python workload used to normalise timings across machines"""
+    data = [(i * 7919) % 1009 for i in range(300)]
+    total = 0
+    for value in sorted(data):
+        total += value % 7
+    return {str(i): i for i in range(100)}, total
+
+
+# --- Scoring -----------------------------------------------------------------
+
+@benchmark("calculate_match_score")
+def bench_match_score():
+    _, assessment_service = _services()
+    user = [TraitScore(name=t, ranking=r, score=0.0) for t, r in _sample_rankings(0).items()]
+    ideal = [TraitScore(name=t, ranking=r, score=0.0) for t, r in _sample_rankings(5).items()]
+    return lambda: _run_coroutine(assessment_service.calculate_match_score(user, ideal))
+
+
+@benchmark("team_fit_20_teams_x_1000_candidates")
+def bench_team_fit():
+    team_fit_service = TeamFitService()
+    teams = [(f"T{t}", team_fit_service.resolve([(None, _sample_rankings((t + m) % 34)) for m in range(6)]))
+             for t in range(20)]
+    candidates = team_fit_service.resolve([(f"C{c}", _sample_rankings(c % 34)) for c in range(1000)])
+    return lambda: team_fit_service.score(teams, candidates, 5)
+
+
+@benchmark("select_chapter_2_questions")
+def bench_select_chapter_2_questions():
+    # Uncached selection from a full bank (every trait at the per-trait cap)
+    strengths = get_all_strengths()
+    bank = QuestionBank(SEED_QUESTIONS)
+    bank.add([{"Prompt": f"Scenario {i}", "Option1": "A", "Option2": "B", "Option3": "C", "Option4": "D",
+               "Traits": [strengths[i % 34], strengths[(i * 7 + 3) % 34], strengths[(i * 13 + 5) % 34]]}
+              for i in range(3000)])
+    signature = list(_sample_rankings(11))[:8]
+    return lambda: bank._select(trait_registry.mask(signature), 13)
+
+
+@benchmark("update_rankings_from_chapter_2")
+def bench_chapter_2_update():
+    ai_service, _ = _services()
+    rankings = _sample_rankings(3)
+    responses = [
+        {"questionId": f"Q2-{i}", "firstChoice": "ABCD"[i % 4], "secondChoice": "ABCD"[(i + 1) % 4]}
+        for i in range(1, 14)
+    ]
+    return lambda: ai_service._update_rankings_from_chapter_2(rankings, responses)
+
+
+@benchmark("fix_invalid_rankings")
+def bench_fix_invalid_rankings():
+    ai_service, _ = _services()
+    fallback = _sample_rankings(0)
+    invalid = dict(list(_sample_rankings(11).items())[:28])
+    invalid.update({"LearnerStrategic": 4, "learner": 9})
+    return lambda: ai_service._fix_invalid_rankings(invalid, fallback)
+
+
+@benchmark("build_final_results_complete")
+def bench_final_results_complete():
+    _, assessment_service = _services()
+    rankings = _sample_rankings(7)
+    return lambda: assessment_service._build_final_results("U1", "Bench", rankings, "2024-01-01T00:00:00")
+
+
+@benchmark("build_final_results_partial")
+def bench_final_results_partial():
+    _, assessment_service = _services()
+    rankings = dict(list(_sample_rankings(7).items())[:30])
+    rankings["NotATrait"] = 3
+    return lambda: assessment_service._build_final_results("U1", "Bench", rankings, "2024-01-01T00:00:00")
+
+
+@benchmark("validate_strength_profile_valid")
+def bench_validate_profile_valid():
+    profile = get_all_strengths()
+    return lambda: validate_strength_profile(profile)
+
+
+@benchmark("validate_strength_profile_duplicates")
+def bench_validate_profile_duplicates():
+    traits = get_all_strengths()
+    profile = traits[:17] + traits[:17]
+    return lambda: validate_strength_profile(profile)
+
+
+# --- Parsing -----------------------------------------------------------------
+
+def _register_parse(name: str, fixture_name: str, method: str):
+    @benchmark(name)
+    def setup():
+        ai_service, _ = _services()
+        text = fixture(fixture_name)
+        parse = getattr(ai_service, method)
+        return lambda: parse(text)
+
+
+_register_parse("parse_trait_rankings_clean", "trait_rankings_clean.txt", "_parse_trait_rankings")
+_register_parse("parse_trait_rankings_annotated", "trait_rankings_annotated.txt", "_parse_trait_rankings")
+_register_parse("parse_trait_rankings_truncated", "trait_rankings_truncated.txt", "_parse_trait_rankings")
+_register_parse("parse_chapter_2_questions", "chapter_2_questions.txt", "_parse_chapter_2_questions")
+_register_parse("parse_chapter_2_questions_split_arrays", "chapter_2_questions_split_arrays.txt",
+                "_parse_chapter_2_questions")
+_register_parse("parse_chapter_2_questions_missing_commas", "chapter_2_questions_missing_commas.txt",
+                "_parse_chapter_2_questions")
+
+
+# --- Serialization -----------------------------------------------------------
+
+def _final_results():
+    _, assessment_service = _services()
+    return assessment_service._build_final_results("U1", "Bench", _sample_rankings(7), "2024-01-01T00:00:00")
+
+
+@benchmark("render_final_results_stdlib")
+def bench_render_final_results_stdlib():
+    # FastAPI's default path: jsonable_encoder, then json.dumps in JSONResponse.render
+    results = _final_results()
+    return lambda: JSONResponse(jsonable_encoder(results)).body
+
+
+@benchmark("render_final_results_fast")
+def bench_render_final_results_fast():
+    results = _final_results()
+    return lambda: FastJSONResponse(results).body
+
+
+@benchmark("render_final_results_columns")
+def bench_render_final_results_columns():
+    results = _final_results()
+    return lambda: FastJSONResponse(results_content(results, COLUMNS_LAYOUT)).body
+
+
+# --- Runner ------------------------------------------------------------------
+
+def time_callable(func: Callable[[], object]) -> float:
+    """Best-of-REPEATS seconds per call, with the loop count sized to TARGET_SECONDS"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= TARGET_SECONDS / 5 or loops >= 1_000_000:
+            break
+        loops *= 4
+    loops = max(1, int(loops * TARGET_SECONDS / max(elapsed, 1e-9)))
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best
+
+
+def run(selected: List[str]) -> Dict[str, Dict[str, float]]:
+    calibration = time_callable(_calibration)
+    results = {}
+    for name in selected:
+        seconds = time_callable(BENCHMARKS[name]())
+        results[name] = {"us_per_call": seconds * 1e6, "relative": seconds / calibration}
+    return results
+
+
+def load_baselines() -> Dict[str, float]:
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text(encoding="utf-8")).get("benchmarks", {})
+
+
+def save_baselines(results: Dict[str, Dict[str, float]]):
+    baselines = load_baselines()
+    baselines.update({name: round(result["relative"], 3) for name, result in results.items()})
+    BASELINES_PATH.write_text(json.dumps({
+        "note": "Cost of each benchmark relative to the calibration workload; update with --update",
+        "benchmarks": dict(sorted(baselines.items()))
+    }, indent=2) + "\n", encoding="utf-8")
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for scoring and parsing hot paths")
+    parser.add_argument("-k", dest="keyword", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--check", action="store_true", help="fail if a benchmark regressed past the tolerance")
+    parser.add_argument("--update", action="store_true", help="record the results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown fraction (0.5 = 50%% slower than baseline)")
+    args = parser.parse_args()
+
+    selected = [name for name in BENCHMARKS if args.keyword in name]
+    results = run(selected)
+    baselines = load_baselines()
+
+    regressions = []
+    print(f"{'benchmark':<42} {'us/call':>10} {'relative':>9} {'baseline':>9} {'change':>8}")
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        change = ""
+        if baseline:
+            ratio = result["relative"] / baseline
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio > 1 + args.tolerance:
+                regressions.append(name)
+                change += " !"
+        print(f"{name:<42} {result['us_per_call']:>10.2f} {result['relative']:>9.3f} "
+              f"{baseline if baseline else '-':>9} {change:>8}")
+
+    if args.update:
+        save_baselines(results)
+        print(f"\nBaselines written to {BASELINES_PATH.name}")
+        return 0
+
+    if args.check and regressions:
+        print(f"\nRegressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
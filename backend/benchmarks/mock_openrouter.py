@@ -0,0 +1,184 @@
+"""
+Mock OpenRouter Chat Completions Server
+A local HTTP server that answers /chat/completions with plausible content for
+each call site (rankings, Chapter 2/3 questions, summaries), simulating
+time-to-first-token plus per-token generation time and reporting usage.
+With a capacity set, requests beyond that many in flight get a 429 like a
+saturated provider.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from services.ai_prompts_service import get_all_strengths
+from services.prompt_builder_service import estimate_tokens
+
+
+class MockOpenRouter:
+    """Threaded mock of the OpenRouter chat completions endpoint"""
+
+    def __init__(self, latency_ms: float = 800, tokens_per_second: float = 80,
+                 max_output_tokens: int = None, capacity: int = None, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.max_output_tokens = max_output_tokens
+        self.capacity = capacity
+        self.active = 0
+        self.peak_active = 0
+        self.throttled = 0
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                if not mock._admit():
+                    self._send(429, {"error": {"code": 429, "message": "Rate limit exceeded"}})
+                    return
+                try:
+                    self._send(200, mock.complete(payload))
+                finally:
+                    mock._finish()
+
+            def _send(self, status: int, payload: Dict[str, Any]):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output clean
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-openrouter", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def start(self) -> "MockOpenRouter":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self.capacity and self.active >= self.capacity:
+                self.throttled += 1
+                return False
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            return True
+
+    def _finish(self):
+        with self._lock:
+            self.active -= 1
+
+    def complete(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a chat completion for the request and sleep for the simulated generation time"""
+        messages = payload.get("messages", [])
+        prompt = "\n".join(message.get("content", "") for message in messages)
+        content = self._content_for(prompt, payload)
+
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        max_tokens = min(payload.get("max_tokens") or completion_tokens, self.max_output_tokens or completion_tokens)
+        finish_reason = "stop"
+        if completion_tokens > max_tokens:
+            content = content[:max_tokens * 4]
+            completion_tokens = max_tokens
+            finish_reason = "length"
+
+        generation_seconds = completion_tokens / self.tokens_per_second if self.tokens_per_second else 0
+        time.sleep(self.latency_ms / 1000 + generation_seconds)
+
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+        return {
+            "id": f"gen-mock-{random.getrandbits(32):08x}",
+            "model": payload.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _content_for(self, prompt: str, payload: Dict[str, Any]) -> str:
+        strengths = get_all_strengths()
+
+        if payload.get("response_format"):
+            indices = list(range(len(strengths)))
+            random.shuffle(indices)
+            return json.dumps({"ranking": indices})
+
+        if "Q2-1" in prompt:
+            return json.dumps(self._chapter_2_questions(prompt))
+
+        if "Q1:" in prompt and "7 questions" in prompt:
+            return "\n".join(
+                f"Q{i}: Describe a recent situation where you had to {topic} and what you did first."
+                for i, topic in enumerate(
+                    ["handle critical feedback", "lead without authority", "recover from a setback",
+                     "choose between two priorities", "support a struggling teammate",
+                     "convince a skeptic", "learn something quickly"], 1)
+            )
+
+        if "summary" in prompt.lower() and "34 traits" not in prompt:
+            return (
+                "You lead with strategic clarity and a drive to get things done. People rely on you to "
+                "turn ambiguity into a plan, and you energise teams by making progress visible. "
+                "Watch for impatience when others need more time to process."
+            )
+
+        ranks = list(range(1, len(strengths) + 1))
+        random.shuffle(ranks)
+        return json.dumps(dict(zip(strengths, ranks)))
+
+    @staticmethod
+    def _chapter_2_questions(prompt: str) -> List[Dict[str, Any]]:
+        """As many questions as requested, tagged with pairs of the focus traits (fresh scenarios every call)"""
+        count = re.search(r"Generate exactly (\d+) questions", prompt)
+        focus = re.search(r"FOCUS: .*?: (.+)", prompt)
+        traits = focus.group(1).split(", ") if focus else get_all_strengths()[:8]
+        batch = random.getrandbits(32)
+        return [
+            {
+                "QuestionID": f"Q2-{i}",
+                "Prompt": f"Scenario {batch}-{i}: your team hits an unexpected obstacle the day before a deadline. "
+                          f"What do you do?",
+                "Type": "multiple_choice",
+                "Option1": "Rally everyone and push through together",
+                "Option2": "Check in on how each person is coping",
+                "Option3": "Analyse what caused the obstacle",
+                "Option4": "Reassign tasks so the plan still works",
+                "Traits": [traits[(i - 1) % len(traits)], traits[i % len(traits)]]
+            }
+            for i in range(1, int(count.group(1)) + 1 if count else 14)
+        ]
@@ -0,0 +1,61 @@
+"""
+Export Final Results
+Streams every candidate's profile and 34 trait rankings from the spreadsheet
+to a file (or stdout) as CSV, Arrow IPC or Parquet, a chunk at a time.
+
+Usage (from backend/):
+    python export_results.py -o results.csv
+    python export_results.py --format parquet --from 2025-01-01 --to 2025-07-01 -o h1.parquet
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()  # Load from backend/.env first
+load_dotenv('../.env')  # Then load from root .env (will not override existing vars)
+
+from services.sheets_service import SheetsService
+from services.export_service import ExportService, ExportFormatUnavailable, EXPORT_FORMATS
+
+
+async def export(export_service: ExportService, export_format: str, start: datetime, end: datetime, output) -> int:
+    written = 0
+    async for chunk in export_service.stream(export_format, start, end):
+        output.write(chunk)
+        written += len(chunk)
+    output.flush()
+    return written
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Stream final results out of the spreadsheet")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, default=None,
+                        help="only candidates created at or after this ISO date/time")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, default=None,
+                        help="only candidates created at or before this ISO date/time")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    export_service = ExportService(SheetsService())
+    try:
+        export_service.check_format(args.format)
+    except ExportFormatUnavailable as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.output == "-":
+        written = asyncio.run(export(export_service, args.format, args.start, args.end, sys.stdout.buffer))
+    else:
+        with open(args.output, "wb") as output:
+            written = asyncio.run(export(export_service, args.format, args.start, args.end, output))
+        print(f"Wrote {written} bytes to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
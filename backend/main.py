@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import uvicorn
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from both backend/.env and root .env
@@ -15,12 +19,93 @@ from models.schemas import *
 from services.sheets_service import SheetsService
 from services.nvidia_ai_service import NvidiaAIService
 from services.assessment_service import AssessmentService
+from services.logging_service import get_logger
+from services.metrics_service import metrics_registry
+from services.tracing_service import start_trace, end_trace
+from services.admission_service import AdmissionController, AdmissionRejected
+from services.compression_service import CompressionMiddleware
+from services.serialization_service import FastJSONResponse, dumps, layout_etag, report_content, results_content
+from services.export_service import ExportService, ExportFormatUnavailable, EXPORT_FORMATS
+from services.analytics_service import AnalyticsService
+from services.team_fit_service import TeamFitService, TeamFitUnavailable
+from services.cassette_service import cassette_registry
+from services.question_bank_service import question_bank
+from services.job_service import (
+    JobQueue, JobQueueFull, PRIORITY_INTERACTIVE, PRIORITY_ANALYSIS, PRIORITY_SUMMARY
+)
+
+logger = get_logger(__name__)
+
+# Services are constructed in the lifespan hook so importing this module never touches the network
+sheets_service: Optional[SheetsService] = None
+ai_service: Optional[NvidiaAIService] = None
+assessment_service: Optional[AssessmentService] = None
+job_queue: Optional[JobQueue] = None
+admission_controller: Optional[AdmissionController] = None
+export_service: Optional[ExportService] = None
+analytics_service: Optional[AnalyticsService] = None
+team_fit_service: Optional[TeamFitService] = None
+
+# Longest a GET /api/jobs/{id}?wait=... long-poll is held open
+JOB_LONG_POLL_MAX_SECONDS = 25
+
+# Background warm-up status, reported by /api/ready
+warm_up_state = {"ready": False, "error": None, "duration_ms": None}
+
+async def warm_up_services():
+    """Connect to Google Sheets and preload caches without delaying startup"""
+    started = time.perf_counter()
+    try:
+        await sheets_service.warm_up()
+        warm_up_state["ready"] = True
+        warm_up_state["error"] = None
+    except Exception as e:
+        warm_up_state["error"] = str(e)
+        logger.warning("Service warm-up failed, will retry lazily on first use: %s", e)
+        return
+    finally:
+        warm_up_state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    
+    # Load banked Chapter 2 questions and seed cohort analytics (neither is needed for readiness)
+    try:
+        await question_bank.load(sheets_service)
+    except Exception as e:
+        logger.warning("Question bank load failed: %s", e)
+    try:
+        await analytics_service.rebuild()
+    except Exception as e:
+        logger.warning("Cohort analytics rebuild failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create services cheaply, then warm them up in the background"""
+    global sheets_service, ai_service, assessment_service, job_queue, admission_controller, export_service, \
+        analytics_service, team_fit_service
+    
+    sheets_service = SheetsService()
+    ai_service = NvidiaAIService()  # NVIDIA AI Service!
+    analytics_service = AnalyticsService(sheets_service)
+    team_fit_service = TeamFitService(analytics_service)
+    assessment_service = AssessmentService(sheets_service, ai_service, analytics_service)
+    export_service = ExportService(sheets_service)
+    admission_controller = AdmissionController()
+    job_queue = JobQueue()
+    await job_queue.start()
+    
+    warm_up_task = asyncio.create_task(warm_up_services())
+    yield
+    warm_up_task.cancel()
+    await job_queue.stop()
+    ai_service.close()
+    cassette_registry.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Automated Hiring System API",
     description="AI-powered psychometric assessment for hiring with NVIDIA Llama models",
-    version="1.0.1"
+    version="1.0.1",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware  
@@ -38,13 +123,67 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "Accept", "Origin", "X-Requested-With"],
+    allow_headers=["Content-Type", "Authorization", "Accept", "Origin", "X-Requested-With", "traceparent", "Prefer"],
+    expose_headers=["Server-Timing", "X-Trace-Id", "Location", "Retry-After"],
 )
 
-# Initialize services
-sheets_service = SheetsService()
-ai_service = NvidiaAIService()  # NVIDIA AI Service!
-assessment_service = AssessmentService(sheets_service, ai_service)
+# Brotli/gzip for JSON bodies above RESPONSE_COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace each request and report the per-service breakdown in a Server-Timing header"""
+    trace = start_trace(f"{request.method} {request.url.path}", request.headers.get("traceparent"))
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers["X-Trace-Id"] = trace.trace_id
+        return response
+    finally:
+        end_trace(trace, **{"http.method": request.method, "http.target": request.url.path,
+                            "http.status_code": status_code})
+
+def etag_headers(etag: str) -> dict:
+    """Validator headers sent with both 200 and 304 responses, so a revalidation keeps the same tag"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def prefers_async(http_request: Request) -> bool:
+    """Whether the client asked for 202 + job id instead of waiting (RFC 7240 "Prefer: respond-async")"""
+    return "respond-async" in http_request.headers.get("prefer", "").lower()
+
+@asynccontextmanager
+async def llm_admission(kind: str):
+    """Hold an LLM slot for the request, shedding it with 503 + Retry-After when the worker is saturated"""
+    try:
+        async with admission_controller.admit(kind):
+            yield
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def run_or_enqueue(http_request: Request, kind: str, priority: int, user_id: str,
+                         work: Callable[[], Awaitable[Any]]):
+    """Run work inline, or queue it as a background job when the client prefers async"""
+    if not prefers_async(http_request):
+        async with llm_admission(kind):
+            return FastJSONResponse(await work())
+    
+    async def admitted_work():
+        # The job queue already sheds load, so queued jobs wait for a slot without a deadline
+        async with admission_controller.admit(kind, shed=False):
+            return await work()
+    
+    try:
+        job = job_queue.submit(kind, admitted_work, priority=priority, user_id=user_id, key=f"{kind}:{user_id}")
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many queued jobs: {e}", headers={"Retry-After": "5"})
+    
+    return FastJSONResponse(
+        status_code=202,
+        content=job.to_dict(),
+        headers={"Location": f"/api/jobs/{job.id}", "Retry-After": "1"}
+    )
 
 @app.get("/")
 async def root():
@@ -55,6 +194,7 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "/api/health",
+            "ready": "/api/ready",
             "users": "/api/users", 
             "questions": "/api/questions/fixed",
             "docs": "/docs"
@@ -66,16 +206,42 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness endpoint - 200 once background warm-up has completed"""
+    if warm_up_state["ready"]:
+        status = "ready"
+    elif warm_up_state["error"]:
+        status = "degraded"
+    else:
+        status = "warming_up"
+    
+    content = {
+        "status": status,
+        "sheetsConnected": bool(sheets_service and sheets_service.is_connected),
+        "warmUpMs": warm_up_state["duration_ms"],
+        "error": warm_up_state["error"],
+        "timestamp": datetime.now().isoformat()
+    }
+    return JSONResponse(status_code=200 if warm_up_state["ready"] else 503, content=content)
+
+@app.get("/api/metrics")
+async def metrics():
+    """LLM, admission and job queue metrics in Prometheus text format (per worker process)"""
+    return Response(
+        content=metrics_registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 @app.post("/api/users", response_model=UserResponse)
 async def create_user(user_data: UserCreate):
     """Create a new user and store in Google Sheets"""
     try:
-        print(f"Creating user with data: {user_data.dict()}")
         user_response = await assessment_service.create_user(user_data)
-        print(f"User created successfully: {user_response.userId}")
+        logger.info("User created successfully: %s", user_response.userId)
         return user_response
     except Exception as e:
-        print(f"Error creating user: {str(e)}")
+        logger.error("Error creating user: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Also add endpoint without /api prefix for frontend compatibility
@@ -89,7 +255,7 @@ async def get_fixed_questions():
     """Get all fixed psychometric questions"""
     try:
         questions = await assessment_service.get_fixed_questions()
-        return questions
+        return FastJSONResponse(questions)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -100,100 +266,113 @@ async def get_fixed_questions_alt():
     return await get_fixed_questions()
 
 @app.post("/questions/follow-up/{round}")
-async def get_follow_up_questions_alt(round: int, user_data: UserCreate):
+async def get_follow_up_questions_alt(round: int, user_data: UserCreate, http_request: Request):
     """Get follow-up questions (alternative endpoint)"""
-    return await get_follow_up_questions(round, user_data)
+    return await get_follow_up_questions(round, user_data, http_request)
 
 @app.post("/responses/initial")
-async def submit_initial_responses_alt(request: InitialResponsesRequest):
+async def submit_initial_responses_alt(request: InitialResponsesRequest, http_request: Request):
     """Submit initial responses (alternative endpoint)"""
-    return await submit_initial_responses(request)
+    return await submit_initial_responses(request, http_request)
 
 @app.post("/api/questions/follow-up/{round}")
-async def get_follow_up_questions(round: int, request: FollowUpQuestionsRequest):
+async def get_follow_up_questions(round: int, request: FollowUpQuestionsRequest, http_request: Request):
     """Generate personalized follow-up questions based on previous responses"""
     try:
         if round not in [1, 2]:
             raise HTTPException(status_code=400, detail="Round must be 1 or 2")
         
-        questions = await assessment_service.generate_follow_up_questions(
-            request.userId, round
+        return await run_or_enqueue(
+            http_request, f"follow_up_questions_{round}", PRIORITY_INTERACTIVE, request.userId,
+            lambda: assessment_service.generate_follow_up_questions(request.userId, round)
         )
-        return questions
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/responses/initial")
-async def submit_initial_responses(request: InitialResponsesRequest):
+async def submit_initial_responses(request: InitialResponsesRequest, http_request: Request):
     """Submit initial assessment responses"""
     try:
-        result = await assessment_service.submit_initial_responses(
-            request.userId, request.responses
+        return await run_or_enqueue(
+            http_request, "initial_responses", PRIORITY_ANALYSIS, request.userId,
+            lambda: assessment_service.submit_initial_responses(request.userId, request.responses)
         )
-        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"ERROR in submit_initial_responses: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in submit_initial_responses: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/responses/follow-up/{round}")
-async def submit_follow_up_responses(round: int, request: FollowUpResponsesRequest):
+async def submit_follow_up_responses(round: int, request: FollowUpResponsesRequest, http_request: Request):
     """Submit follow-up responses"""
     try:
         if round not in [1, 2]:
             raise HTTPException(status_code=400, detail="Round must be 1 or 2")
         
-        result = await assessment_service.submit_follow_up_responses(
-            request.userId, request.responses, round
+        return await run_or_enqueue(
+            http_request, f"follow_up_responses_{round}", PRIORITY_ANALYSIS, request.userId,
+            lambda: assessment_service.submit_follow_up_responses(request.userId, request.responses, round)
         )
-        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"ERROR: Submit follow-up responses failed: {str(e)}")
+        logger.error("Submit follow-up responses failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/summary/initial/{user_id}")
-async def get_initial_summary(user_id: str):
+async def get_initial_summary(user_id: str, http_request: Request):
     """Get initial personality summary"""
+    async def work():
+        return {"summary": await assessment_service.generate_initial_summary(user_id)}
+    
     try:
-        summary = await assessment_service.generate_initial_summary(user_id)
-        return {"summary": summary}
+        return await run_or_enqueue(http_request, "initial_summary", PRIORITY_SUMMARY, user_id, work)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"ERROR in get_initial_summary: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_initial_summary: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Alias route without /api prefix for production compatibility
 @app.get("/summary/initial/{user_id}")
-async def get_initial_summary_alias(user_id: str):
+async def get_initial_summary_alias(user_id: str, http_request: Request):
     """Get initial personality summary - alias route"""
-    return await get_initial_summary(user_id)
+    return await get_initial_summary(user_id, http_request)
 
 @app.get("/api/summary/follow-up/{user_id}/{round}")
-async def get_follow_up_summary(user_id: str, round: int):
+async def get_follow_up_summary(user_id: str, round: int, http_request: Request):
     """Get follow-up summary after each round"""
+    async def work():
+        return {"summary": await assessment_service.generate_follow_up_summary(user_id, round)}
+    
     try:
         if round not in [1, 2]:
             raise HTTPException(status_code=400, detail="Round must be 1 or 2")
         
-        summary = await assessment_service.generate_follow_up_summary(user_id, round)
-        return {"summary": summary}
+        return await run_or_enqueue(http_request, f"follow_up_summary_{round}", PRIORITY_SUMMARY, user_id, work)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Alias route without /api prefix for production compatibility
 @app.get("/summary/follow-up/{user_id}/{round}")
-async def get_follow_up_summary_alias(user_id: str, round: int):
+async def get_follow_up_summary_alias(user_id: str, round: int, http_request: Request):
     """Get follow-up summary after each round - alias route"""
-    return await get_follow_up_summary(user_id, round)
+    return await get_follow_up_summary(user_id, round, http_request)
 
 @app.get("/api/summary/final/{user_id}")
 async def get_final_summary(user_id: str):
     """Get final comprehensive personality summary"""
     try:
-        summary = await assessment_service.generate_final_summary(user_id)
+        async with llm_admission("final_summary"):
+            summary = await assessment_service.generate_final_summary(user_id)
         return {"summary": summary}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -204,19 +383,192 @@ async def get_final_summary_alias(user_id: str):
     return await get_final_summary(user_id)
 
 @app.get("/api/results/{user_id}")
-async def get_final_results(user_id: str):
-    """Get final trait rankings and complete results"""
+async def get_final_results(user_id: str, request: Request, layout: Optional[str] = None):
+    """Get final trait rankings (read-only, cached and ETag-aware); layout=columns sends traits column-oriented"""
+    if_none_match = request.headers.get("if-none-match")
+    etag = assessment_service.get_results_etag(user_id)
+    if etag:
+        etag = layout_etag(etag, layout)
+        if if_none_match == etag:
+            return Response(status_code=304, headers=etag_headers(etag))
+    
     try:
         results = await assessment_service.get_final_results(user_id)
-        return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if results is None:
+        raise HTTPException(status_code=404, detail="Results have not been finalized for this user")
+    
+    etag = layout_etag(assessment_service.get_results_etag(user_id), layout)
+    headers = etag_headers(etag)
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content=results_content(results, layout), headers=headers)
 
 # Alias route without /api prefix for production compatibility
 @app.get("/results/{user_id}")
-async def get_final_results_alias(user_id: str):
+async def get_final_results_alias(user_id: str, request: Request, layout: Optional[str] = None):
     """Get final trait rankings and complete results - alias route"""
-    return await get_final_results(user_id)
+    return await get_final_results(user_id, request, layout)
+
+@app.post("/api/results/{user_id}/finalize")
+async def finalize_results(user_id: str):
+    """Commit final trait rankings once (idempotent)"""
+    try:
+        results = await assessment_service.finalize_results(user_id)
+        return results
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Alias route without /api prefix for production compatibility
+@app.post("/results/{user_id}/finalize")
+async def finalize_results_alias(user_id: str):
+    """Commit final trait rankings once - alias route"""
+    return await finalize_results(user_id)
+
+@app.get("/api/report/{user_id}")
+async def get_final_report(user_id: str, request: Request, layout: Optional[str] = None):
+    """Get the final summary, ranked traits and profile in one response (memoized, ETag-aware)"""
+    if_none_match = request.headers.get("if-none-match")
+    etag = assessment_service.get_report_etag(user_id)
+    if etag:
+        etag = layout_etag(etag, layout)
+        if if_none_match == etag:
+            return Response(status_code=304, headers=etag_headers(etag))
+
+    try:
+        if etag:
+            report = await assessment_service.get_final_report(user_id)
+        else:
+            # Not memoized yet, so building it will call the LLM
+            async with llm_admission("final_report"):
+                report = await assessment_service.get_final_report(user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in get_final_report: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    etag = assessment_service.get_report_etag(user_id)
+    if etag is None:
+        # Not memoized (the summary fell back to canned text), so there is nothing to revalidate
+        return FastJSONResponse(content=report_content(report, layout), headers={"Cache-Control": "no-store"})
+    etag = layout_etag(etag, layout)
+    headers = etag_headers(etag)
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content=report_content(report, layout), headers=headers)
+
+# Alias route without /api prefix for production compatibility
+@app.get("/report/{user_id}")
+async def get_final_report_alias(user_id: str, request: Request, layout: Optional[str] = None):
+    """Get the complete final report - alias route"""
+    return await get_final_report(user_id, request, layout)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Get background job status; `wait` long-polls up to that many seconds for completion"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if wait > 0 and not job.finished:
+        job = await job_queue.wait(job, min(wait, JOB_LONG_POLL_MAX_SECONDS))
+    
+    headers = {} if job.finished else {"Retry-After": "1"}
+    return FastJSONResponse(content=job.to_dict(), headers=headers)
+
+# Alias route without /api prefix for production compatibility
+@app.get("/jobs/{job_id}")
+async def get_job_alias(job_id: str, wait: float = 0):
+    """Get background job status - alias route"""
+    return await get_job(job_id, wait)
+
+@app.get("/api/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """Server-sent events stream that emits `complete` when the job finishes"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events(job):
+        while not job.finished:
+            job = await job_queue.wait(job, 15)
+            if not job.finished:
+                yield ": keep-alive\n\n"
+        yield f"event: complete\ndata: {dumps(job.to_dict()).decode()}\n\n"
+    
+    return StreamingResponse(
+        events(job), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Alias route without /api prefix for production compatibility
+@app.get("/jobs/{job_id}/events")
+async def get_job_events_alias(job_id: str):
+    """Server-sent job completion events - alias route"""
+    return await get_job_events(job_id)
+
+@app.get("/api/export/results")
+async def export_results(
+    format: str = "csv",
+    start: Optional[datetime] = Query(None, alias="from", description="candidates created at or after this time"),
+    end: Optional[datetime] = Query(None, alias="to", description="candidates created at or before this time")
+):
+    """Stream every candidate's profile and 34 trait rankings as CSV, Arrow or Parquet"""
+    try:
+        export_service.check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_service.stream(format, start, end), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="results.{extension}"'}
+    )
+
+# Alias route without /api prefix for production compatibility
+@app.get("/export/results")
+async def export_results_alias(
+    format: str = "csv",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to")
+):
+    """Stream the results export - alias route"""
+    return await export_results(format, start, end)
+
+@app.get("/api/analytics/{view}")
+async def get_analytics(view: str):
+    """Cohort analytics over finalized candidates: summary, rank-histograms, domains or co-occurrence"""
+    try:
+        return FastJSONResponse(analytics_service.view(view))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown analytics view, expected one of {', '.join(AnalyticsService.VIEWS)}")
+
+# Alias route without /api prefix for production compatibility
+@app.get("/analytics/{view}")
+async def get_analytics_alias(view: str):
+    """Get a cohort analytics view - alias route"""
+    return await get_analytics(view)
+
+@app.post("/api/analytics/rebuild")
+async def rebuild_analytics():
+    """Recompute cohort analytics from every stored result"""
+    try:
+        return await analytics_service.rebuild()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Alias route without /api prefix for production compatibility
+@app.post("/analytics/rebuild")
+async def rebuild_analytics_alias():
+    """Recompute cohort analytics - alias route"""
+    return await rebuild_analytics()
 
 @app.post("/api/matching/calculate")
 async def calculate_match_score(request: MatchingRequest):
@@ -229,12 +581,42 @@ async def calculate_match_score(request: MatchingRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/matching/team-fit")
+async def calculate_team_fit(request: TeamFitRequest):
+    """Rank candidates by how well they complement each team's trait and domain coverage"""
+    try:
+        teams = [
+            (team.teamId, team_fit_service.resolve([(member.userId, member.traits) for member in team.members]))
+            for team in request.teams
+        ]
+        if request.candidates is None:
+            candidates = team_fit_service.finalized_candidates()
+        else:
+            candidates = team_fit_service.resolve([(c.userId, c.traits) for c in request.candidates])
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"No finalized results for user {e.args[0]}")
+
+    try:
+        result = await asyncio.to_thread(team_fit_service.score, teams, candidates, request.topK)
+        return FastJSONResponse(result)
+    except TeamFitUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Alias route without /api prefix for production compatibility
+@app.post("/matching/team-fit")
+async def calculate_team_fit_alias(request: TeamFitRequest):
+    """Rank complementary hires for teams - alias route"""
+    return await calculate_team_fit(request)
+
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail, "timestamp": datetime.now().isoformat()}
+        content={"error": exc.detail, "timestamp": datetime.now().isoformat()},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -77,11 +77,44 @@ class FinalResults(BaseModel):
     timestamp: str
     assessmentAccuracy: float
 
+class CandidateProfile(BaseModel):
+    userId: str
+    name: str
+    age: Optional[int] = None
+    experience: Optional[int] = None
+
+class FinalReport(BaseModel):
+    userId: str
+    profile: CandidateProfile
+    summary: str
+    results: FinalResults
+    generatedAt: str
+
 # Matching models
 class MatchingRequest(BaseModel):
     userTraits: List[TraitScore]
     idealTraits: List[TraitScore]
 
+# Team fit models
+class TeamFitProfile(BaseModel):
+    userId: Optional[str] = None
+    traits: Optional[Dict[str, int]] = None  # {trait: rank}; looked up from finalized results when omitted
+    
+    @model_validator(mode="after")
+    def require_user_id_or_traits(self):
+        if not self.userId and self.traits is None:
+            raise ValueError("a profile needs a userId or traits")
+        return self
+
+class TeamRoster(BaseModel):
+    teamId: str
+    members: List[TeamFitProfile]
+
+class TeamFitRequest(BaseModel):
+    teams: List[TeamRoster]
+    candidates: Optional[List[TeamFitProfile]] = None  # every finalized candidate when omitted
+    topK: int = Field(default=5, ge=1, le=100)
+
 # API Response models
 class APIResponse(BaseModel):
     success: bool
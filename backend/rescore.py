@@ -0,0 +1,54 @@
+"""
+Re-Score Historical Candidates
+Re-runs the ranking stages over every stored assessment and writes the
+results to the Rescored_Results_<version> worksheet. Safe to interrupt: run
+the same command again to resume from the checkpoint.
+
+Usage (from backend/):
+    python rescore.py --version 2025-06-prompts-v2
+    python rescore.py --version 2025-06-prompts-v2 --concurrency 8 --batch-size 50
+    python rescore.py --version 2025-06-prompts-v2 --user U123 --user U456
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()  # Load from backend/.env first
+load_dotenv('../.env')  # Then load from root .env (will not override existing vars)
+
+from services.sheets_service import SheetsService
+from services.nvidia_ai_service import NvidiaAIService
+from services.rescoring_service import RescoringService
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Re-score stored assessments into a versioned results worksheet")
+    parser.add_argument("--version", required=True, help="scoring version label, e.g. the prompt revision")
+    parser.add_argument("--concurrency", type=int, default=None, help="candidates re-scored at once (default 4)")
+    parser.add_argument("--batch-size", type=int, default=None, help="result rows per Sheets append (default 25)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default .rescore-<version>.json)")
+    parser.add_argument("--user", action="append", dest="user_ids", help="only re-score this user id (repeatable)")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many candidates")
+    args = parser.parse_args()
+
+    ai_service = NvidiaAIService()
+    if not ai_service.api_key:
+        print("NVIDIA_API_KEY is not set; refusing to write fallback rankings", file=sys.stderr)
+        return 2
+
+    rescoring_service = RescoringService(
+        SheetsService(), ai_service, args.version, checkpoint_path=args.checkpoint,
+        concurrency=args.concurrency, batch_size=args.batch_size
+    )
+    counts = asyncio.run(rescoring_service.run(user_ids=args.user_ids, limit=args.limit))
+
+    print(json.dumps({"version": args.version, "sheet": rescoring_service.results_sheet, **counts}, indent=2))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
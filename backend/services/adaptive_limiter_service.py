@@ -0,0 +1,152 @@
+"""
+Adaptive Concurrency Limit for the LLM Provider
+An AIMD (additive increase, multiplicative decrease) cap on in-flight
+OpenRouter requests. While calls succeed at their usual latency the limit
+grows by roughly one per limit's worth of completions; a 429, 5xx, timeout
+or latency spike cuts it by a constant factor. Throughput therefore follows
+whatever capacity the provider is giving us at the moment.
+
+Calls are made from worker threads, so the limiter uses a threading.Condition.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .logging_service import get_logger
+from .metrics_service import metrics_registry
+
+logger = get_logger(__name__)
+
+LIMITER_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Successful calls per call site before its latency baseline is trusted
+LATENCY_WARMUP_SAMPLES = 5
+
+
+class LimiterTimeout(Exception):
+    """Raised when no slot became free within the acquire timeout"""
+
+
+class Permit:
+    """One admitted call; mark it dropped to report overload to the limiter"""
+
+    __slots__ = ("call_site", "started", "drop_reason")
+
+    def __init__(self, call_site: str):
+        self.call_site = call_site
+        self.started = time.monotonic()
+        self.drop_reason: Optional[str] = None
+
+    def dropped(self, reason: str):
+        """The provider signalled overload: "throttled", "server_error", "timeout", ..."""
+        self.drop_reason = reason
+
+
+class AIMDLimiter:
+    """Thread-safe AIMD concurrency limit"""
+
+    def __init__(self, name: str, initial: float = None, min_limit: float = None, max_limit: float = None,
+                 backoff: float = None, latency_spike_ratio: float = None, acquire_timeout: float = None):
+        self.name = name
+        self.min_limit = min_limit or float(os.getenv("LLM_AIMD_MIN_LIMIT", "1"))
+        self.max_limit = max_limit or float(os.getenv("LLM_AIMD_MAX_LIMIT", "32"))
+        self.limit = initial or float(os.getenv("LLM_AIMD_INITIAL_LIMIT", "4"))
+        self.backoff = backoff or float(os.getenv("LLM_AIMD_BACKOFF", "0.5"))
+        self.latency_spike_ratio = latency_spike_ratio or float(os.getenv("LLM_AIMD_LATENCY_SPIKE_RATIO", "2.5"))
+        self.acquire_timeout = acquire_timeout or float(os.getenv("LLM_AIMD_ACQUIRE_TIMEOUT_SECONDS", "60"))
+
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._last_decrease = 0.0
+
+        # Smoothed successful latency per call site (prompt sizes and max_tokens differ a lot)
+        self._latency: Dict[str, float] = {}
+        self._latency_samples: Dict[str, int] = {}
+
+        metrics_registry.gauge("llm_concurrency_limit", "Current adaptive limit on in-flight LLM requests")
+        metrics_registry.gauge("llm_concurrency_in_flight", "LLM requests currently in flight")
+        metrics_registry.counter("llm_concurrency_decisions_total", "Adaptive limit changes by decision and reason")
+        metrics_registry.histogram("llm_concurrency_wait_seconds", "Time spent waiting under the adaptive limit",
+                                   LIMITER_WAIT_BUCKETS)
+        self._update_gauges()
+
+    @contextmanager
+    def acquire(self, call_site: str):
+        """Hold a slot for one provider request and feed its outcome back into the limit"""
+        waited_from = time.monotonic()
+        with self._condition:
+            deadline = waited_from + self.acquire_timeout
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics_registry.inc("llm_concurrency_decisions_total", limiter=self.name,
+                                         decision="reject", reason="acquire_timeout")
+                    raise LimiterTimeout(f"No {self.name} slot free within {self.acquire_timeout:.0f}s")
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            self._update_gauges()
+        metrics_registry.observe("llm_concurrency_wait_seconds", time.monotonic() - waited_from, limiter=self.name)
+
+        permit = Permit(call_site)
+        failed = False
+        try:
+            yield permit
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._release(permit, failed)
+
+    def _release(self, permit: Permit, failed: bool):
+        latency = time.monotonic() - permit.started
+        with self._condition:
+            at_limit = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+
+            if permit.drop_reason:
+                self._decrease(permit, permit.drop_reason)
+            elif not failed:
+                if self._is_latency_spike(permit.call_site, latency):
+                    self._decrease(permit, "latency_spike")
+                else:
+                    self._observe_latency(permit.call_site, latency)
+                    # Only probe for more capacity when we were actually using what we had
+                    if at_limit and self.limit < self.max_limit:
+                        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                        metrics_registry.inc("llm_concurrency_decisions_total", limiter=self.name,
+                                             decision="increase", reason="healthy")
+
+            self._update_gauges()
+            self._condition.notify_all()
+
+    def _decrease(self, permit: Permit, reason: str):
+        """Multiplicative decrease, at most once per round of requests already in flight"""
+        if permit.started < self._last_decrease:
+            metrics_registry.inc("llm_concurrency_decisions_total", limiter=self.name, decision="hold", reason=reason)
+            return
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._last_decrease = time.monotonic()
+        metrics_registry.inc("llm_concurrency_decisions_total", limiter=self.name, decision="decrease", reason=reason)
+        logger.warning("%s concurrency limit %.1f -> %.1f (%s)", self.name, previous, self.limit, reason)
+
+    def _is_latency_spike(self, call_site: str, latency: float) -> bool:
+        if self._latency_samples.get(call_site, 0) < LATENCY_WARMUP_SAMPLES:
+            return False
+        return latency > self._latency[call_site] * self.latency_spike_ratio
+
+    def _observe_latency(self, call_site: str, latency: float):
+        baseline = self._latency.get(call_site)
+        self._latency[call_site] = latency if baseline is None else 0.9 * baseline + 0.1 * latency
+        self._latency_samples[call_site] = self._latency_samples.get(call_site, 0) + 1
+
+    def _update_gauges(self):
+        metrics_registry.set("llm_concurrency_limit", round(self.limit, 2), limiter=self.name)
+        metrics_registry.set("llm_concurrency_in_flight", self.in_flight, limiter=self.name)
+
+
+# Process-wide limiter for OpenRouter, shared by every NvidiaAIService call
+llm_limiter = AIMDLimiter("openrouter")
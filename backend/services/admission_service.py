@@ -0,0 +1,137 @@
+"""
+Admission Control for LLM-Bound Work
+Caps how many LLM-bound requests a worker runs at once. Requests beyond the
+cap wait in a bounded FIFO queue for at most a deadline; when the queue is
+full, or the deadline passes, they are shed immediately with a Retry-After
+estimate instead of piling onto OpenRouter and timing out together.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque
+
+from .metrics_service import metrics_registry
+
+ADMISSION_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Retry-After bounds (seconds)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class AdmissionRejected(Exception):
+    """Raised when work is shed; retry_after is a hint in whole seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server is at capacity ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Per-worker concurrency limit with a bounded, deadline-aware wait queue"""
+
+    def __init__(self, max_concurrent: int = None, max_queue: int = None, queue_timeout: float = None):
+        self.max_concurrent = max_concurrent or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("LLM_MAX_QUEUE", "16"))
+        self.queue_timeout = queue_timeout or float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # Smoothed time a slot is held, used for Retry-After estimates
+        self._hold_seconds = 5.0
+
+        metrics_registry.gauge("llm_admission_in_flight", "LLM-bound requests currently admitted")
+        metrics_registry.gauge("llm_admission_queue_depth", "LLM-bound requests waiting for a slot")
+        metrics_registry.counter("llm_admission_total", "Admission decisions by kind and outcome")
+        metrics_registry.histogram("llm_admission_wait_seconds", "Time spent waiting for an LLM slot",
+                                   ADMISSION_WAIT_BUCKETS)
+        self._update_gauges()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = self.queue_depth + 1
+        estimate = self._hold_seconds * backlog / self.max_concurrent
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(estimate)))
+
+    @asynccontextmanager
+    async def admit(self, kind: str, shed: bool = True):
+        """Hold an LLM slot for the duration of the block.
+
+        With shed=False the caller waits as long as it takes (used by background
+        jobs, whose queue already sheds load); otherwise AdmissionRejected is
+        raised when the wait queue is full or the deadline passes.
+        """
+        started = time.monotonic()
+
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+        else:
+            if shed and self.queue_depth >= self.max_queue:
+                self._reject(kind, "queue_full")
+            await self._wait_for_slot(kind, shed)
+
+        waited = time.monotonic() - started
+        metrics_registry.observe("llm_admission_wait_seconds", waited, kind=kind)
+        metrics_registry.inc("llm_admission_total", kind=kind, outcome="admitted")
+        self._update_gauges()
+
+        admitted_at = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - admitted_at
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held
+            self._release()
+
+    async def _wait_for_slot(self, kind: str, shed: bool):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout if shed else None)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self._reject(kind, "timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled - pass it on
+                self._release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def _release(self):
+        """Hand the slot to the oldest live waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._update_gauges()
+
+    def _reject(self, kind: str, reason: str):
+        metrics_registry.inc("llm_admission_total", kind=kind, outcome=f"rejected_{reason}")
+        raise AdmissionRejected(reason, self.retry_after())
+
+    def _update_gauges(self):
+        metrics_registry.set("llm_admission_in_flight", self.in_flight)
+        metrics_registry.set("llm_admission_queue_depth", self.queue_depth)
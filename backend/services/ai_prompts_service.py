@@ -3,6 +3,8 @@ AI System Prompts and Priming Configuration
 This module contains the system prompts for the strengths-based assessment AI.
 """
 
+from collections import Counter
+
 # Trait-specific behavioral patterns for accurate identification
 TRAIT_BEHAVIORAL_PATTERNS = {
     "Command": [
@@ -309,11 +311,14 @@ Do not mention about the "cliffhanger truth" or anything like that, just make th
 """
 
 # Chapter-specific question generation prompts
-def get_chapter_2_generation_prompt(chapter_1_results):
-    """Generate Chapter 2 questions based on Chapter 1 results"""
+def get_chapter_2_generation_prompt(chapter_1_results, count=13, focus_traits=None):
+    """Generate Chapter 2 questions based on Chapter 1 results (optionally only for some of the traits)"""
+    focus = f"""
+FOCUS: Every question must distinguish between at least two of these traits: {', '.join(focus_traits)}
+""" if focus_traits else ""
     return f"""
 Based on the Chapter 1 results: {chapter_1_results}
-
+{focus}
 CHAPTER 2: BEHAVIORAL TRUTH - Situational Decision Making
 
 PURPOSE: After Chapter 1 gives us a baseline of natural tendencies, Chapter 2 reveals how someone actually behaves in real situations. This helps solve contradictions and solidify the strength profile by seeing which traits someone actually uses when he/she has handled or is handling such situations.
@@ -323,11 +328,12 @@ CRITICAL JSON REQUIREMENTS - READ CAREFULLY:
 2. NEVER use markdown blocks, NEVER use ```json:disable-run
 3. NEVER add explanatory text before or after the JSON
 4. The response must start with [ and end with ]
-5. All 13 questions must be in ONE SINGLE ARRAY
-6. Each question MUST have exactly: "QuestionID", "Prompt", "Type", "Option1", "Option2", "Option3", "Option4"
+5. All {count} questions must be in ONE SINGLE ARRAY
+6. Each question MUST have exactly: "QuestionID", "Prompt", "Type", "Option1", "Option2", "Option3", "Option4", "Traits"
 7. "Type" must always be "multiple_choice"
 8. All text must be plain text only, properly escaped quotes
 9. NO line breaks within option text, NO **, NO [], NO links
+10. "Traits" is an array of the 2 to 4 CliftonStrengths names the options distinguish between
 
 WRONG FORMAT (DO NOT USE):
 [{{"QuestionID":"Q2-1",...}}]
@@ -345,7 +351,7 @@ QUESTION REQUIREMENTS:
 6. NO parentheses, or no inclusions of trait names in options
 7. Keep option text concise and clear
 
-Generate exactly 13 questions in ONE SINGLE JSON ARRAY. Return ONLY the JSON array with no additional text, formatting, or commentary. Start your response with [ and end with ]."""
+Generate exactly {count} questions in ONE SINGLE JSON ARRAY. Return ONLY the JSON array with no additional text, formatting, or commentary. Start your response with [ and end with ]."""
 
 def get_chapter_3_generation_prompt(chapter_1_results, chapter_2_results):
     """Generate Chapter 3 questions based on previous chapters"""
@@ -415,12 +421,12 @@ CLIFTON_STRENGTHS = {
     ]
 }
 
+# Flat, domain-ordered tuple of the 34 strengths (built once at import)
+ALL_STRENGTHS = tuple(strength for domain_strengths in CLIFTON_STRENGTHS.values() for strength in domain_strengths)
+
 def get_all_strengths():
     """Returns all 34 core strengths as a flat list"""
-    all_strengths = []
-    for domain_strengths in CLIFTON_STRENGTHS.values():
-        all_strengths.extend(domain_strengths)
-    return all_strengths
+    return list(ALL_STRENGTHS)
 
 def get_workflow_prompts():
     """Returns all workflow prompts for the assessment process"""
@@ -444,14 +450,75 @@ def validate_strength_profile(strength_list):
     if len(strength_list) != 34:
         return False, f"Profile must contain exactly 34 strengths, got {len(strength_list)}"
     
-    # Check for duplicates
+    # Check for duplicates (single counting pass instead of list.count per item)
     if len(set(strength_list)) != 34:
-        duplicates = [item for item in strength_list if strength_list.count(item) > 1]
+        counts = Counter(strength_list)
+        duplicates = [item for item in strength_list if counts[item] > 1]
         return False, f"Profile contains duplicates: {duplicates}"
     
     # Check if all strengths are valid
-    invalid_strengths = [s for s in strength_list if s not in all_strengths]
+    valid_strengths = set(all_strengths)
+    invalid_strengths = [s for s in strength_list if s not in valid_strengths]
     if invalid_strengths:
         return False, f"Invalid strengths found: {invalid_strengths}"
     
     return True, "Profile is valid"
+
+def get_strength_index_legend():
+    """Returns the "index=Strength" legend used by the compact ranking format"""
+    return ", ".join(f"{index}={strength}" for index, strength in enumerate(get_all_strengths()))
+
+def get_structured_ranking_instructions():
+    """Returns the output instructions for a compact ranking of trait indices"""
+    return f"""OUTPUT FORMAT:
+Each strength has an index: {get_strength_index_legend()}.
+Return ONLY {{"ranking": [...]}} where "ranking" lists all 34 indices ordered from strongest to weakest.
+Every index from 0 to 33 must appear exactly once. No other text."""
+
+def get_ranking_response_format():
+    """
+    Returns the response_format JSON schema constraining output to an ordered list of trait indices.
+    Only keywords every strict-mode provider accepts are used (no minimum/maximum, minItems/maxItems
+    or uniqueItems); the length, range and uniqueness are checked by validate_ranking_indices.
+    """
+    strength_count = len(get_all_strengths())
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "strength_ranking",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "ranking": {
+                        "type": "array",
+                        "description": f"All {strength_count} trait indices (0-{strength_count - 1}), "
+                                       f"each exactly once, strongest first",
+                        "items": {"type": "integer"}
+                    }
+                },
+                "required": ["ranking"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+def validate_ranking_indices(indices):
+    """Validates that indices is an ordering of every strength index exactly once"""
+    strength_count = len(get_all_strengths())
+    if not isinstance(indices, list) or len(indices) != strength_count:
+        return False
+
+    seen = 0
+    for index in indices:
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < strength_count:
+            return False
+        if seen >> index & 1:
+            return False
+        seen |= 1 << index
+    return True
+
+def rankings_from_indices(indices):
+    """Converts an ordered list of strength indices to a {strength: rank} map (1 = strongest)"""
+    all_strengths = get_all_strengths()
+    return {all_strengths[index]: rank for rank, index in enumerate(indices, 1)}
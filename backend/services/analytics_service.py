@@ -0,0 +1,275 @@
+"""
+Cohort Analytics over Final Trait Rankings
+Running aggregates over every finalized candidate, updated in O(34) as each
+result is committed: per-trait rank histograms (34 x 34 counts), per-domain
+top-5 aggregates using CLIFTON_STRENGTHS, and co-occurrence counts of traits
+within top-5 sets. Reads are served from cached views, so they cost the same
+however many candidates there are.
+
+Aggregates are per process, like the metrics; a full rebuild from
+Final_Results (vectorized with NumPy when it is installed) reconciles them
+with results finalized by other workers.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging_service import get_logger
+from .trait_ranking_service import TraitRanking, trait_registry
+
+logger = get_logger(__name__)
+
+# Size of the "top" set used for co-occurrence and domain aggregates
+TOP_K = 5
+
+# Candidates per vectorized rebuild step (keeps rebuild memory flat)
+REBUILD_CHUNK_SIZE = 5000
+
+# Sort key for unranked traits, below every real rank
+_UNRANKED = 127
+
+
+def _zeros(size: int) -> array:
+    return array("q", bytes(8 * size))
+
+
+class CohortAggregates:
+    """Running counts over a set of candidates; adding or replacing one candidate is O(34)"""
+
+    def __init__(self):
+        size = trait_registry.size
+        self.domains = list(trait_registry.domain_masks)
+        self.candidates = 0
+        # rank_counts[trait slot][rank - 1]
+        self.rank_counts = [_zeros(size) for _ in range(size)]
+        self.rank_sums = _zeros(size)
+        self.ranked_counts = _zeros(size)
+        # top_pairs[a][b]: candidates with both a and b in their top set; the diagonal is top-set frequency
+        self.top_pairs = [_zeros(size) for _ in range(size)]
+        self.domain_top_counts = dict.fromkeys(self.domains, 0)
+        self.dominant_domain_counts = dict.fromkeys(self.domains, 0)
+        # Compact ranking per candidate, so a re-finalized candidate replaces instead of double counting
+        self.members: Dict[str, bytes] = {}
+
+    def add(self, user_id: str, ranking: TraitRanking) -> bool:
+        """Add (or replace) a candidate; returns False if nothing changed"""
+        data = ranking.to_bytes()
+        previous = self.members.get(user_id)
+        if previous == data:
+            return False
+        if previous is None:
+            self.candidates += 1
+        else:
+            self._apply(TraitRanking.from_bytes(previous), -1)
+        self.members[user_id] = data
+        self._apply(ranking, 1)
+        return True
+
+    def _apply(self, ranking: TraitRanking, weight: int):
+        size = trait_registry.size
+        for slot, rank in enumerate(ranking.to_bytes()):
+            if 1 <= rank <= size:
+                self.rank_counts[slot][rank - 1] += weight
+                self.rank_sums[slot] += rank * weight
+                self.ranked_counts[slot] += weight
+
+        top = [trait_registry.index[name] for name in ranking.top(TOP_K)]
+        for a in top:
+            row = self.top_pairs[a]
+            for b in top:
+                row[b] += weight
+
+        if not top:
+            return
+        domain_counts = ranking.domain_counts(TOP_K)
+        for domain, count in domain_counts.items():
+            self.domain_top_counts[domain] += count * weight
+        self.dominant_domain_counts[self._dominant_domain(top, domain_counts)] += weight
+
+    @staticmethod
+    def _dominant_domain(top: List[int], domain_counts: Dict[str, int]) -> str:
+        """Domain with the most top-set traits; ties go to the domain of the higher-ranked trait"""
+        most = max(domain_counts.values())
+        return next(trait_registry.domain_of[slot] for slot in top
+                    if domain_counts[trait_registry.domain_of[slot]] == most)
+
+    def add_many(self, candidates: List[Tuple[str, TraitRanking]]):
+        """Add candidates not yet counted in bulk (vectorized when NumPy is available)"""
+        new = []
+        for user_id, ranking in candidates:
+            if user_id not in self.members:
+                self.members[user_id] = ranking.to_bytes()
+                new.append(self.members[user_id])
+        if not new:
+            return
+
+        try:
+            import numpy
+        except ImportError:
+            for data in new:
+                self.candidates += 1
+                self._apply(TraitRanking.from_bytes(data), 1)
+            return
+
+        self.candidates += len(new)
+        self._apply_matrix(numpy, numpy.frombuffer(b"".join(new), dtype=numpy.int8).reshape(len(new), -1))
+
+    def _apply_matrix(self, np, ranks):
+        """The same updates as _apply for an (n, 34) int8 matrix of ranks"""
+        size = trait_registry.size
+        slots = np.arange(size)
+
+        ranked = (ranks >= 1) & (ranks <= size)
+        cells = (slots * size + ranks.astype(np.int64) - 1)[ranked]
+        rank_counts = np.bincount(cells, minlength=size * size).reshape(size, size)
+        rank_sums = np.where(ranked, ranks, 0).sum(axis=0, dtype=np.int64)
+        ranked_counts = ranked.sum(axis=0)
+
+        # Top set: the K best ranks, ties in registry order, unranked traits never included
+        keys = np.where(ranks > 0, ranks, _UNRANKED)
+        order = np.argsort(keys, axis=1, kind="stable")[:, :TOP_K]
+        in_top = np.take_along_axis(keys, order, axis=1) < _UNRANKED
+        top = np.zeros(ranks.shape, dtype=bool)
+        np.put_along_axis(top, order, in_top, axis=1)
+        top_int = top.astype(np.int64)
+        top_pairs = top_int.T @ top_int
+
+        domain_members = np.array([[domain_of == domain for domain in self.domains]
+                                   for domain_of in trait_registry.domain_of], dtype=np.int64)
+        domain_counts = top_int @ domain_members
+        # Best top-set rank held by each domain, for the dominant-domain tie break
+        best_rank = np.stack([np.where(top & domain_members[:, d].astype(bool), keys, _UNRANKED).min(axis=1)
+                              for d in range(len(self.domains))], axis=1)
+        dominant = np.argmax(domain_counts * 256 - best_rank, axis=1)[top.any(axis=1)]
+        dominant_counts = np.bincount(dominant, minlength=len(self.domains))
+
+        for slot in range(size):
+            counts = self.rank_counts[slot]
+            pairs = self.top_pairs[slot]
+            for other in range(size):
+                counts[other] += int(rank_counts[slot, other])
+                pairs[other] += int(top_pairs[slot, other])
+            self.rank_sums[slot] += int(rank_sums[slot])
+            self.ranked_counts[slot] += int(ranked_counts[slot])
+        for d, domain in enumerate(self.domains):
+            self.domain_top_counts[domain] += int(domain_counts[:, d].sum())
+            self.dominant_domain_counts[domain] += int(dominant_counts[d])
+
+
+class AnalyticsService:
+    """Cohort statistics over finalized candidates, served from cached views"""
+
+    VIEWS = ("summary", "rank-histograms", "domains", "co-occurrence")
+
+    def __init__(self, sheets_service):
+        self.sheets_service = sheets_service
+        self.aggregates = CohortAggregates()
+        self.rebuilt_at: Optional[str] = None
+        self._views: Dict[str, Any] = {}
+        # Candidates recorded while a rebuild is reading the results store
+        self._recorded_during_rebuild: Optional[List[Tuple[str, TraitRanking]]] = None
+
+    def record(self, user_id: str, trait_rankings: Dict[str, int]):
+        """Count a newly finalized candidate (O(34))"""
+        ranking = TraitRanking.coerce(trait_rankings)
+        if self.aggregates.add(user_id, ranking):
+            self._views.clear()
+        if self._recorded_during_rebuild is not None:
+            self._recorded_during_rebuild.append((user_id, ranking))
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Recompute every aggregate from Final_Results, a chunk of candidates at a time"""
+        if self._recorded_during_rebuild is not None:
+            raise RuntimeError("An analytics rebuild is already running")
+
+        started = datetime.now()
+        self._recorded_during_rebuild = []
+        try:
+            aggregates = CohortAggregates()
+            chunk = []
+            async for user_id, _, trait_rankings in self.sheets_service.iter_final_results():
+                chunk.append((user_id, TraitRanking.from_dict(trait_rankings)))
+                if len(chunk) >= REBUILD_CHUNK_SIZE:
+                    aggregates.add_many(chunk)
+                    chunk = []
+            aggregates.add_many(chunk)
+
+            for user_id, ranking in self._recorded_during_rebuild:
+                aggregates.add(user_id, ranking)
+
+            self.aggregates = aggregates
+            self.rebuilt_at = datetime.now().isoformat()
+            self._views.clear()
+        finally:
+            self._recorded_during_rebuild = None
+
+        seconds = (datetime.now() - started).total_seconds()
+        logger.info("Rebuilt cohort analytics for %s candidates in %.2fs", aggregates.candidates, seconds)
+        return {"candidates": aggregates.candidates, "rebuiltAt": self.rebuilt_at, "seconds": round(seconds, 3)}
+
+    def view(self, name: str) -> Dict[str, Any]:
+        """A named view of the aggregates, computed once per change"""
+        if name not in self.VIEWS:
+            raise KeyError(name)
+        view = self._views.get(name)
+        if view is None:
+            builders = {
+                "summary": self._summary,
+                "rank-histograms": self._rank_histograms,
+                "domains": self._domains,
+                "co-occurrence": self._co_occurrence
+            }
+            view = builders[name](self.aggregates)
+            view.update(candidates=self.aggregates.candidates, rebuiltAt=self.rebuilt_at)
+            self._views[name] = view
+        return view
+
+    @staticmethod
+    def _mean(total: int, count: int) -> Optional[float]:
+        return round(total / count, 2) if count else None
+
+    @staticmethod
+    def _share(count: int, total: int) -> float:
+        return round(count / total, 4) if total else 0.0
+
+    def _summary(self, aggregates: CohortAggregates) -> Dict[str, Any]:
+        traits = [
+            {
+                "name": name,
+                "domain": trait_registry.domain_of[slot],
+                "meanRank": self._mean(aggregates.rank_sums[slot], aggregates.ranked_counts[slot]),
+                "topShare": self._share(aggregates.top_pairs[slot][slot], aggregates.candidates)
+            }
+            for slot, name in enumerate(trait_registry.names)
+        ]
+        traits.sort(key=lambda trait: (trait["meanRank"] is None, trait["meanRank"]))
+        return {"topK": TOP_K, "traits": traits, "domains": self._domains(aggregates)["domains"]}
+
+    def _rank_histograms(self, aggregates: CohortAggregates) -> Dict[str, Any]:
+        return {
+            "ranks": list(range(1, trait_registry.size + 1)),
+            "traits": {name: aggregates.rank_counts[slot].tolist() for slot, name in enumerate(trait_registry.names)}
+        }
+
+    def _domains(self, aggregates: CohortAggregates) -> Dict[str, Any]:
+        domains = {}
+        for domain, mask in trait_registry.domain_masks.items():
+            slots = [slot for slot in range(trait_registry.size) if mask >> slot & 1]
+            domains[domain] = {
+                "traits": [trait_registry.names[slot] for slot in slots],
+                "meanRank": self._mean(sum(aggregates.rank_sums[slot] for slot in slots),
+                                       sum(aggregates.ranked_counts[slot] for slot in slots)),
+                "topSlots": aggregates.domain_top_counts[domain],
+                "topShare": self._share(aggregates.domain_top_counts[domain], aggregates.candidates * TOP_K),
+                "dominantCount": aggregates.dominant_domain_counts[domain],
+                "dominantShare": self._share(aggregates.dominant_domain_counts[domain], aggregates.candidates)
+            }
+        return {"topK": TOP_K, "domains": domains}
+
+    def _co_occurrence(self, aggregates: CohortAggregates) -> Dict[str, Any]:
+        return {
+            "topK": TOP_K,
+            "traits": list(trait_registry.names),
+            "counts": [row.tolist() for row in aggregates.top_pairs]
+        }
@@ -1,24 +1,135 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import math
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime
-from .sheets_service import SheetsService
+from .sheets_service import SheetsService, response_from_record
 from .nvidia_ai_service import NvidiaAIService
-from .ai_prompts_service import get_all_strengths
-from models.schemas import UserCreate, UserResponse, TraitScore, FinalResults
+from .trait_ranking_service import TraitRanking, trait_registry
+from .id_service import generate_user_id
+from .logging_service import get_logger
+from .tracing_service import traced
+from models.schemas import UserCreate, UserResponse, TraitScore, FinalResults, CandidateProfile, FinalReport
+
+logger = get_logger(__name__)
+
+# Per-user caches keep at most this many users, each for at most this long since last written
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "86400"))
+
+_MISSING = object()
+
+class _UserCache:
+    """Per-user values evicted least recently used first once full, or when expired.
+    Values matching `pinned` (e.g. a held lock) are skipped by size eviction."""
+    
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None,
+                 on_evict: Callable[[str], None] = None, pinned: Callable[[Any], bool] = None):
+        self.max_entries = max_entries or USER_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or USER_CACHE_TTL_SECONDS
+        self.on_evict = on_evict
+        self.pinned = pinned
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, user_id: str, default: Any = None) -> Any:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            self._evict(user_id)
+            return default
+        self._entries.move_to_end(user_id)
+        return entry[1]
+    
+    def __contains__(self, user_id: str) -> bool:
+        return self.get(user_id, _MISSING) is not _MISSING
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __setitem__(self, user_id: str, value: Any):
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(user_id)
+        for _ in range(len(self._entries)):
+            if len(self._entries) <= self.max_entries:
+                break
+            oldest, (_, oldest_value) = next(iter(self._entries.items()))
+            if oldest == user_id:
+                # Everything older is pinned; stay over the bound rather than drop the new value
+                break
+            if self.pinned is not None and self.pinned(oldest_value):
+                self._entries.move_to_end(oldest)
+            else:
+                self._evict(oldest)
+    
+    def setdefault(self, user_id: str, default: Any) -> Any:
+        value = self.get(user_id, _MISSING)
+        if value is _MISSING:
+            self[user_id] = value = default
+        return value
+    
+    def add(self, user_id: str):
+        """Set-style membership (e.g. finalized users)"""
+        self[user_id] = True
+    
+    def pop(self, user_id: str, default: Any = None) -> Any:
+        entry = self._entries.pop(user_id, None)
+        return default if entry is None else entry[1]
+    
+    def _evict(self, user_id: str):
+        self._entries.pop(user_id, None)
+        if self.on_evict is not None:
+            self.on_evict(user_id)
 
 class AssessmentService:
-    def __init__(self, sheets_service: SheetsService, ai_service: NvidiaAIService):
+    def __init__(self, sheets_service: SheetsService, ai_service: NvidiaAIService, analytics_service=None):
         self.sheets_service = sheets_service
         self.ai_service = ai_service  # NVIDIA AI Service!
+        # Cohort analytics are updated as each candidate's results are committed
+        self.analytics_service = analytics_service
         
-        # Store trait rankings during assessment
+        # Store trait rankings during assessment (a 34-byte TraitRanking per user)
         self.user_trait_rankings = {}
+        
+        # Finalized results are committed once per user, then served from cache.
+        # The caches are bounded; an evicted user is reloaded from Final_Results.
+        self.final_results = _UserCache(on_evict=self._evict_final_results)
+        self.final_results_etags = {}
+        self.finalized_users = _UserCache()
+        self._finalize_locks = _UserCache(pinned=asyncio.Lock.locked)
+        
+        # Profile fields captured at registration, so reports don't re-read User_Profiles
+        self.user_profiles = _UserCache()
+        
+        # Assembled final reports (summary + results + profile), memoized per user
+        self.final_reports = _UserCache(on_evict=self._evict_final_report)
+        self.final_report_etags = {}
+        self._report_locks = _UserCache(pinned=asyncio.Lock.locked)
+    
+    def _evict_final_results(self, user_id: str):
+        """Drop the ETag and (unless held) the finalize lock together with evicted results"""
+        self.final_results_etags.pop(user_id, None)
+        lock = self._finalize_locks.get(user_id)
+        if lock is not None and not lock.locked():
+            self._finalize_locks.pop(user_id)
+    
+    def _evict_final_report(self, user_id: str):
+        """Drop the ETag and (unless held) the report lock together with an evicted report"""
+        self.final_report_etags.pop(user_id, None)
+        lock = self._report_locks.get(user_id)
+        if lock is not None and not lock.locked():
+            self._report_locks.pop(user_id)
     
+    @traced()
     async def create_user(self, user_data: UserCreate) -> UserResponse:
         """Create a new user and return user response"""
         try:
-            # Generate unique user ID
-            user_id = f"U{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            # Generate unique, time-sortable user ID (safe across workers)
+            user_id = generate_user_id()
             
             # Prepare user data for saving (only fields that exist in Google Sheets)
             user_dict = {
@@ -34,6 +145,12 @@ class AssessmentService:
             
             # Save user info to Google Sheets
             await self.sheets_service.save_user_info(user_dict)
+            self.user_profiles[user_id] = CandidateProfile(
+                userId=user_id,
+                name=user_data.name,
+                age=user_data.age,
+                experience=user_data.experience
+            )
             
             # Return user response
             return UserResponse(
@@ -58,6 +175,7 @@ class AssessmentService:
         except Exception as e:
             raise Exception(f"Failed to get fixed questions: {str(e)}")
     
+    @traced()
     async def submit_initial_responses(self, user_id: str, responses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Submit initial assessment responses and analyze them"""
         try:
@@ -77,7 +195,7 @@ class AssessmentService:
             trait_rankings = await self.ai_service.analyze_initial_responses(response_dicts, questions)
             
             # Store trait rankings for this user
-            self.user_trait_rankings[user_id] = trait_rankings
+            self.user_trait_rankings[user_id] = TraitRanking.coerce(trait_rankings)
             
             return {
                 "success": True,
@@ -88,6 +206,7 @@ class AssessmentService:
         except Exception as e:
             raise Exception(f"Failed to submit initial responses: {str(e)}")
     
+    @traced()
     async def generate_follow_up_questions(self, user_id: str, round_num: int) -> List[Dict[str, Any]]:
         """Generate personalized follow-up questions"""
         try:
@@ -103,10 +222,13 @@ class AssessmentService:
             
             # If no trait rankings in memory, try to regenerate from initial responses
             if not trait_rankings and round_num == 1:
-                initial_responses = await self.sheets_service.get_user_responses(user_id, "User_Responses")
+                # Round 1 already read the initial responses above (stored records, not API responses)
+                initial_responses = [response_from_record(record) for record in previous_responses]
                 if initial_responses:
-                    trait_rankings = await self.ai_service.analyze_trait_rankings(initial_responses)
-                    self.user_trait_rankings[user_id] = trait_rankings
+                    trait_rankings = await self.ai_service.analyze_initial_responses(
+                        initial_responses, await self.sheets_service.get_fixed_questions()
+                    )
+                    self.user_trait_rankings[user_id] = TraitRanking.coerce(trait_rankings)
             
             # Generate questions using LLM
             questions = await self.ai_service.generate_follow_up_questions(
@@ -120,9 +242,10 @@ class AssessmentService:
             return questions
             
         except Exception as e:
-            print(f"ERROR: Failed to generate follow-up questions: {str(e)}")
+            logger.error("Failed to generate follow-up questions: %s", e)
             raise Exception(f"Failed to generate follow-up questions: {str(e)}")
     
+    @traced()
     async def submit_follow_up_responses(self, user_id: str, responses: List[Dict[str, Any]], round_num: int) -> Dict[str, Any]:
         """Submit follow-up responses and update trait rankings"""
         try:
@@ -144,7 +267,19 @@ class AssessmentService:
             )
             
             # Store updated rankings
-            self.user_trait_rankings[user_id] = updated_rankings
+            self.user_trait_rankings[user_id] = TraitRanking.coerce(updated_rankings)
+            
+            # The last round completes the assessment - commit final results once
+            if round_num == 2:
+                await self.finalize_results(user_id)
+                if user_id not in self.finalized_users:
+                    # The responses are saved; the write is retried when the report is requested
+                    logger.warning("Final results for %s were not saved", user_id)
+                    return {
+                        "success": False,
+                        "message": "Follow-up responses for round 2 were saved, but the final results could not be saved yet",
+                        "timestamp": datetime.now().isoformat()
+                    }
             
             return {
                 "success": True,
@@ -155,6 +290,15 @@ class AssessmentService:
         except Exception as e:
             raise Exception(f"Failed to submit follow-up responses: {str(e)}")
     
+    async def _get_responses(self, user_id: str, sheet_names: List[str]) -> List[Dict[str, Any]]:
+        """Read several response sheets in one batch request, concatenated in sheet order"""
+        responses_by_sheet = await self.sheets_service.get_user_responses_batch(user_id, sheet_names)
+        all_responses = []
+        for sheet_name in sheet_names:
+            all_responses.extend(responses_by_sheet.get(sheet_name, []))
+        return all_responses
+    
+    @traced()
     async def generate_initial_summary(self, user_id: str) -> str:
         """Generate initial personality summary"""
         try:
@@ -174,19 +318,13 @@ class AssessmentService:
         except Exception as e:
             raise Exception(f"Failed to generate initial summary: {str(e)}")
     
+    @traced()
     async def generate_follow_up_summary(self, user_id: str, round_num: int) -> str:
         """Generate follow-up summary after each round"""
         try:
             # Get all user responses up to this point
-            all_responses = []
-            initial_responses = await self.sheets_service.get_user_responses(user_id, "initial")
-            follow_up_1_responses = await self.sheets_service.get_user_responses(user_id, "follow_up_1")
-            all_responses.extend(initial_responses)
-            all_responses.extend(follow_up_1_responses)
-            
-            if round_num == 2:
-                follow_up_2_responses = await self.sheets_service.get_user_responses(user_id, "follow_up_2")
-                all_responses.extend(follow_up_2_responses)
+            sheet_names = ["initial", "follow_up_1"] + (["follow_up_2"] if round_num == 2 else [])
+            all_responses = await self._get_responses(user_id, sheet_names)
             
             # Get current trait rankings
             trait_rankings = self.user_trait_rankings.get(user_id, {})
@@ -201,24 +339,23 @@ class AssessmentService:
         except Exception as e:
             raise Exception(f"Failed to generate follow-up summary: {str(e)}")
     
-    async def generate_final_summary(self, user_id: str) -> str:
-        """Generate final comprehensive personality summary"""
+    @traced()
+    async def generate_final_summary(self, user_id: str, allow_fallback: bool = True) -> Optional[str]:
+        """Generate final comprehensive personality summary (None on LLM failure unless allow_fallback)"""
+        report = self.final_reports.get(user_id)
+        if report is not None:
+            return report.summary
+        
         try:
             # Get all user responses
-            all_responses = []
-            initial_responses = await self.sheets_service.get_user_responses(user_id, "initial")
-            follow_up_1_responses = await self.sheets_service.get_user_responses(user_id, "follow_up_1")
-            follow_up_2_responses = await self.sheets_service.get_user_responses(user_id, "follow_up_2")
-            all_responses.extend(initial_responses)
-            all_responses.extend(follow_up_1_responses)
-            all_responses.extend(follow_up_2_responses)
+            all_responses = await self._get_responses(user_id, ["initial", "follow_up_1", "follow_up_2"])
             
             # Get final trait rankings
             trait_rankings = self.user_trait_rankings.get(user_id, {})
             
             # Generate final summary using LLM
             summary = await self.ai_service.generate_summary(
-                user_id, all_responses, trait_rankings, "final"
+                user_id, all_responses, trait_rankings, "final", allow_fallback=allow_fallback
             )
             
             return summary
@@ -226,70 +363,189 @@ class AssessmentService:
         except Exception as e:
             raise Exception(f"Failed to generate final summary: {str(e)}")
     
-    async def get_final_results(self, user_id: str) -> FinalResults:
-        """Get final trait rankings and complete results"""
+    def _build_final_results(self, user_id: str, user_name: str, trait_rankings: Dict[str, int], timestamp: str) -> FinalResults:
+        """Normalize trait rankings into a FinalResults object"""
+        # Validate and clean trait rankings (unknown trait names are dropped)
+        cleaned_rankings = TraitRanking.coerce(trait_rankings)
+        if len(cleaned_rankings) < len(trait_rankings):
+            for trait_name in trait_rankings:
+                if trait_name not in cleaned_rankings:
+                    logger.debug("Skipping invalid trait in final results: %s", trait_name)
+        
+        # Ensure we have exactly 34 traits
+        if len(cleaned_rankings) != trait_registry.size:
+            logger.debug("Invalid trait count in final results: %s, expected 34", len(cleaned_rankings))
+            # If we don't have exactly 34, we need to fix this
+            scores = cleaned_rankings.to_dict()
+            missing_traits = set(trait_registry.names) - set(scores)
+            # Add missing traits with default rankings
+            for i, trait in enumerate(missing_traits):
+                scores[trait] = 34 - i  # Give them lower rankings
+            
+            # Normalize rankings to ensure they're 1-34
+            cleaned_rankings = TraitRanking.from_scores(scores)
+        
+        # Convert to TraitScore objects, strongest first
+        traits = []
+        for trait_name, ranking in cleaned_rankings.ranked_items():
+            # Calculate score from ranking (higher rank = lower score)
+            score = (35 - ranking) / 34 * 100  # Convert to 0-100 scale
+            traits.append(TraitScore(
+                name=trait_name,
+                ranking=ranking,
+                score=score
+            ))
+        
+        return FinalResults(
+            userId=user_id,
+            name=user_name,
+            traits=traits,
+            timestamp=timestamp,
+            assessmentAccuracy=96.0  # Mock accuracy score
+        )
+    
+    def _cache_final_results(self, results: FinalResults) -> FinalResults:
+        """Store finalized results together with a content-based ETag"""
+        fingerprint = json.dumps(
+            [results.userId, results.name, [[t.name, t.ranking] for t in results.traits]],
+            separators=(',', ':')
+        )
+        self.final_results[results.userId] = results
+        self.final_results_etags[results.userId] = f'"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+        return results
+    
+    def get_results_etag(self, user_id: str) -> Optional[str]:
+        """Return the ETag of the cached final results, if any"""
+        if user_id not in self.final_results:
+            return None
+        return self.final_results_etags.get(user_id)
+    
+    @traced()
+    async def finalize_results(self, user_id: str) -> FinalResults:
+        """Commit final trait rankings to Google Sheets once and cache the results"""
         try:
-            # Get trait rankings
-            trait_rankings = self.user_trait_rankings.get(user_id, {})
+            lock = self._finalize_locks.setdefault(user_id, asyncio.Lock())
+            async with lock:
+                results = self.final_results.get(user_id)
+                
+                if results is None:
+                    trait_rankings = self.user_trait_rankings.get(user_id, {})
+                    
+                    if not trait_rankings:
+                        raise Exception("No trait rankings found for user")
+                    
+                    profile = self.user_profiles.get(user_id)
+                    user_name = profile.name if profile else await self.sheets_service.get_user_name(user_id)
+                    results = self._build_final_results(
+                        user_id, user_name, trait_rankings, datetime.now().isoformat()
+                    )
+                    self._cache_final_results(results)
+                
+                # Only write once; a failed write is retried on the next finalize call
+                if user_id not in self.finalized_users:
+                    trait_rankings = {trait.name: trait.ranking for trait in results.traits}
+                    saved = await self.sheets_service.save_final_results(user_id, results.name, trait_rankings)
+                    if saved:
+                        self.finalized_users.add(user_id)
+                        if self.analytics_service is not None:
+                            self.analytics_service.record(user_id, trait_rankings)
+                
+                return results
             
-            if not trait_rankings:
-                raise Exception("No trait rankings found for user")
+        except Exception as e:
+            raise Exception(f"Failed to finalize results: {str(e)}")
+    
+    @traced()
+    async def get_final_results(self, user_id: str) -> Optional[FinalResults]:
+        """Get finalized trait rankings without writing anything (None if not finalized)"""
+        try:
+            results = self.final_results.get(user_id)
+            if results is not None:
+                return results
             
-            # Validate and clean trait rankings
-            valid_traits = get_all_strengths()  # Get the 34 valid traits
-            cleaned_rankings = {}
+            # Results may have been finalized by another worker - load the stored copy
+            stored = await self.sheets_service.get_final_results(user_id)
+            if not stored or not stored.get("trait_rankings"):
+                return None
             
-            for trait_name, ranking in trait_rankings.items():
-                if trait_name in valid_traits:
-                    cleaned_rankings[trait_name] = ranking
-                else:
-                    print(f"DEBUG: Skipping invalid trait in final results: {trait_name}")
-            
-            # Ensure we have exactly 34 traits
-            if len(cleaned_rankings) != 34:
-                print(f"DEBUG: Invalid trait count in final results: {len(cleaned_rankings)}, expected 34")
-                # If we don't have exactly 34, we need to fix this
-                missing_traits = set(valid_traits) - set(cleaned_rankings.keys())
-                if missing_traits:
-                    # Add missing traits with default rankings
-                    for i, trait in enumerate(missing_traits):
-                        cleaned_rankings[trait] = 34 - i  # Give them lower rankings
-                
-                # Normalize rankings to ensure they're 1-34
-                sorted_traits = sorted(cleaned_rankings.items(), key=lambda x: x[1])
-                cleaned_rankings = {}
-                for i, (trait, _) in enumerate(sorted_traits):
-                    cleaned_rankings[trait] = i + 1
-            
-            # Convert to TraitScore objects
-            traits = []
-            for trait_name, ranking in cleaned_rankings.items():
-                # Calculate score from ranking (higher rank = lower score)
-                score = (35 - ranking) / 34 * 100  # Convert to 0-100 scale
-                traits.append(TraitScore(
-                    name=trait_name,
-                    ranking=ranking,
-                    score=score
-                ))
-            
-            # Sort by ranking
-            traits.sort(key=lambda x: x.ranking)
-            
-            # Save to Google Sheets with trait rankings
-            user_name = await self.sheets_service.get_user_name(user_id)
-            await self.sheets_service.save_final_results(user_id, user_name, trait_rankings)
-            
-            return FinalResults(
-                userId=user_id,
-                name=user_name,
-                traits=traits,
-                timestamp=datetime.now().isoformat(),
-                assessmentAccuracy=96.0  # Mock accuracy score
+            results = self._build_final_results(
+                user_id, stored["user_name"], stored["trait_rankings"], datetime.now().isoformat()
             )
+            self.finalized_users.add(user_id)
+            return self._cache_final_results(results)
             
         except Exception as e:
             raise Exception(f"Failed to get final results: {str(e)}")
     
+    async def _results_for_report(self, user_id: str) -> FinalResults:
+        """Finalized results for the report, committing them first if that step was missed or failed"""
+        if user_id in self.finalized_users:
+            results = self.final_results.get(user_id)
+            if results is not None:
+                return results
+        if user_id not in self.final_results and user_id not in self.user_trait_rankings:
+            # Nothing to commit here - another worker may have finalized them
+            results = await self.get_final_results(user_id)
+            if results is not None:
+                return results
+        # Retries a Final_Results write that failed earlier (e.g. a 429)
+        return await self.finalize_results(user_id)
+    
+    @traced()
+    async def get_final_report(self, user_id: str) -> FinalReport:
+        """Assemble the final summary, ranked traits and profile in one pass (memoized)"""
+        report = self.final_reports.get(user_id)
+        if report is not None:
+            return report
+        
+        try:
+            lock = self._report_locks.setdefault(user_id, asyncio.Lock())
+            async with lock:
+                report = self.final_reports.get(user_id)
+                if report is not None:
+                    return report
+                
+                # The summary (response reads + LLM) and the results are independent
+                summary, results = await asyncio.gather(
+                    self.generate_final_summary(user_id, allow_fallback=False),
+                    self._results_for_report(user_id)
+                )
+                
+                # A canned summary is served but not memoized, so the next request asks the LLM again
+                memoize = summary is not None
+                if summary is None:
+                    summary = self.ai_service.fallback_summary(
+                        {trait.name: trait.ranking for trait in results.traits}
+                    )
+                
+                profile = self.user_profiles.get(user_id) or CandidateProfile(userId=user_id, name=results.name)
+                report = FinalReport(
+                    userId=user_id,
+                    profile=profile,
+                    summary=summary,
+                    results=results,
+                    generatedAt=datetime.now().isoformat()
+                )
+                
+                if not memoize:
+                    return report
+                
+                fingerprint = json.dumps(
+                    [self.get_results_etag(user_id), profile.name, summary], separators=(',', ':')
+                )
+                self.final_reports[user_id] = report
+                self.final_report_etags[user_id] = f'"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+                return report
+            
+        except Exception as e:
+            raise Exception(f"Failed to build final report: {str(e)}")
+    
+    def get_report_etag(self, user_id: str) -> Optional[str]:
+        """Return the ETag of the memoized final report, if any"""
+        if user_id not in self.final_reports:
+            return None
+        return self.final_report_etags.get(user_id)
+    
     async def calculate_match_score(self, user_traits: List[TraitScore], ideal_traits: List[TraitScore]) -> float:
         """Calculate match score using the piecewise weight function"""
         try:
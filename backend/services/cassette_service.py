@@ -0,0 +1,271 @@
+"""
+HTTP Record/Replay Cassettes
+A requests transport adapter mounted on the OpenRouter and Google Sheets
+sessions. In record mode every request/response pair is captured to a
+gzip-compressed JSON Lines cassette per service; in replay mode the same
+requests are answered from the cassette without touching the network, so
+benchmarks and parsing/scoring experiments can be repeated offline exactly.
+
+Configured with environment variables:
+    HTTP_CASSETTE_MODE      off (default), record or replay
+    HTTP_CASSETTE_DIR       cassette directory (default: cassettes)
+    HTTP_CASSETTE_LATENCY   replay the recorded latency scaled by this factor (default 0, no delay)
+
+Only what is needed to answer a request again is stored: the method, URL,
+a hash of the request body, the response status, content type, body and
+latency. Request headers (API keys, OAuth tokens) are never written.
+
+Each process records to its own <name>.<pid>.jsonl.gz file (gunicorn runs
+several workers), and every interaction is written and flushed as its own
+gzip member, so a crashed recording stays readable up to its last complete
+interaction. Recording appends: start from an empty HTTP_CASSETTE_DIR for a
+fresh cassette. Replay merges every file of a service in recorded order.
+"""
+
+import atexit
+import base64
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .logging_service import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# Response headers worth keeping (bodies are stored decoded, so Content-Encoding is dropped too)
+_KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """A replayed request that was never recorded (handled like a network failure)"""
+
+
+def _body_hash(body: Any) -> str:
+    """Hash of a request body; JSON bodies are canonicalised so key order does not matter"""
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class Cassette:
+    """Interactions of one service, recorded to <dir>/<name>.<pid>.jsonl.gz or replayed from all of its files"""
+
+    def __init__(self, name: str, mode: str, directory: str, latency_scale: float = 0.0):
+        self.name = name
+        self.mode = mode
+        self.directory = directory
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+        self._closed = False
+        # Replay indexes: (method, url, body hash) and (method, url) -> interactions in recorded order
+        self._exact: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._loose: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.recorded = 0
+        self.replayed = 0
+
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+        elif mode == "replay":
+            self._load()
+
+    @property
+    def path(self) -> str:
+        """File this process records to"""
+        return os.path.join(self.directory, f"{self.name}.{os.getpid()}.jsonl.gz")
+
+    def paths(self) -> List[str]:
+        """Every recorded file of this service (including a single-file <name>.jsonl.gz cassette)"""
+        return sorted(glob.glob(os.path.join(self.directory, f"{self.name}.jsonl.gz"))
+                      + glob.glob(os.path.join(self.directory, f"{self.name}.*.jsonl.gz")))
+
+    def _load(self):
+        paths = self.paths()
+        if not paths:
+            logger.warning("No %s cassette in %s; every request will miss", self.name, self.directory)
+            return
+        interactions = []
+        for path in paths:
+            interactions.extend(self._read(path))
+        # Files are merged in recorded order (sort is stable within a file)
+        interactions.sort(key=lambda interaction: interaction.get("recordedAt", 0))
+        for interaction in interactions:
+            interaction["used"] = False
+            method, url = interaction["method"], interaction["url"]
+            self._exact.setdefault((method, url, interaction["bodyHash"]), []).append(interaction)
+            self._loose.setdefault((method, url), []).append(interaction)
+        logger.info("Loaded %s %s interactions from %s files", len(interactions), self.name, len(paths))
+
+    @staticmethod
+    def _read(path: str) -> List[Dict[str, Any]]:
+        """Interactions of one file, up to the last complete one if the recording was cut short"""
+        interactions = []
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    interactions.append(json.loads(line))
+        except (EOFError, gzip.BadGzipFile, ValueError) as e:
+            logger.warning("Cassette %s is truncated after %s interactions: %s", path, len(interactions), e)
+        return interactions
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float):
+        content = response.content
+        try:
+            body, encoding = content.decode("utf-8"), None
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        interaction = {
+            "method": request.method,
+            "url": request.url,
+            "bodyHash": _body_hash(request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            "body": body,
+            "elapsed": round(elapsed, 4),
+            "recordedAt": time.time()
+        }
+        if encoding:
+            interaction["encoding"] = encoding
+        # One complete gzip member per interaction, so a crash never leaves a half-written stream behind
+        member = gzip.compress((json.dumps(interaction, separators=(",", ":")) + "\n").encode("utf-8"))
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None or self._pid != os.getpid():
+                # First write, or first write after a fork: every process gets its own file
+                self._pid = os.getpid()
+                self._file = open(self.path, "ab")
+            self._file.write(member)
+            self._file.flush()
+            self.recorded += 1
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        """The recorded response for a request: the next unused exact match (same body), else the next
+        unused one for the same method and URL (bodies with timestamps), else the last one seen"""
+        exact = self._exact.get((request.method, request.url, _body_hash(request.body)), [])
+        loose = self._loose.get((request.method, request.url), [])
+        with self._lock:
+            interaction = next((i for i in exact if not i["used"]), None) \
+                or next((i for i in loose if not i["used"]), None) \
+                or (exact or loose or [None])[-1]
+            if interaction is None:
+                raise CassetteMiss(f"No recorded {self.name} interaction for {request.method} {request.url}",
+                                   request=request)
+            interaction["used"] = True
+            self.replayed += 1
+
+        if self.latency_scale > 0:
+            time.sleep(interaction["elapsed"] * self.latency_scale)
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction.get("reason")
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        body = interaction["body"]
+        response._content = base64.b64decode(body) if interaction.get("encoding") == "base64" else body.encode("utf-8")
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=interaction["elapsed"])
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info("Recorded %s %s interactions to %s", self.recorded, self.name, self.path)
+            self._closed = True
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records real traffic or replays it from a cassette"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(request)
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        self.cassette.record(request, response, time.perf_counter() - started)
+        return response
+
+
+class CassetteRegistry:
+    """One cassette per service, in the mode chosen by HTTP_CASSETTE_MODE"""
+
+    def __init__(self, mode: str = "off", directory: str = "cassettes", latency_scale: float = 0.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown HTTP_CASSETTE_MODE {mode!r}, expected one of {', '.join(CASSETTE_MODES)}")
+        self.mode = mode
+        self.directory = directory
+        self.latency_scale = latency_scale
+        self._cassettes: Dict[str, Cassette] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CassetteRegistry":
+        return cls(
+            mode=os.getenv("HTTP_CASSETTE_MODE", "off").strip().lower() or "off",
+            directory=os.getenv("HTTP_CASSETTE_DIR", "cassettes"),
+            latency_scale=float(os.getenv("HTTP_CASSETTE_LATENCY", "0"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def cassette(self, name: str) -> Optional[Cassette]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if name not in self._cassettes:
+                self._cassettes[name] = Cassette(name, self.mode, self.directory, self.latency_scale)
+            return self._cassettes[name]
+
+    def mount(self, session: requests.Session, name: str) -> requests.Session:
+        """Route every request of the session through the service's cassette (no-op when off)"""
+        cassette = self.cassette(name)
+        if cassette is not None:
+            adapter = CassetteAdapter(cassette)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Flush recordings (also runs at interpreter exit)"""
+        with self._lock:
+            for cassette in self._cassettes.values():
+                cassette.close()
+
+
+cassette_registry = CassetteRegistry.from_env()
+atexit.register(cassette_registry.close)
@@ -0,0 +1,235 @@
+"""
+Streaming Results Export
+Streams every candidate's profile and 34 trait rankings out of Final_Results
+as CSV, Arrow IPC or Parquet. Sheets are read a page at a time and encoded in
+fixed-size chunks, so memory stays flat as the number of candidates grows;
+the only per-candidate state is a small profile index (name, age, experience)
+used to join User_Profiles onto the rankings.
+
+Date ranges are resolved from the creation time embedded in the user ids
+(the ULID time component, or the timestamp of pre-ULID ids), so no extra
+timestamp column has to be read. Arrow and Parquet need pyarrow, which
+is imported only when one of those formats is requested.
+"""
+
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from .id_service import user_id_generator
+from .logging_service import get_logger
+from .trait_ranking_service import TraitRanking, trait_registry
+
+logger = get_logger(__name__)
+
+PROFILE_COLUMNS = ["UserId", "Name", "Age", "Experience", "CreatedAt"]
+EXPORT_COLUMNS = PROFILE_COLUMNS + list(trait_registry.names)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet")
+}
+
+class ExportFormatUnavailable(Exception):
+    """Raised when a columnar format is requested but pyarrow is not installed"""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportFormatUnavailable("Arrow and Parquet export require the pyarrow package")
+    return pyarrow
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _created_at(user_id: str) -> Optional[datetime]:
+    """Creation time embedded in a user id, ULID or legacy %Y%m%d%H%M%S (None for anything else)"""
+    try:
+        return user_id_generator.timestamp_from_id(user_id)
+    except (ValueError, OverflowError):
+        return None
+
+
+def _in_range(created_at: Optional[datetime], start: Optional[datetime], end: Optional[datetime]) -> bool:
+    """Whether a creation time falls in [start, end]; naive bounds are local time, unknown times never match"""
+    if start is None and end is None:
+        return True
+    if created_at is None:
+        return False
+    if start is not None and created_at < start.astimezone():
+        return False
+    return end is None or created_at <= end.astimezone()
+
+
+class ExportService:
+    """Generator-backed export of final results"""
+
+    def __init__(self, sheets_service, chunk_rows: int = None):
+        self.sheets_service = sheets_service
+        self.chunk_rows = chunk_rows or int(os.getenv("EXPORT_CHUNK_ROWS", "500"))
+
+    def check_format(self, export_format: str):
+        """Raise ValueError / ExportFormatUnavailable before any bytes are streamed"""
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format {export_format!r}, expected one of {', '.join(EXPORT_FORMATS)}")
+        if export_format != "csv":
+            _pyarrow()
+
+    async def stream(self, export_format: str, start: datetime = None, end: datetime = None) -> AsyncIterator[bytes]:
+        """Encoded export, chunk by chunk"""
+        self.check_format(export_format)
+        encoders = {"csv": self._encode_csv, "arrow": self._encode_arrow, "parquet": self._encode_parquet}
+        encoder = encoders[export_format]()
+        data = next(encoder)
+        if data:
+            yield data
+
+        async for rows in self._chunks(start, end):
+            data = encoder.send(rows)
+            if data:
+                yield data
+        try:
+            encoder.send(None)
+        except StopIteration as stop:
+            if stop.value:
+                yield stop.value
+
+    async def _chunks(self, start: datetime = None, end: datetime = None) -> AsyncIterator[List[List[Any]]]:
+        chunk = []
+        async for row in self.iter_rows(start, end):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def iter_rows(self, start: datetime = None, end: datetime = None) -> AsyncIterator[List[Any]]:
+        """One row per candidate with final results: PROFILE_COLUMNS then the rank of each trait"""
+        profiles = await self._profile_index(start, end)
+
+        async for user_id, name, trait_rankings in self.sheets_service.iter_final_results():
+            created_at = _created_at(user_id)
+            if not _in_range(created_at, start, end):
+                continue
+            profile_name, age, experience = profiles.get(user_id, (None, None, None))
+            rankings = TraitRanking.from_dict(trait_rankings)
+            ranks = [rankings.rank(trait) for trait in trait_registry.names]
+            yield [user_id, profile_name or name, age, experience, created_at] + ranks
+
+    async def _profile_index(self, start: datetime = None, end: datetime = None) -> Dict[str, Tuple[str, Optional[int], Optional[int]]]:
+        """user id -> (name, age, experience) for candidates created in [start, end]"""
+        profiles = {}
+        columns = None
+        async for rows in self.sheets_service.iter_rows("User_Profiles", "H"):
+            if columns is None:
+                header = rows[0]
+                if "UserID" not in header:
+                    return profiles
+                columns = [header.index(name) if name in header else None
+                           for name in ("UserID", "Name", "Age", "Experience")]
+                rows = rows[1:]
+
+            for row in rows:
+                values = [row[i] if i is not None and i < len(row) else "" for i in columns]
+                user_id = values[0]
+                if not user_id or not _in_range(_created_at(user_id), start, end):
+                    continue
+                profiles[user_id] = (values[1], _int_or_none(values[2]), _int_or_none(values[3]))
+        return profiles
+
+    # --- Encoders ------------------------------------------------------------
+    # Generators: send a chunk of rows, get the bytes encoded so far; send None to finish.
+
+    @staticmethod
+    def _encode_csv() -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        rows = yield b""
+        while rows is not None:
+            for row in rows:
+                created_at = row[4]
+                writer.writerow(row[:4] + [created_at.isoformat() if created_at else ""] + row[5:])
+            data = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows = yield data
+        return buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _arrow_schema(pa):
+        return pa.schema(
+            [("UserId", pa.string()), ("Name", pa.string()), ("Age", pa.int16()), ("Experience", pa.int16()),
+             ("CreatedAt", pa.timestamp("ms", tz="UTC"))]
+            + [(trait, pa.int8()) for trait in trait_registry.names]
+        )
+
+    @classmethod
+    def _arrow_batch(cls, pa, schema, rows: List[List[Any]]):
+        columns = list(zip(*rows))
+        return pa.record_batch([pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                               schema=schema)
+
+    @classmethod
+    def _encode_arrow(cls) -> Iterator[bytes]:
+        pa = _pyarrow()
+        schema = cls._arrow_schema(pa)
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            rows = yield sink.drain()
+            while rows is not None:
+                writer.write_batch(cls._arrow_batch(pa, schema, rows))
+                rows = yield sink.drain()
+        return sink.drain()
+
+    @classmethod
+    def _encode_parquet(cls) -> Iterator[bytes]:
+        pa = _pyarrow()
+        schema = cls._arrow_schema(pa)
+        sink = _ChunkSink()
+        # Each chunk becomes one row group; the footer is written on close
+        with pa.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+            rows = yield sink.drain()
+            while rows is not None:
+                writer.write_batch(cls._arrow_batch(pa, schema, rows))
+                rows = yield sink.drain()
+        return sink.drain()
@@ -0,0 +1,129 @@
+"""
+Collision-free, time-sortable ID generation
+IDs follow the ULID layout (millisecond timestamp + randomness, Crockford base32)
+with an extra worker component so concurrent gunicorn workers never collide.
+"""
+
+import hashlib
+import os
+import secrets
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+# Crockford base32 keeps lexical order identical to numeric order
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+TIME_CHARS = 10     # 50 bits, enough for a 48-bit millisecond timestamp
+WORKER_CHARS = 4    # 20 bits derived from host + process
+RANDOM_CHARS = 12   # 60 bits, incremented within the same millisecond
+
+# IDs issued before ULIDs: prefix + local creation time, to the second
+LEGACY_TIME_FORMAT = "%Y%m%d%H%M%S"
+LEGACY_TIME_CHARS = 14
+
+RANDOM_BITS = RANDOM_CHARS * 5
+WORKER_BITS = WORKER_CHARS * 5
+
+
+def _encode(value: int, length: int) -> str:
+    """Encode a non-negative integer as fixed-width Crockford base32"""
+    chars = []
+    for _ in range(length):
+        chars.append(CROCKFORD_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def _decode(text: str) -> int:
+    """Decode a Crockford base32 string back to an integer"""
+    value = 0
+    for char in text:
+        value = (value << 5) | CROCKFORD_ALPHABET.index(char)
+    return value
+
+
+class IdGenerator:
+    """Monotonic, time-sortable ID generator that is unique across processes"""
+
+    def __init__(self, prefix: str = "", worker_id: int = None):
+        self.prefix = prefix
+        self._fixed_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """(Re)initialise per-process state, e.g. after a fork"""
+        self._pid = os.getpid()
+        self.worker_id = self._fixed_worker_id if self._fixed_worker_id is not None else self._default_worker_id()
+        self._last_ms = -1
+        self._last_random = 0
+
+    @staticmethod
+    def _default_worker_id() -> int:
+        """Derive a worker component from the hostname and process ID"""
+        seed = f"{socket.gethostname()}:{os.getpid()}".encode()
+        return int.from_bytes(hashlib.sha1(seed).digest()[:4], "big") & ((1 << WORKER_BITS) - 1)
+
+    def new_id(self) -> str:
+        """Generate a new ID that sorts after every ID previously generated by this process"""
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()
+
+            now_ms = int(time.time() * 1000)
+            if now_ms <= self._last_ms:
+                # Same millisecond (or the clock stepped back): stay monotonic by incrementing
+                now_ms = self._last_ms
+                self._last_random += 1
+                if self._last_random >= (1 << RANDOM_BITS):
+                    now_ms += 1
+                    self._last_random = secrets.randbits(RANDOM_BITS - 1)
+            else:
+                # Leave headroom so increments within one millisecond never overflow
+                self._last_random = secrets.randbits(RANDOM_BITS - 1)
+
+            self._last_ms = now_ms
+            random_part = self._last_random
+
+        return (
+            self.prefix
+            + _encode(now_ms, TIME_CHARS)
+            + _encode(self.worker_id, WORKER_CHARS)
+            + _encode(random_part, RANDOM_CHARS)
+        )
+
+    def timestamp_from_id(self, generated_id: str) -> datetime:
+        """Recover the creation time embedded in an ID (legacy %Y%m%d%H%M%S ids included);
+        raises ValueError for anything else"""
+        if not generated_id.startswith(self.prefix):
+            raise ValueError(f"Not a generated ID: {generated_id!r}")
+        body = generated_id[len(self.prefix):]
+        if len(body) == LEGACY_TIME_CHARS and body.isdigit():
+            return datetime.strptime(body, LEGACY_TIME_FORMAT).astimezone(timezone.utc)
+        if len(body) != TIME_CHARS + WORKER_CHARS + RANDOM_CHARS:
+            raise ValueError(f"Not a generated ID: {generated_id!r}")
+        return datetime.fromtimestamp(_decode(body[:TIME_CHARS]) / 1000, tz=timezone.utc)
+
+    def id_range(self, start: datetime = None, end: datetime = None) -> tuple:
+        """
+        Return (lower, upper) bounds so that every ID created in [start, end]
+        satisfies lower <= id <= upper - usable for range scans over sorted IDs
+        """
+        suffix_len = WORKER_CHARS + RANDOM_CHARS
+        start_ms = int(start.timestamp() * 1000) if start else 0
+        end_ms = int(end.timestamp() * 1000) if end else (1 << (TIME_CHARS * 5)) - 1
+
+        lower = self.prefix + _encode(start_ms, TIME_CHARS) + "0" * suffix_len
+        upper = self.prefix + _encode(end_ms, TIME_CHARS) + "Z" * suffix_len
+        return lower, upper
+
+
+# Shared generator for candidate IDs ("U" prefix kept for compatibility)
+user_id_generator = IdGenerator(prefix="U")
+
+
+def generate_user_id() -> str:
+    """Generate a new unique, time-sortable user ID"""
+    return user_id_generator.new_id()
@@ -0,0 +1,286 @@
+"""
+In-Process Background Jobs
+LLM-heavy requests can be queued instead of holding the HTTP connection open:
+the endpoint answers 202 with a job id and a bounded pool of asyncio workers
+runs the work in priority order (interactive question generation ahead of
+analysis, analysis ahead of summaries). A job runs in the worker that
+accepted it, but its status and result are also written to a SQLite file
+(JOB_STORE_PATH) shared by the workers on the host, so a poll that lands on
+another gunicorn worker still finds it.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import secrets
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from .logging_service import get_logger
+from .metrics_service import metrics_registry
+from .serialization_service import dumps
+from .tracing_service import start_trace, end_trace
+
+logger = get_logger(__name__)
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_ANALYSIS = 1
+PRIORITY_SUMMARY = 2
+
+JOB_WAIT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+JOB_RUN_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 180.0)
+
+# How often a worker re-reads a job that another worker is running
+JOB_STORE_POLL_SECONDS = 0.25
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class Job:
+    """A unit of queued work and its outcome"""
+
+    def __init__(self, kind: str, priority: int, user_id: str = None, key: str = None):
+        self.id = secrets.token_hex(12)
+        self.kind = kind
+        self.priority = priority
+        self.user_id = user_id
+        self.key = key
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public status representation returned by the jobs endpoints"""
+        job = {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "createdAt": _isoformat(self.created_at),
+            "startedAt": _isoformat(self.started_at),
+            "finishedAt": _isoformat(self.finished_at)
+        }
+        if self.status == "succeeded":
+            job["result"] = self.result
+        if self.status == "failed":
+            job["error"] = self.error
+        return job
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class StoredJob:
+    """Snapshot of a job another worker accepted, as last written to the job store"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.id = data["jobId"]
+        self.status = data["status"]
+        self._data = data
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._data
+
+
+class JobStore:
+    """Job statuses in a SQLite file, so every worker on the host can answer polls"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("JOB_STORE_PATH") or os.path.join(tempfile.gettempdir(), "hiring-jobs.sqlite3")
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily, so each forked worker gets its own connection
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, finished_at REAL)"
+            )
+        return self._connection
+
+    def save(self, job: Job):
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO jobs (id, data, finished_at) VALUES (?, ?, ?)",
+                (job.id, dumps(job.to_dict()).decode(), job.finished_at)
+            )
+        except sqlite3.Error as e:
+            # The accepting worker still has the job; only cross-worker polls miss it
+            logger.warning("Could not store job %s: %s", job.id, e)
+
+    def load(self, job_id: str) -> Optional[StoredJob]:
+        try:
+            row = self._connect().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Could not read job %s: %s", job_id, e)
+            return None
+        return StoredJob(json.loads(row[0])) if row else None
+
+    def prune(self, cutoff: float):
+        """Delete jobs that finished before the cutoff"""
+        try:
+            self._connect().execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+        except sqlite3.Error as e:
+            logger.warning("Could not prune stored jobs: %s", e)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class JobQueue:
+    """Priority queue drained by a fixed number of asyncio workers"""
+
+    def __init__(self, workers: int = None, max_pending: int = None, retention_seconds: float = None,
+                 store: JobStore = None):
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_pending = max_pending or int(os.getenv("JOB_MAX_PENDING", "200"))
+        self.retention_seconds = retention_seconds or float(os.getenv("JOB_RETENTION_SECONDS", "900"))
+        self.store = store or JobStore()
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks = []
+        self._sequence = itertools.count()
+        self._jobs: Dict[str, Job] = {}
+        self._active_keys: Dict[str, Job] = {}
+
+        metrics_registry.counter("jobs_total", "Background jobs by kind and final status")
+        metrics_registry.gauge("jobs_pending", "Background jobs waiting for a worker")
+        metrics_registry.histogram("job_queue_wait_seconds", "Time jobs spent queued before a worker picked them up",
+                                   JOB_WAIT_BUCKETS)
+        metrics_registry.histogram("job_run_seconds", "Time spent running jobs", JOB_RUN_BUCKETS)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self):
+        """Start the worker pool (call from the application lifespan)"""
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Cancel the workers; queued jobs are dropped (and marked failed for pollers on other workers)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for job in self._jobs.values():
+            if not job.finished:
+                job.status = "failed"
+                job.error = "Worker shut down before the job finished"
+                job.finished_at = time.time()
+                self.store.save(job)
+                job.done.set()
+        self.store.close()
+
+    def submit(self, kind: str, work: Callable[[], Awaitable[Any]], priority: int = PRIORITY_ANALYSIS,
+               user_id: str = None, key: str = None) -> Job:
+        """Queue work and return its job; a job with the same key still in flight is returned instead"""
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+
+        if key:
+            existing = self._active_keys.get(key)
+            if existing is not None and not existing.finished:
+                return existing
+
+        if self.pending >= self.max_pending:
+            raise JobQueueFull(f"{self.pending} jobs already waiting")
+
+        self._prune()
+        job = Job(kind, priority, user_id, key)
+        self._jobs[job.id] = job
+        if key:
+            self._active_keys[key] = job
+        self.store.save(job)
+        self._queue.put_nowait((priority, next(self._sequence), job, work))
+        metrics_registry.set("jobs_pending", self.pending)
+        return job
+
+    def get(self, job_id: str) -> Optional[Union[Job, StoredJob]]:
+        """This worker's job, or the stored snapshot of one another worker accepted"""
+        return self._jobs.get(job_id) or self.store.load(job_id)
+
+    async def wait(self, job: Union[Job, StoredJob], timeout: float = None) -> Union[Job, StoredJob]:
+        """Wait until the job finishes or the timeout elapses, returning its latest state"""
+        if isinstance(job, StoredJob):
+            return await self._wait_stored(job, timeout)
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _wait_stored(self, job: StoredJob, timeout: float = None) -> StoredJob:
+        """Poll the store for a job running on another worker"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not job.finished and (deadline is None or time.monotonic() < deadline):
+            await asyncio.sleep(JOB_STORE_POLL_SECONDS)
+            job = self.store.load(job.id) or job
+        return job
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if job.key and self._active_keys.get(job.key) is job:
+                del self._active_keys[job.key]
+        self.store.prune(cutoff)
+
+    async def _worker(self):
+        while True:
+            _, _, job, work = await self._queue.get()
+            metrics_registry.set("jobs_pending", self.pending)
+            try:
+                await self._run(job, work)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job, work: Callable[[], Awaitable[Any]]):
+        job.status = "running"
+        job.started_at = time.time()
+        self.store.save(job)
+        metrics_registry.observe("job_queue_wait_seconds", job.started_at - job.created_at, kind=job.kind)
+
+        trace = start_trace(f"job {job.kind}")
+        try:
+            job.result = await work()
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logger.exception("Job %s (%s) failed: %s", job.id, job.kind, e)
+        finally:
+            job.finished_at = time.time()
+            end_trace(trace, **{"job.id": job.id, "job.kind": job.kind, "job.status": job.status})
+            metrics_registry.inc("jobs_total", kind=job.kind, status=job.status)
+            metrics_registry.observe("job_run_seconds", job.finished_at - job.started_at, kind=job.kind)
+            self.store.save(job)
+            job.done.set()
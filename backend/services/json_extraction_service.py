@@ -0,0 +1,341 @@
+"""
+Tolerant JSON Extraction for LLM Output
+A single-pass parser that pulls JSON values out of free-form model responses.
+It skips prose, markdown fences and parenthetical comments, and recovers from
+trailing/missing commas and truncation.
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+_WHITESPACE = " \t\r\n"
+_BARE_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_\-]*")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+\-]?\d+)?")
+_CONTAINER_START = re.compile(r"[\[{]")
+_LITERALS = {"true": True, "false": False, "null": None}
+_ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _Incomplete(Exception):
+    """Raised when the text ends before a value is complete"""
+
+    def __init__(self, partial: Any = None):
+        super().__init__("incomplete JSON value")
+        self.partial = partial
+
+
+class _Parser:
+    """Recursive-descent parser that tolerates the usual LLM formatting mistakes"""
+
+    def __init__(self, text: str, pos: int = 0):
+        self.text = text
+        self.pos = pos
+        self.end = len(text)
+
+    def _skip_whitespace(self):
+        while self.pos < self.end and self.text[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def _skip_parenthetical(self):
+        """Skip a balanced "( ... )" comment such as "(tied with Activator)" """
+        depth = 0
+        while self.pos < self.end:
+            char = self.text[self.pos]
+            self.pos += 1
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if depth == 0:
+                    return
+        raise _Incomplete()
+
+    def _skip_line_comment(self):
+        newline = self.text.find("\n", self.pos)
+        self.pos = self.end if newline == -1 else newline + 1
+
+    def parse_value(self) -> Any:
+        """Parse the next value, skipping stray markup such as '#', '*' or backticks"""
+        while True:
+            self._skip_whitespace()
+            if self.pos >= self.end:
+                raise _Incomplete()
+
+            char = self.text[self.pos]
+            if char == "{":
+                return self.parse_object()
+            if char == "[":
+                return self.parse_array()
+            if char in "\"'":
+                return self._parse_string()
+            if char == "-" or char.isdigit():
+                return self._parse_number()
+            if char.isalpha() or char == "_":
+                return self._parse_bare_word()
+            if char in ",}]":
+                return None  # missing value
+            if char == "(":
+                self._skip_parenthetical()
+                continue
+            self.pos += 1
+
+    def parse_object(self) -> Dict[str, Any]:
+        self.pos += 1  # opening brace
+        result = {}
+
+        try:
+            while True:
+                self._skip_whitespace()
+                if self.pos >= self.end:
+                    raise _Incomplete()
+
+                char = self.text[self.pos]
+                if char == "}":
+                    self.pos += 1
+                    return result
+                if char == "]":
+                    return result  # mismatched bracket - let the parent recover
+                if char == "(":
+                    self._skip_parenthetical()
+                    continue
+                if char == "/" and self.text.startswith("//", self.pos):
+                    self._skip_line_comment()
+                    continue
+
+                if char in "\"'":
+                    key = self._parse_string()
+                elif char.isalpha() or char == "_":
+                    key = self._parse_bare_word(as_key=True)
+                else:
+                    self.pos += 1  # commas, markdown emphasis, stray punctuation
+                    continue
+
+                self._skip_whitespace()
+                if self.pos >= self.end:
+                    raise _Incomplete()
+                if self.text[self.pos] != ":":
+                    continue  # prose that happened to look like a key
+
+                self.pos += 1
+                try:
+                    result[key] = self.parse_value()
+                except _Incomplete as incomplete:
+                    # Keep partially parsed containers, drop partial scalars
+                    if isinstance(incomplete.partial, (dict, list)):
+                        result[key] = incomplete.partial
+                    raise
+
+                self._skip_after_value("}")
+        except _Incomplete:
+            raise _Incomplete(result)
+
+    def parse_array(self) -> List[Any]:
+        self.pos += 1  # opening bracket
+        result = []
+
+        try:
+            while True:
+                self._skip_whitespace()
+                if self.pos >= self.end:
+                    raise _Incomplete()
+
+                char = self.text[self.pos]
+                if char == "]":
+                    self.pos += 1
+                    return result
+                if char in "{[\"'" or char == "-" or char.isdigit():
+                    try:
+                        result.append(self.parse_value())
+                    except _Incomplete as incomplete:
+                        if isinstance(incomplete.partial, (dict, list)):
+                            result.append(incomplete.partial)
+                        raise
+                    self._skip_after_value("]")
+                elif char.isalpha():
+                    word_match = _BARE_WORD.match(self.text, self.pos)
+                    word = word_match.group()
+                    self.pos = word_match.end()
+                    if self.pos >= self.end:
+                        raise _Incomplete()
+                    if word in _LITERALS:
+                        result.append(_LITERALS[word])
+                elif char == "(":
+                    self._skip_parenthetical()
+                else:
+                    self.pos += 1  # commas, a stray '}', markup
+        except _Incomplete:
+            raise _Incomplete(result)
+
+    def _skip_after_value(self, closer: str):
+        """Skip comments such as "(tied with X)" or "-> revised" up to the next separator"""
+        while self.pos < self.end:
+            char = self.text[self.pos]
+            if char == ",":
+                self.pos += 1
+                return
+            if char in "}]" or char == '"':
+                return  # closer, or the next key with a missing comma
+            if char in "{[" and closer == "]":
+                return  # next array element with a missing comma
+            if char == "(":
+                self._skip_parenthetical()
+                continue
+            self.pos += 1
+        raise _Incomplete()
+
+    def _parse_string(self) -> str:
+        quote = self.text[self.pos]
+        self.pos += 1
+        chars = []
+
+        while self.pos < self.end:
+            char = self.text[self.pos]
+            if char == "\\":
+                if self.pos + 1 >= self.end:
+                    break
+                escaped = self.text[self.pos + 1]
+                if escaped == "u" and self.pos + 6 <= self.end:
+                    try:
+                        chars.append(chr(int(self.text[self.pos + 2:self.pos + 6], 16)))
+                        self.pos += 6
+                        continue
+                    except ValueError:
+                        pass
+                chars.append(_ESCAPES.get(escaped, escaped))
+                self.pos += 2
+                continue
+
+            if char == quote:
+                # An unescaped quote only ends the string if a separator follows it,
+                # or a new line opening the next string (a missing comma)
+                lookahead = self.pos + 1
+                while lookahead < self.end and self.text[lookahead] in _WHITESPACE:
+                    lookahead += 1
+                if (lookahead >= self.end or self.text[lookahead] in ",:}]"
+                        or (self.text[lookahead] == quote
+                            and "\n" in self.text[self.pos + 1:lookahead])):
+                    self.pos += 1
+                    return "".join(chars)
+
+            chars.append(char)
+            self.pos += 1
+
+        raise _Incomplete("".join(chars))
+
+    def _parse_number(self):
+        number_match = _NUMBER.match(self.text, self.pos)
+        if not number_match:
+            self.pos += 1
+            return None
+
+        self.pos = number_match.end()
+        if self.pos >= self.end:
+            raise _Incomplete()  # more digits may still arrive
+
+        token = number_match.group()
+        if any(marker in token for marker in ".eE"):
+            return float(token)
+        return int(token)
+
+    def _parse_bare_word(self, as_key: bool = False):
+        word_match = _BARE_WORD.match(self.text, self.pos)
+        self.pos = word_match.end()
+        if self.pos >= self.end:
+            raise _Incomplete()
+
+        word = word_match.group()
+        if not as_key and word in _LITERALS:
+            return _LITERALS[word]
+        return word
+
+
+def extract_json(text: str, expect: type = None) -> Any:
+    """
+    Extract the first JSON value (optionally of type dict or list) from an LLM response.
+    Truncated output is recovered as far as it goes; returns None if nothing is found.
+    """
+    if not text:
+        return None
+
+    if expect is dict:
+        start = text.find("{")
+    elif expect is list:
+        start = text.find("[")
+    else:
+        start_match = _CONTAINER_START.search(text)
+        start = start_match.start() if start_match else -1
+
+    if start == -1:
+        return None
+
+    parser = _Parser(text, start)
+    try:
+        return parser.parse_value()
+    except _Incomplete as incomplete:
+        return incomplete.partial
+
+
+def _objects_in(value: Any) -> Iterator[Dict[str, Any]]:
+    """Yield a dict, or the dicts directly nested in (lists of) lists"""
+    if isinstance(value, dict):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _objects_in(item)
+
+
+def iter_json_objects(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every JSON object in a complete response, in order. Objects may appear
+    at the top level or inside top-level arrays (including the "one array per
+    question" mistake); a truncated trailing object is recovered as far as it goes.
+    """
+    text = text or ""
+    end = len(text)
+    pos = 0
+    in_array = False
+
+    while pos < end:
+        if not in_array:
+            start_match = _CONTAINER_START.search(text, pos)
+            if not start_match:
+                return  # only prose left
+            if start_match.group() == "[":
+                in_array = True
+                pos = start_match.end()
+                continue
+            start = start_match.start()
+        else:
+            # Skip separators and markup between array elements
+            while pos < end and text[pos] not in "{[]":
+                pos += 1
+            if pos >= end:
+                return
+            if text[pos] == "]":
+                in_array = False
+                pos += 1
+                continue
+            start = pos
+
+        parser = _Parser(text, start)
+        try:
+            value = parser.parse_value()
+        except _Incomplete as incomplete:
+            yield from _objects_in(incomplete.partial)
+            return
+
+        pos = parser.pos
+        yield from _objects_in(value)
+
+
+def coerce_int(value: Any) -> Optional[int]:
+    """Read an integer from values like 6, 6.0, "6" or "6 (tied with Activator)" """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        number_match = re.search(r"\d+", value)
+        if number_match:
+            return int(number_match.group())
+    return None
@@ -0,0 +1,94 @@
+"""
+Structured, Non-Blocking Logging
+Log records are handed to a queue and written as JSON lines by a background
+listener thread, so request handlers never block on stdout.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+ROOT_LOGGER_NAME = "hiring"
+
+# Tunable via environment variables
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
+PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "300"))
+
+_configure_lock = threading.Lock()
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON with any structured fields merged in"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level: str = None):
+    """Attach the queue handler and start the background writer (idempotent)"""
+    global _listener
+
+    with _configure_lock:
+        logger = logging.getLogger(ROOT_LOGGER_NAME)
+
+        if _listener is not None:
+            if level:
+                logger.setLevel(level)
+            return
+
+        logger.setLevel(level or LOG_LEVEL)
+
+        log_queue = queue.SimpleQueue()
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter())
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger under the application namespace"""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def log_payload(logger: logging.Logger, label: str, payload, level: int = logging.DEBUG):
+    """
+    Log a large payload (LLM output, extracted JSON, ...) cheaply:
+    skipped entirely unless the level is enabled, sampled, and truncated
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if PAYLOAD_SAMPLE_RATE < 1 and random.random() >= PAYLOAD_SAMPLE_RATE:
+        return
+
+    text = payload if isinstance(payload, str) else str(payload)
+    logger.log(
+        level, "%s: %s", label, text[:PAYLOAD_MAX_CHARS],
+        extra={"fields": {"payload_chars": len(text), "sampled": True}}
+    )
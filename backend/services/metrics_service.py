@@ -0,0 +1,177 @@
+"""
+In-Memory LLM Call Metrics
+Counters, gauges and streaming histograms for every LLM call, labelled by call
+site and model, rendered in the Prometheus text exposition format.
+Metrics are per process; with several gunicorn workers each one reports its own.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, Tuple
+
+# Histogram buckets (upper bounds)
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Tuple[str, str] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Histogram:
+    """Fixed-bucket histogram that only keeps bucket counts, sum and count"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """Thread-safe registry of labelled counters, gauges and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def counter(self, name: str, help_text: str):
+        """Declare a counter"""
+        self._help[name] = help_text
+        self._counters.setdefault(name, {})
+
+    def gauge(self, name: str, help_text: str):
+        """Declare a gauge"""
+        self._help[name] = help_text
+        self._gauges.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float]):
+        """Declare a histogram with the given bucket upper bounds"""
+        self._help[name] = help_text
+        self._buckets[name] = tuple(buckets)
+        self._histograms.setdefault(name, {})
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Increment a declared counter"""
+        key = _labels(**labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        """Set a declared gauge"""
+        key = _labels(**labels)
+        with self._lock:
+            self._gauges[name][key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record an observation in a declared histogram"""
+        key = _labels(**labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in self._gauges.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} gauge")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+class LLMMetrics:
+    """Per call site / model accounting for LLM requests"""
+
+    def __init__(self, registry: MetricsRegistry = None):
+        self.registry = registry or MetricsRegistry()
+        self.registry.counter("llm_requests_total", "LLM requests by call site, model and finish reason")
+        self.registry.counter("llm_prompt_tokens_total", "Prompt tokens reported by the provider")
+        self.registry.counter("llm_completion_tokens_total", "Completion tokens reported by the provider")
+        self.registry.counter("llm_parse_outcomes_total", "Parse/validation outcome of LLM responses")
+        self.registry.histogram("llm_request_duration_seconds", "LLM request latency", LATENCY_BUCKETS)
+        self.registry.histogram("llm_prompt_tokens", "Prompt tokens per LLM request", TOKEN_BUCKETS)
+        self.registry.histogram("llm_completion_tokens", "Completion tokens per LLM request", TOKEN_BUCKETS)
+
+    def record_call(self, call_site: str, model: str, duration: float, finish_reason: str = None,
+                    prompt_tokens: int = None, completion_tokens: int = None):
+        """Record one LLM request; finish_reason is "error" for failed requests"""
+        labels = {"call_site": call_site, "model": model}
+        self.registry.inc("llm_requests_total", finish_reason=finish_reason or "unknown", **labels)
+        self.registry.observe("llm_request_duration_seconds", duration, **labels)
+
+        if prompt_tokens is not None:
+            self.registry.inc("llm_prompt_tokens_total", prompt_tokens, **labels)
+            self.registry.observe("llm_prompt_tokens", prompt_tokens, **labels)
+        if completion_tokens is not None:
+            self.registry.inc("llm_completion_tokens_total", completion_tokens, **labels)
+            self.registry.observe("llm_completion_tokens", completion_tokens, **labels)
+
+    def record_outcome(self, call_site: str, outcome: str):
+        """Record how a response fared downstream, e.g. "ok", "invalid", "fixed" or "fallback" """
+        self.registry.inc("llm_parse_outcomes_total", call_site=call_site, outcome=outcome)
+
+
+# Process-wide registry shared by the services and the /api/metrics endpoint
+metrics_registry = MetricsRegistry()
+llm_metrics = LLMMetrics(metrics_registry)
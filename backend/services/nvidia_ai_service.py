@@ -1,23 +1,36 @@
 import requests
-import json
 import re
-from typing import List, Dict, Any
+import json
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
 import aiohttp
 from datetime import datetime
 import random
+import logging
 import os
+import time
 from dotenv import load_dotenv
+from .logging_service import get_logger, log_payload
+from .json_extraction_service import extract_json, iter_json_objects, coerce_int
+from .metrics_service import llm_metrics, metrics_registry
+from .adaptive_limiter_service import llm_limiter, LimiterTimeout
+from .cassette_service import cassette_registry
+from .trait_ranking_service import TraitRanking, trait_registry
+from .question_bank_service import question_bank, SIGNATURE_SIZE
+from .tracing_service import traced, span
+from .prompt_builder_service import prompt_builder, INITIAL_ANALYSIS_JSON_FORMAT, RESPONSE_ANALYSIS_JSON_FORMAT
 from .ai_prompts_service import (
-    get_system_prompt, 
     get_chapter_2_generation_prompt,
     get_chapter_3_generation_prompt,
     CLIFTON_STRENGTHS,
     get_all_strengths,
     validate_strength_profile,
-    get_trait_behavioral_patterns,
-    PRIMING_1_IDENTITY,
-    PRIMING_2_METHODOLOGY,
+    get_ranking_response_format,
+    validate_ranking_indices,
+    rankings_from_indices,
     PRIMING_3_OVERVIEW
 )
 
@@ -25,6 +38,18 @@ from .ai_prompts_service import (
 load_dotenv()
 load_dotenv('../.env')  # Also try parent directory
 
+logger = get_logger(__name__)
+
+# Structured output: rankings come back as a compact ordered list of trait indices
+STRUCTURED_OUTPUT_ENABLED = os.getenv('AI_STRUCTURED_OUTPUT', 'true').lower() in ('1', 'true', 'yes')
+STRUCTURED_RANKING_MAX_TOKENS = 300
+# A structured ranking with at least this many usable indices is completed locally instead of discarded
+MIN_REPAIRABLE_INDICES = 17
+
+# Blocking LLM calls run on their own threads (one per admitted request), so waits on the
+# adaptive limit never starve the default executor that Google Sheets I/O runs on
+LLM_THREADS = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
 # Chapter-specific prompts
 CHAPTER_2_PROMPT = """
 Chapter 2, Emotional truth - After we answered chapter 1, then we have an estimate data of my gallup cliffton strengths that tells who I am on the subconcious state (a bigger percentage of the human mind). Then now, chapter 2 tends to solve contradictions, and solidify thoughts from chapter 1. It is  Like situational scenarios that has about 4 choices that will reveal a trait I used to solve a situation and something I can answer two times, giving each answer a different weight, weight 1 is the one i will most likely do. Furthermore this is to create an in-depth analysis of who I am behind the traditional statistical data we can get from the traditional gallup clifton on how I handle such situations. (this section has 13 questions) 
@@ -73,21 +98,43 @@ class NvidiaAIService:
     def __init__(self):
         # Get API key from environment variable
         self.api_key = os.getenv('NVIDIA_API_KEY')
+        if not self.api_key and cassette_registry.replaying:
+            # Replayed calls never reach OpenRouter, so no real key is needed
+            self.api_key = "cassette-replay"
         if not self.api_key:
-            print("Warning: NVIDIA_API_KEY not found. Please set your NVIDIA API key.")
+            logger.warning("NVIDIA_API_KEY not found. Please set your NVIDIA API key.")
         
         # OpenRouter API configuration for NVIDIA Nemotron model
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
         self.model = "nvidia/llama-3.1-nemotron-70b-instruct"  # NVIDIA Nemotron model via OpenRouter
         
+        # Pooled connections to OpenRouter; recorded or replayed when HTTP_CASSETTE_MODE is set
+        self.session = cassette_registry.mount(requests.Session(), "openrouter")
+        
         # Use the complete 34 CliftonStrengths from ai_prompts_service
         self.clifton_strengths = CLIFTON_STRENGTHS
         self.all_traits = get_all_strengths()
         
-        # System prompt with CliftonStrengths priming
-        self.system_prompt = get_system_prompt()
+        # System prompt with CliftonStrengths priming (built once by the prompt builder)
+        self.system_prompt = prompt_builder.system_prompt
         
-    def _make_api_call(self, messages: List[Dict[str, str]], max_tokens: int = 500, temperature: float = 0.7) -> str:
+        # Request rankings as schema-constrained trait indices instead of the verbose {"Name": n} map
+        self.structured_output = STRUCTURED_OUTPUT_ENABLED
+        
+        self._executor = ThreadPoolExecutor(max_workers=LLM_THREADS, thread_name_prefix="llm")
+    
+    async def _in_llm_thread(self, func, *args, **kwargs):
+        """Run a blocking LLM-bound call on the LLM executor (keeps the trace context, like asyncio.to_thread)"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+    
+    def close(self):
+        """Release the LLM threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        
+    def _make_api_call(self, messages: List[Dict[str, str]], max_tokens: int = 500, temperature: float = 0.7,
+                       response_format: Dict[str, Any] = None, call_site: str = "unknown") -> str:
         """
         Make a call to NVIDIA API via OpenRouter
         """
@@ -110,107 +157,183 @@ class NvidiaAIService:
             "frequency_penalty": 0.1,
             "presence_penalty": 0.1
         }
+        if response_format:
+            payload["response_format"] = response_format
         
-        try:
-            response = requests.post(self.base_url, json=payload, headers=headers, timeout=90)
-            response.raise_for_status()
-            
-            result = response.json()
-            if 'choices' in result and len(result['choices']) > 0:
-                content = result['choices'][0]['message']['content']
-                print(f"DEBUG: API returned {len(content)} characters")
-                
-                # Check if response was truncated
-                finish_reason = result['choices'][0].get('finish_reason', 'unknown')
-                if finish_reason == 'length':
-                    print(f"WARNING: API response was truncated due to length limit")
-                elif finish_reason != 'stop':
-                    print(f"WARNING: API response finished with reason: {finish_reason}")
+        started = time.perf_counter()
+        finish_reason = "error"
+        usage = {}
+        with span(f"llm.{call_site}", model=self.model, max_tokens=max_tokens) as llm_span:
+            try:
+                # The adaptive limit backs off when OpenRouter signals overload
+                with llm_limiter.acquire(call_site) as permit:
+                    try:
+                        response = self.session.post(self.base_url, json=payload, headers=headers, timeout=90)
+                    except requests.exceptions.Timeout:
+                        permit.dropped("timeout")
+                        raise
+                    except requests.exceptions.ConnectionError:
+                        permit.dropped("connection_error")
+                        raise
+                    if response.status_code == 429:
+                        permit.dropped("throttled")
+                    elif response.status_code >= 500:
+                        permit.dropped("server_error")
+                response.raise_for_status()
                 
-                return content
-            else:
-                print(f"Unexpected API response format: {result}")
+                result = response.json()
+                usage = result.get('usage') or {}
+                if 'choices' in result and len(result['choices']) > 0:
+                    content = result['choices'][0]['message']['content']
+                    
+                    # Check if response was truncated
+                    finish_reason = result['choices'][0].get('finish_reason') or 'unknown'
+                    if finish_reason == 'length':
+                        logger.warning("API response was truncated due to length limit")
+                    elif finish_reason != 'stop':
+                        logger.warning("API response finished with reason: %s", finish_reason)
+                    
+                    return content
+                else:
+                    finish_reason = "malformed"
+                    log_payload(logger, "Unexpected API response format", result, level=logging.WARNING)
+                    return None
+                    
+            except requests.exceptions.RequestException as e:
+                logger.error("NVIDIA API call failed: %s", e)
                 return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"NVIDIA API call failed: {e}")
-            return None
-        except Exception as e:
-            print(f"Error processing NVIDIA response: {e}")
-            return None
+            except LimiterTimeout as e:
+                finish_reason = "shed"
+                logger.error("NVIDIA API call not attempted: %s", e)
+                return None
+            except Exception as e:
+                logger.error("Error processing NVIDIA response: %s", e)
+                return None
+            finally:
+                duration = time.perf_counter() - started
+                if llm_span is not None:
+                    llm_span.attributes.update({
+                        "finish_reason": finish_reason,
+                        "prompt_tokens": usage.get('prompt_tokens') or 0,
+                        "completion_tokens": usage.get('completion_tokens') or 0
+                    })
+                llm_metrics.record_call(
+                    call_site, self.model, duration, finish_reason,
+                    prompt_tokens=usage.get('prompt_tokens'),
+                    completion_tokens=usage.get('completion_tokens')
+                )
+                logger.debug("LLM call finished", extra={"fields": {
+                    "call_site": call_site,
+                    "model": self.model,
+                    "duration_ms": round(duration * 1000),
+                    "finish_reason": finish_reason,
+                    "prompt_tokens": usage.get('prompt_tokens'),
+                    "completion_tokens": usage.get('completion_tokens')
+                }})
     
     def _extract_rankings_from_response(self, response: str) -> Dict[str, int]:
-        """Enhanced JSON extraction with multiple fallback strategies"""
-        import re
-        
+        """Extract trait rankings from an AI response with the tolerant JSON extractor"""
         try:
-            # Strategy 1: Direct JSON parsing
-            try:
-                return json.loads(response)
-            except json.JSONDecodeError:
-                pass
+            raw_rankings = extract_json(response, dict)
+            if not raw_rankings:
+                logger.debug("No JSON object found in AI response")
+                return None
             
-            # Strategy 2: Extract JSON with regex and clean it
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                print(f"DEBUG: Extracted JSON: {json_str[:500]}...")
-                
-                # Clean the JSON string to remove comments and fix formatting issues
-                json_str = self._clean_json_string(json_str)
-                
-                try:
-                    rankings = json.loads(json_str)
-                    print(f"Parsed trait rankings: {len(rankings)} traits found")
-                    return rankings
-                except json.JSONDecodeError as e:
-                    print(f"JSON parsing error after cleaning: {e}")
-                    
-            # Strategy 3: Manual extraction of trait:value pairs
-            trait_pattern = r'"?([A-Za-z\-]+)"?\s*:\s*(\d+)'
-            matches = re.findall(trait_pattern, response)
-            if matches:
-                rankings = {}
-                for trait, value in matches:
-                    if trait in self.all_traits:
-                        rankings[trait] = int(value)
-                print(f"Manual extraction found {len(rankings)} valid traits")
-                if len(rankings) >= 20:  # Accept if we got most traits
-                    return rankings
-                    
-            print("DEBUG: All JSON extraction strategies failed")
-            return None
+            log_payload(logger, "Extracted JSON", raw_rankings)
+            rankings = self._coerce_rankings(raw_rankings)
+            logger.info("Parsed trait rankings: %s traits found", len(rankings))
+            return rankings or None
             
         except Exception as e:
-            print(f"Error in _extract_rankings_from_response: {e}")
+            logger.error("Error in _extract_rankings_from_response: %s", e)
             return None
     
-    def _clean_json_string(self, json_str: str) -> str:
-        """Clean JSON string to remove comments and fix common formatting issues"""
-        import re
-        
-        # Remove comments in parentheses
-        json_str = re.sub(r'\([^)]*\)', '', json_str)
-        
-        # Remove lines that start with comments or explanations
-        lines = json_str.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            # Skip lines that are clearly comments or explanations
-            if not line.strip().startswith(('*', '-', 'Note:', 'Explanation:', '//')):
-                cleaned_lines.append(line)
-        json_str = '\n'.join(cleaned_lines)
-        
-        # Fix common JSON issues
-        json_str = re.sub(r',\s*}', '}', json_str)  # Remove trailing commas
-        json_str = re.sub(r',\s*]', ']', json_str)  # Remove trailing commas in arrays
-        json_str = re.sub(r'"\s*,\s*"', '", "', json_str)  # Fix quote spacing
-        
-        return json_str
+    @property
+    def uses_structured_output(self) -> bool:
+        """Whether rankings are requested as schema-constrained index lists (else the verbose format)"""
+        return self.structured_output and bool(self.api_key)
+    
+    def _rank_with_structured_output(self, analysis_prompt: str, call_site: str,
+                                     fallback_rankings: Dict[str, int] = None) -> Optional[Dict[str, int]]:
+        """
+        Ask for a schema-constrained ordered list of trait indices.
+        An incomplete or duplicated list is repaired locally (missing traits are placed
+        using fallback_rankings) rather than asking again; returns None if the call failed
+        or the reply is unusable.
+        """
+        if not self.uses_structured_output:
+            return None
+        
+        messages = prompt_builder.messages(prompt_builder.with_structured_format(analysis_prompt))
+        
+        response = self._make_api_call(
+            messages,
+            max_tokens=STRUCTURED_RANKING_MAX_TOKENS,
+            temperature=0.3,
+            response_format=get_ranking_response_format(),
+            call_site=f"{call_site}.structured"
+        )
+        log_payload(logger, "Structured ranking response", response)
+        rankings, outcome = self._parse_ranking_indices(response, fallback_rankings)
+        llm_metrics.record_outcome(f"{call_site}.structured", outcome)
+        return rankings
+    
+    def _parse_ranking_indices(self, response: str,
+                               fallback_rankings: Dict[str, int] = None) -> Tuple[Optional[Dict[str, int]], str]:
+        """
+        Parse a {"ranking": [indices]} reply into rankings and an outcome ("ok", "fixed" or "invalid").
+        Out-of-range and repeated indices are dropped; if at least MIN_REPAIRABLE_INDICES remain,
+        the missing traits are filled in with _fix_invalid_rankings.
+        """
+        if not response:
+            return None, "invalid"
+        
+        try:
+            parsed = json.loads(response)
+        except ValueError:
+            # Providers without schema support may still wrap the object in prose or fences
+            parsed = extract_json(response)
+        
+        indices = parsed.get("ranking") if isinstance(parsed, dict) else parsed
+        if validate_ranking_indices(indices):
+            return rankings_from_indices(indices), "ok"
+        
+        usable = []
+        if isinstance(indices, list):
+            strength_count = len(self.all_traits)
+            for index in indices:
+                if isinstance(index, int) and not isinstance(index, bool) \
+                        and 0 <= index < strength_count and index not in usable:
+                    usable.append(index)
+        if len(usable) < MIN_REPAIRABLE_INDICES:
+            logger.warning("Structured ranking response had %s usable trait indices, too few to repair", len(usable))
+            return None, "invalid"
+        
+        logger.debug("Repairing structured ranking with %s of %s trait indices", len(usable), len(self.all_traits))
+        return self._fix_invalid_rankings(rankings_from_indices(usable), fallback_rankings or {}), "fixed"
+    
+    @staticmethod
+    def _question_outcome(parsed_count: int, expected_count: int) -> str:
+        """Classify a question generation response for the parse outcome metric"""
+        if parsed_count >= expected_count:
+            return "ok"
+        return "partial" if parsed_count else "parse_error"
+    
+    def _coerce_rankings(self, raw_rankings: Dict[str, Any]) -> Dict[str, int]:
+        """Keep valid trait names and read integer ranks from values like "6 (tied with Woo)" """
+        rankings = {}
+        for trait, rank in raw_rankings.items():
+            if trait not in self.all_traits:
+                logger.debug("Skipping invalid trait: %s", trait)
+                continue
+            rank = coerce_int(rank)
+            if rank is not None:
+                rankings[trait] = rank
+        return rankings
 
     def _get_fallback_rankings(self) -> Dict[str, int]:
         """Generate fallback rankings using enhanced randomization with realistic patterns"""
-        print("DEBUG: Using fallback rankings due to AI analysis failure")
+        logger.debug("Using fallback rankings due to AI analysis failure")
         
         # Create more realistic fallback by simulating natural talent distribution
         # Most people have 2-3 dominant domains with varied strengths within
@@ -271,77 +394,29 @@ class NvidiaAIService:
         """
         Analyze user responses and rank CliftonStrengths traits with enhanced validation
         """
-        print(f"DEBUG: Analyzing {len(responses)} responses with NVIDIA AI")
+        logger.debug("Analyzing %s responses with NVIDIA AI", len(responses))
         
         if not responses:
             return self._get_fallback_rankings()
         
-        # Prepare response data for analysis
-        response_data = []
-        for resp in responses:
-            response_data.append(f"Q{resp.get('questionId', 'Unknown')}: {resp.get('response', 'No response')}")
+        analysis_prompt = prompt_builder.response_analysis_prompt(responses)
         
-        # Enhanced prompt for better trait analysis with behavioral patterns
-        behavioral_patterns = get_trait_behavioral_patterns()
-        key_indicators = []
-        for trait, patterns in behavioral_patterns.items():
-            key_indicators.append(f"- {trait}: {patterns[0]}")  # Use first key pattern
+        if self.uses_structured_output:
+            try:
+                rankings = self._rank_with_structured_output(analysis_prompt, "response_analysis")
+                if rankings and self._validate_ai_rankings(rankings):
+                    return rankings
+                logger.debug("Structured AI rankings unusable, using fallback")
+            except Exception as e:
+                logger.error("Error in structured trait analysis: %s", e)
+            return self._get_fallback_rankings()
         
-        analysis_prompt = f"""
-{PRIMING_1_IDENTITY}
-
-{PRIMING_2_METHODOLOGY}
-
-Based on these user responses to assessment questions, analyze and rank the 34 CliftonStrengths traits from 1 (strongest/most evident) to 34 (weakest/least evident).
-
-User Responses:
-{chr(10).join(response_data)}
-
-BEHAVIORAL PATTERN MATCHING:
-Look for these key behavioral indicators in the responses:
-{chr(10).join(key_indicators)}
-
-ANALYSIS REQUIREMENTS:
-1. EVIDENCE-BASED RANKING: Each ranking must be supported by specific patterns in the responses
-2. BEHAVIORAL FOCUS: Analyze what the person actually does/prefers, not what they think they should do
-3. PATTERN RECOGNITION: Look for consistent themes across multiple responses
-4. TRAIT DIFFERENTIATION: Carefully distinguish between similar traits using behavioral evidence
-5. INTENSITY WEIGHTING: Strong preferences (selecting extreme ends) indicate stronger traits
-6. DOMAIN BALANCE: Ensure rankings reflect natural distribution unless responses clearly indicate concentration
-
-SPECIFIC ANALYSIS STEPS:
-1. Identify the 5-7 strongest behavioral patterns from responses
-2. Map these patterns to specific CliftonStrengths traits using the behavioral indicators
-3. Look for evidence of commonly misidentified traits (Command, Competition, Futuristic, Self-Assurance)
-4. Verify trait combinations make psychological sense together
-5. Ensure bottom-ranked traits show clear absence of related behaviors
-
-CRITICAL DIFFERENTIATION FOCUS:
-- Leadership behaviors → Command (authority comfort), Self-Assurance (inner confidence), Significance (impact seeking)
-- Competition-focused responses → Competition (comparison with others) vs Achiever (personal productivity)
-- Future-oriented thinking → Futuristic (vision excitement) vs Strategic (systematic planning)
-- Authority comfort → Command (taking charge) vs Responsibility (duty/ownership)
-- Recognition-seeking → Significance (meaningful impact) vs Achiever (personal accomplishment)
-
-CliftonStrengths Traits to Rank:
-{', '.join(self.all_traits)}
-
-CRITICAL: Return ONLY a valid JSON object with evidence-based rankings.
-
-Format: {{"TraitName": ranking_number, ...}}
-
-Example: {{"Achiever": 1, "Strategic": 2, "Command": 3, ...}}
-"""
-        
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": analysis_prompt}
-        ]
+        messages = prompt_builder.messages(analysis_prompt + RESPONSE_ANALYSIS_JSON_FORMAT)
         
         try:
-            print("DEBUG: Making API call for trait analysis...")
-            response = self._make_api_call(messages, max_tokens=1500, temperature=0.3)
-            print(f"AI Response for trait analysis: {response[:500]}...")
+            logger.debug("Making API call for trait analysis...")
+            response = self._make_api_call(messages, max_tokens=1500, temperature=0.3, call_site="response_analysis")
+            log_payload(logger, "AI Response for trait analysis", response)
             
             if response:
                 # Enhanced JSON extraction with multiple fallback strategies
@@ -349,166 +424,94 @@ Example: {{"Achiever": 1, "Strategic": 2, "Command": 3, ...}}
                 if rankings:
                     # Enhanced validation of AI rankings
                     if self._validate_ai_rankings(rankings):
+                        llm_metrics.record_outcome("response_analysis", "ok")
                         return rankings
                     else:
-                        print("DEBUG: AI rankings failed validation, using fallback")
+                        logger.debug("AI rankings failed validation, using fallback")
+                        llm_metrics.record_outcome("response_analysis", "invalid")
                         return self._get_fallback_rankings()
                 else:
-                    print("DEBUG: No valid JSON found in AI response")
+                    logger.debug("No valid JSON found in AI response")
+                    llm_metrics.record_outcome("response_analysis", "parse_error")
                     return self._get_fallback_rankings()
                 
         except Exception as e:
-            print(f"Error parsing rankings: {e}")
+            logger.error("Error parsing rankings: %s", e)
             return self._get_fallback_rankings()
 
+    @traced()
     async def analyze_initial_responses(self, responses: List[Dict[str, Any]], 
-                                     questions: List[Dict[str, Any]]) -> Dict[str, int]:
+                                     questions: List[Dict[str, Any]],
+                                     allow_fallback: bool = True) -> Optional[Dict[str, int]]:
         """
-        Analyze initial responses using NVIDIA AI to create trait rankings
+        Analyze initial responses using NVIDIA AI to create trait rankings.
+        With allow_fallback=False a failed analysis returns None instead of fallback rankings.
         """
         try:
             if not self.api_key:
-                return self._get_fallback_rankings()
+                return self._get_fallback_rankings() if allow_fallback else None
             
-            print(f"DEBUG: Analyzing {len(responses)} responses with NVIDIA AI")
+            logger.debug("Analyzing %s responses with NVIDIA AI", len(responses))
             
-            # Create a comprehensive analysis prompt
-            response_text = ""
-            for i, response in enumerate(responses):
-                question_id = response.get('questionId', '')
-                answer = response.get('response', '')
-                
-                # Find the corresponding question
-                question = None
-                for q in questions:
-                    if q.get('QuestionID') == question_id or q.get('Prompt') == question_id:
-                        question = q
-                        break
-                
-                if question:
-                    left_statement = question.get('LeftStatement', '')
-                    right_statement = question.get('RightStatement', '')
-                    theme = question.get('Theme', '')
-                    
-                    response_text += f"Question {i+1} ({theme}): \n"
-                    response_text += f"Left: {left_statement}\n"
-                    response_text += f"Right: {right_statement}\n"
-                    response_text += f"Response: {answer} (1=Strongly Left, 5=Strongly Right)\n\n"
+            analysis_prompt = prompt_builder.initial_analysis_prompt(responses, questions)
             
-            # Enhanced AI analysis prompt with priming
-            behavioral_patterns = get_trait_behavioral_patterns()
-            key_patterns = []
-            for trait, patterns in behavioral_patterns.items():
-                key_patterns.append(f"{trait}: {'; '.join(patterns[:3])}")  # Top 3 patterns
+            if self.uses_structured_output:
+                # A schema-constrained index list is a complete ranking, or is repaired locally
+                trait_rankings = await self._in_llm_thread(
+                    self._rank_with_structured_output, analysis_prompt, "initial_analysis"
+                )
+                if trait_rankings:
+                    logger.debug("Using structured NVIDIA AI rankings")
+                    return trait_rankings
+                logger.debug("Using fallback rankings due to unusable structured rankings")
+                return self._get_fallback_rankings() if allow_fallback else None
             
-            analysis_prompt = f"""
-{PRIMING_1_IDENTITY}
-
-{PRIMING_2_METHODOLOGY}
-
-Now analyze these Chapter 1 responses and provide the 34 Gallup Clifton Strengths rankings:
-
-{response_text}
-
-DETAILED ANALYSIS REQUIREMENTS:
-1. RESPONSE PATTERN ANALYSIS: Examine the specific choices made for each question
-2. STRENGTH IDENTIFICATION: Look for clear behavioral indicators of each trait
-3. TRAIT DIFFERENTIATION: Apply the critical differentiation rules for commonly confused traits
-4. EVIDENCE VALIDATION: Ensure top-ranked traits have multiple supporting responses
-5. PSYCHOLOGICAL COHERENCE: Verify trait combinations make sense together
-
-KEY BEHAVIORAL INDICATORS TO IDENTIFY:
-{chr(10).join(key_patterns)}
-
-SPECIFIC ANALYSIS METHODOLOGY:
-1. For each response, identify which traits are most strongly indicated by the behavioral choice
-2. Weight extreme responses (1-2 or 4-5) more heavily than moderate responses (3)
-3. Look for consistency patterns across multiple responses that indicate natural behavioral preferences
-4. Consider the psychological profile emerging from the complete set of responses
-5. Rank traits based on strength of behavioral evidence, not assumptions or generalizations
-
-CRITICAL TRAIT DIFFERENTIATION FOCUS:
-- Command behaviors (taking charge, authority comfort) vs Significance (impact seeking)
-- Competition patterns (comparison, winning) vs Achiever (personal productivity)
-- Futuristic thinking (future vision) vs Strategic (systematic planning)
-- Self-Assurance (internal confidence) vs Command (external authority)
-
-RANKING VALIDATION:
-- Top 5 traits should have clear, strong behavioral evidence
-- Traits 6-15 should have moderate supporting evidence
-- Traits 16-25 should show situational or developing patterns
-- Traits 26-34 should show minimal evidence or contrary patterns
-
-CRITICAL: Return ONLY a valid JSON object with ALL 34 traits ranked from 1-34 (1=strongest). 
-Use the exact trait names: Achiever, Activator, Adaptability, Analytical, Arranger, Belief, Command, Communication, Competition, Connectedness, Consistency, Context, Deliberative, Developer, Discipline, Empathy, Focus, Futuristic, Harmony, Ideation, Includer, Individualization, Input, Intellection, Learner, Maximizer, Positivity, Relator, Responsibility, Restorative, Self-Assurance, Significance, Strategic, Woo.
-
-Format: {{"Achiever": 1, "Activator": 2, ...}}
-
-Analyze each response carefully and rank traits based on the behavioral evidence present in the user's actual choices and preferences.
-"""
+            messages = prompt_builder.messages(analysis_prompt + INITIAL_ANALYSIS_JSON_FORMAT)
             
-            messages = [
-                {
-                    "role": "system",
-                    "content": self.system_prompt
-                },
-                {
-                    "role": "user", 
-                    "content": analysis_prompt
-                }
-            ]
+            logger.debug("Making API call for trait analysis...")
+            ai_response = await self._in_llm_thread(
+                self._make_api_call, messages, max_tokens=1500, temperature=0.3, call_site="initial_analysis"
+            )
             
-            print("DEBUG: Making API call for trait analysis...")
-            ai_response = self._make_api_call(messages, max_tokens=1500, temperature=0.3)
-            
-            print(f"NVIDIA AI Response for trait analysis: {ai_response[:1000]}...")
+            log_payload(logger, "NVIDIA AI Response for trait analysis", ai_response)
             
             if ai_response:
-                try:
-                    # Extract JSON from the response
-                    import re
-                    json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                    if json_match:
-                        json_text = json_match.group()
-                        print(f"DEBUG: Extracted JSON: {json_text[:500]}...")
-                        trait_rankings = json.loads(json_text)
-                        print(f"Parsed trait rankings: {len(trait_rankings)} traits found")
-                        
-                        # Validate that we have rankings for all traits
-                        if len(trait_rankings) >= 30:
-                            # Check if rankings are actually varied
-                            values = list(trait_rankings.values())
-                            unique_values = len(set(values))
-                            print(f"DEBUG: Found {unique_values} unique ranking values out of {len(values)} total")
-                            
-                            if unique_values > 15:  # Good variation in rankings
-                                print(f"DEBUG: NVIDIA AI rankings look valid, using them")
-                                return trait_rankings
-                            else:
-                                print(f"DEBUG: NVIDIA AI rankings look too uniform, using fallback")
+                # Extract JSON from the response
+                trait_rankings = self._extract_rankings_from_response(ai_response)
                 
-                except json.JSONDecodeError as e:
-                    print(f"JSON parsing error: {e}")
-                    pass
+                # Validate that we have rankings for all traits
+                if trait_rankings and len(trait_rankings) >= 30:
+                    # Check if rankings are actually varied
+                    values = list(trait_rankings.values())
+                    unique_values = len(set(values))
+                    logger.debug("Found %s unique ranking values out of %s total", unique_values, len(values))
+                    
+                    if unique_values > 15:  # Good variation in rankings
+                        logger.debug("NVIDIA AI rankings look valid, using them")
+                        llm_metrics.record_outcome("initial_analysis", "ok")
+                        return trait_rankings
+                    else:
+                        logger.debug("NVIDIA AI rankings look too uniform, using fallback")
+                llm_metrics.record_outcome("initial_analysis", "invalid")
             
             # Fallback if AI analysis fails
-            print(f"DEBUG: Using fallback rankings due to NVIDIA AI analysis failure")
-            return self._get_fallback_rankings()
+            logger.debug("Using fallback rankings due to NVIDIA AI analysis failure")
+            return self._get_fallback_rankings() if allow_fallback else None
             
         except Exception as e:
-            print(f"Error in analyze_initial_responses: {e}")
-            return self._get_fallback_rankings()
+            logger.error("Error in analyze_initial_responses: %s", e)
+            return self._get_fallback_rankings() if allow_fallback else None
     
     def _validate_ai_rankings(self, rankings: Dict[str, int]) -> bool:
         """Enhanced validation to detect poor AI analysis"""
         if not rankings or len(rankings) != 34:
-            print(f"DEBUG: Invalid ranking count: {len(rankings) if rankings else 0}")
+            logger.debug("Invalid ranking count: %s", len(rankings) if rankings else 0)
             return False
         
         # Check if all traits are present
         missing_traits = set(self.all_traits) - set(rankings.keys())
         if missing_traits:
-            print(f"DEBUG: Missing traits: {missing_traits}")
+            logger.debug("Missing traits: %s", missing_traits)
             return False
         
         # Check ranking values
@@ -517,7 +520,7 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         actual_ranks = set(rank_values)
         
         if actual_ranks != expected_ranks:
-            print(f"DEBUG: Invalid rank values. Expected 1-34, got: {sorted(actual_ranks)}")
+            logger.debug("Invalid rank values. Expected 1-34, got: %s", sorted(actual_ranks))
             return False
         
         # Enhanced validation checks for quality rankings
@@ -527,7 +530,7 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         # Check for alphabetical ordering pattern
         is_alphabetical = sorted_by_rank == sorted(trait_names)
         if is_alphabetical:
-            print("DEBUG: Rankings appear to be alphabetical - invalid")
+            logger.debug("Rankings appear to be alphabetical - invalid")
             return False
         
         # Check for too many sequential patterns by first letter
@@ -540,7 +543,7 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         
         is_sequential_pattern = sequential_count > 15
         if is_sequential_pattern:
-            print("DEBUG: Too many sequential patterns detected - invalid")
+            logger.debug("Too many sequential patterns detected - invalid")
             return False
         
         # Check for domain distribution quality
@@ -556,7 +559,7 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         for domain, domain_traits in domains.items():
             domain_count_in_top_10 = len([t for t in top_10_traits if t in domain_traits])
             if domain_count_in_top_10 >= 8:  # 8+ from same domain in top 10 is suspicious
-                print(f"DEBUG: Too many traits from {domain} domain in top 10 - potentially invalid")
+                logger.debug("Too many traits from %s domain in top 10 - potentially invalid", domain)
                 return False
         
         # Check for commonly misidentified traits being properly differentiated
@@ -564,7 +567,7 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         leadership_traits = ["Command", "Self-Assurance", "Significance"]
         leadership_ranks = [rankings[trait] for trait in leadership_traits]
         if max(leadership_ranks) - min(leadership_ranks) < 5:  # All within 5 ranks
-            print("DEBUG: Leadership traits too clustered - may indicate poor differentiation")
+            logger.debug("Leadership traits too clustered - may indicate poor differentiation")
             # Don't reject, but note this
         
         # Check for extreme clustering (too many consecutive ranks)
@@ -577,22 +580,22 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         # If more than 80% of gaps are exactly 1, it might be artificial
         single_gaps = sum(1 for gap in rank_gaps if gap == 1)
         if single_gaps > len(rank_gaps) * 0.9:
-            print("DEBUG: Rankings too uniformly distributed - potentially artificial")
+            logger.debug("Rankings too uniformly distributed - potentially artificial")
             return False
         
-        print("DEBUG: AI rankings passed enhanced validation")
+        logger.debug("AI rankings passed enhanced validation")
         return True
 
     def _validate_rankings(self, rankings: Dict[str, int]) -> bool:
         """Validate trait rankings"""
         if not rankings:
-            print("DEBUG: Empty rankings")
+            logger.debug("Empty rankings")
             return False
         
         # Check if all traits are present
         missing_traits = set(self.all_traits) - set(rankings.keys())
         if missing_traits:
-            print(f"DEBUG: Missing traits: {missing_traits}")
+            logger.debug("Missing traits: %s", missing_traits)
             return False
         
         # Check ranking values
@@ -601,15 +604,15 @@ Analyze each response carefully and rank traits based on the behavioral evidence
         actual_ranks = set(rank_values)
         
         if actual_ranks != expected_ranks:
-            print(f"DEBUG: Invalid rank values. Expected 1-34, got: {sorted(actual_ranks)}")
+            logger.debug("Invalid rank values. Expected 1-34, got: %s", sorted(actual_ranks))
             return False
         
-        print("DEBUG: Rankings validation passed")
+        logger.debug("Rankings validation passed")
         return True
 
     def _fix_invalid_rankings(self, invalid_rankings: Dict[str, int], fallback_rankings: Dict[str, int]) -> Dict[str, int]:
         """Attempt to fix invalid rankings by filtering and normalizing"""
-        print("DEBUG: Attempting to fix invalid rankings")
+        logger.debug("Attempting to fix invalid rankings")
         
         # Filter to only valid traits
         valid_rankings = {}
@@ -617,64 +620,85 @@ Analyze each response carefully and rank traits based on the behavioral evidence
             if trait in self.all_traits:
                 valid_rankings[trait] = rank
             else:
-                print(f"DEBUG: Removing invalid trait: {trait}")
+                logger.debug("Removing invalid trait: %s", trait)
         
         # If we don't have all 34 traits, add missing ones from fallback
         missing_traits = set(self.all_traits) - set(valid_rankings.keys())
         if missing_traits:
-            print(f"DEBUG: Adding {len(missing_traits)} missing traits from fallback")
+            logger.debug("Adding %s missing traits from fallback", len(missing_traits))
             for trait in missing_traits:
                 valid_rankings[trait] = fallback_rankings.get(trait, 34)
         
         # Normalize rankings to 1-34
         if len(valid_rankings) == 34:
             # Sort by current rank and reassign 1-34
-            sorted_traits = sorted(valid_rankings.items(), key=lambda x: x[1])
-            normalized_rankings = {}
-            for i, (trait, _) in enumerate(sorted_traits):
-                normalized_rankings[trait] = i + 1
+            normalized_rankings = TraitRanking.from_scores(valid_rankings)
             
-            print(f"DEBUG: Normalized rankings for {len(normalized_rankings)} traits")
+            logger.debug("Normalized rankings for %s traits", len(normalized_rankings))
             return normalized_rankings
         
-        print(f"DEBUG: Could not fix rankings, have {len(valid_rankings)} traits instead of 34")
+        logger.debug("Could not fix rankings, have %s traits instead of 34", len(valid_rankings))
         return fallback_rankings
 
+    @traced()
     async def generate_follow_up_questions(self, user_id: str, trait_rankings: Dict[str, int], 
                                    previous_responses: List[Dict[str, Any]], round_num: int) -> List[Dict[str, Any]]:
         """
         Generate follow-up questions based on trait rankings and previous responses
         """
-        print(f"DEBUG: Generating follow-up questions for user {user_id}, round {round_num}")
-        print(f"DEBUG: Retrieved trait rankings for {user_id}: {len(trait_rankings)} traits")
-        print(f"DEBUG: Previous responses count: {len(previous_responses)}")
+        logger.debug("Generating follow-up questions for user %s, round %s", user_id, round_num)
+        logger.debug("Retrieved trait rankings for %s: %s traits", user_id, len(trait_rankings))
+        logger.debug("Previous responses count: %s", len(previous_responses))
         
         try:
             if round_num == 1:
-                return self._generate_chapter_2_questions(user_id, trait_rankings)
+                questions = await self._in_llm_thread(self._generate_chapter_2_questions, user_id, trait_rankings)
+                # Persist newly banked questions with one append
+                await question_bank.flush()
+                return questions
             elif round_num == 2:
                 # Use refined rankings from Chapter 2 responses
                 refined_rankings = self._refine_rankings_from_chapter_2(previous_responses, trait_rankings)
-                return self._generate_chapter_3_questions(user_id, refined_rankings)
+                return await self._in_llm_thread(self._generate_chapter_3_questions, user_id, refined_rankings)
             else:
-                print(f"DEBUG: Invalid round number: {round_num}")
+                logger.debug("Invalid round number: %s", round_num)
                 return []
                 
         except Exception as e:
-            print(f"ERROR: Failed to generate follow-up questions: {e}")
+            logger.error("Failed to generate follow-up questions: %s", e)
             return []
 
     def _generate_chapter_2_questions(self, user_id: str, trait_rankings: Dict[str, int]) -> List[Dict[str, Any]]:
-        """Generate Chapter 2 dual-choice questions"""
-        print(f"DEBUG: Generating Chapter 2 questions for user {user_id}")
+        """Assemble Chapter 2 dual-choice questions from the question bank, generating only what it cannot cover"""
+        logger.debug("Generating Chapter 2 questions for user %s", user_id)
         
         # Get top 8 traits for Chapter 2
-        top_traits = sorted(trait_rankings.items(), key=lambda x: x[1])[:8]
-        top_trait_names = [trait[0] for trait in top_traits]
+        top_trait_names = TraitRanking.coerce(trait_rankings).top(SIGNATURE_SIZE)
+        
+        logger.debug("Top traits for Chapter 2: %s", top_trait_names)
         
-        print(f"DEBUG: Top traits for Chapter 2: {top_trait_names}")
+        selection = question_bank.select(top_trait_names)
+        questions = [question.as_question("") for question in selection.questions]
+        logger.debug("Question bank supplied %s questions; %s to generate for %s",
+                     len(questions), selection.needed, selection.uncovered)
+        metrics_registry.inc("question_bank_selections_total", outcome="top_up" if selection.needed else "bank")
         
-        base_prompt = get_chapter_2_generation_prompt(top_trait_names)
+        if selection.needed:
+            questions.extend(self._generate_chapter_2_top_up(top_trait_names, selection.uncovered or top_trait_names,
+                                                             selection.needed))
+        
+        # Pad from the bank if generation fell short, then number the set
+        questions = question_bank.fill(questions, top_trait_names)
+        for number, question in enumerate(questions, 1):
+            question['QuestionID'] = f'Q2-{number}'
+        logger.debug("Generated %s questions", len(questions))
+        
+        return questions
+
+    def _generate_chapter_2_top_up(self, top_trait_names: List[str], focus_traits: List[str],
+                                   count: int) -> List[Dict[str, Any]]:
+        """Generate count new questions for the given traits and add the tagged ones to the question bank"""
+        base_prompt = get_chapter_2_generation_prompt(top_trait_names, count, focus_traits)
         
         # Add extra instructions to ensure proper JSON format
         enhanced_prompt = f"""{base_prompt}
@@ -685,7 +709,7 @@ ABSOLUTELY CRITICAL - JSON FORMAT REQUIREMENTS:
 3. NO text after the closing ]
 4. NO explanations, NO comments, NO additional text
 5. NO markdown formatting like ```json
-6. Generate ALL 13 questions in ONE SINGLE continuous JSON array
+6. Generate ALL {count} questions in ONE SINGLE continuous JSON array
 
 EXAMPLE OF WHAT NOT TO DO:
 Here are the questions:
@@ -693,7 +717,7 @@ Here are the questions:
 This is a good set of questions.
 
 EXAMPLE OF CORRECT FORMAT:
-[{{"QuestionID":"Q2-1","Prompt":"Question text","Type":"multiple_choice","Option1":"A","Option2":"B","Option3":"C","Option4":"D"}},{{"QuestionID":"Q2-2","Prompt":"Question text","Type":"multiple_choice","Option1":"A","Option2":"B","Option3":"C","Option4":"D"}},...,{{"QuestionID":"Q2-13","Prompt":"Question text","Type":"multiple_choice","Option1":"A","Option2":"B","Option3":"C","Option4":"D"}}]
+[{{"QuestionID":"Q2-1","Prompt":"Question text","Type":"multiple_choice","Option1":"A","Option2":"B","Option3":"C","Option4":"D","Traits":["Focus","Arranger"]}},{{"QuestionID":"Q2-2","Prompt":"Question text","Type":"multiple_choice","Option1":"A","Option2":"B","Option3":"C","Option4":"D","Traits":["Empathy","Individualization"]}},...]
 
 Return ONLY the JSON array. Nothing else."""
         
@@ -703,46 +727,37 @@ Return ONLY the JSON array. Nothing else."""
         ]
         
         try:
-            print("DEBUG: Making API call for Chapter 2...")
-            # Increase max_tokens to ensure full response and reduce temperature for more consistent format
-            response = self._make_api_call(messages, max_tokens=3000, temperature=0.3)
-            print(f"DEBUG: API response length: {len(response)}")
-            print(f"DEBUG: First 500 chars of response: {response[:500]}")
-            
-            questions = self._parse_chapter_2_questions(response)
-            print(f"DEBUG: Successfully parsed {len(questions)} questions from AI")
-            
-            # If AI parsing failed, use our improved fallback questions
-            if len(questions) == 0:
-                print("DEBUG: AI parsing failed, using improved fallback questions")
-                questions = self._generate_fallback_chapter_2_questions(top_trait_names, 13)
-            
-            # Ensure we have exactly 13 questions
-            if len(questions) < 13:
-                print(f"DEBUG: Only got {len(questions)} questions, adding fallback questions...")
-                additional_needed = 13 - len(questions)
-                additional_questions = self._generate_fallback_chapter_2_questions(top_trait_names, additional_needed)
-                questions.extend(additional_questions)
+            logger.debug("Making API call for %s Chapter 2 questions...", count)
+            # Roughly 230 tokens per question, with headroom so the array is not truncated
+            response = self._make_api_call(messages, max_tokens=min(3000, 300 + 230 * count), temperature=0.3,
+                                           call_site="chapter_2_questions")
+            if not response:
+                return []
+            logger.debug("API response length: %s", len(response))
+            log_payload(logger, "Chapter 2 response", response)
             
-            # Limit to 13 questions
-            questions = questions[:13]
-            print(f"DEBUG: Generated {len(questions)} questions")
+            questions = self._parse_chapter_2_questions(response)[:count]
+            logger.debug("Successfully parsed %s questions from AI", len(questions))
+            llm_metrics.record_outcome("chapter_2_questions", self._question_outcome(len(questions), count))
             
+            question_bank.add(questions)
+            # Trait tags stay server-side; candidates only see the scenario and options
+            for question in questions:
+                question.pop('Traits', None)
             return questions
             
         except Exception as e:
-            print(f"ERROR: Failed to generate Chapter 2 questions: {e}")
-            return self._generate_fallback_chapter_2_questions(top_trait_names, 13)
+            logger.error("Failed to generate Chapter 2 questions: %s", e)
+            return []
 
     def _generate_chapter_3_questions(self, user_id: str, refined_rankings: Dict[str, int]) -> List[Dict[str, Any]]:
         """Generate Chapter 3 open-ended questions"""
-        print(f"DEBUG: Generating Chapter 3 questions for user {user_id}")
+        logger.debug("Generating Chapter 3 questions for user %s", user_id)
         
         # Get top 5 traits for Chapter 3
-        top_traits = sorted(refined_rankings.items(), key=lambda x: x[1])[:5]
-        top_trait_names = [trait[0] for trait in top_traits]
+        top_trait_names = TraitRanking.coerce(refined_rankings).top(5)
         
-        print(f"DEBUG: Top traits for Chapter 3: {top_trait_names}")
+        logger.debug("Top traits for Chapter 3: %s", top_trait_names)
         
         # Get previous results for context
         chapter_1_summary = f"Top traits from initial assessment: {', '.join(top_trait_names)}"
@@ -756,12 +771,13 @@ Return ONLY the JSON array. Nothing else."""
         ]
         
         try:
-            print("DEBUG: Making API call for Chapter 3...")
-            response = self._make_api_call(messages, max_tokens=1200, temperature=0.7)
-            print(f"DEBUG: API response length: {len(response)}")
+            logger.debug("Making API call for Chapter 3...")
+            response = self._make_api_call(messages, max_tokens=1200, temperature=0.7, call_site="chapter_3_questions")
+            logger.debug("API response length: %s", len(response))
             
             questions = self._parse_chapter_3_questions(response)
-            print(f"DEBUG: Successfully parsed {len(questions)} questions from AI")
+            logger.debug("Successfully parsed %s questions from AI", len(questions))
+            llm_metrics.record_outcome("chapter_3_questions", self._question_outcome(len(questions), 7))
             
             # Ensure we have exactly 7 questions
             if len(questions) < 7:
@@ -770,205 +786,74 @@ Return ONLY the JSON array. Nothing else."""
                 questions.extend(additional_questions)
             
             questions = questions[:7]
-            print(f"DEBUG: Generated {len(questions)} questions")
+            logger.debug("Generated %s questions", len(questions))
             
             return questions
             
         except Exception as e:
-            print(f"ERROR: Failed to generate Chapter 3 questions: {e}")
+            logger.error("Failed to generate Chapter 3 questions: %s", e)
             return self._generate_fallback_chapter_3_questions(top_trait_names, 7)
 
     def _parse_chapter_2_questions(self, response: str) -> List[Dict[str, Any]]:
-        """Parse Chapter 2 questions from AI response with robust JSON handling"""
-        print(f"DEBUG: Parsing AI response for Chapter 2 questions")
-        print(f"DEBUG: Response preview: {response[:500]}...")
-        
-        questions = []
+        """Parse Chapter 2 questions from AI response in a single tolerant pass"""
+        logger.debug("Parsing AI response for Chapter 2 questions")
+        log_payload(logger, "Response preview", response)
         
         try:
-            # First, clean the response
-            response_clean = response.strip()
-            
-            # Remove markdown code blocks if present
-            if response_clean.startswith('```json'):
-                response_clean = response_clean[7:].strip()
-            elif response_clean.startswith('```'):
-                response_clean = response_clean[3:].strip()
-            if response_clean.endswith('```'):
-                response_clean = response_clean[:-3].strip()
-            
-            # Strategy 1: Extract ONLY the JSON array part
-            start_idx = response_clean.find('[')
-            if start_idx >= 0:
-                # Find the matching closing bracket
-                bracket_count = 0
-                end_idx = -1
-                
-                for i in range(start_idx, len(response_clean)):
-                    if response_clean[i] == '[':
-                        bracket_count += 1
-                    elif response_clean[i] == ']':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            end_idx = i + 1
-                            break
-                
-                if end_idx > start_idx:
-                    json_part = response_clean[start_idx:end_idx]
-                    print(f"DEBUG: Extracted JSON array: {json_part[:200]}...")
-                    
-                    try:
-                        raw_questions = json.loads(json_part)
-                        print(f"DEBUG: Extracted JSON parsing successful: {len(raw_questions)} questions")
-                        questions = self._format_chapter_2_questions(raw_questions)
-                        if questions and len(questions) >= 10:  # Require at least 10 questions
-                            return questions
-                        else:
-                            print(f"DEBUG: Only got {len(questions)} questions, need at least 10")
-                            
-                    except json.JSONDecodeError as e2:
-                        print(f"DEBUG: Extracted JSON parsing failed: {e2}")
-                        
-                        # Strategy 2: Fix common JSON issues and try again
-                        fixed_json = self._fix_malformed_json(json_part)
-                        if fixed_json:
-                            try:
-                                raw_questions = json.loads(fixed_json)
-                                print(f"DEBUG: Fixed JSON parsing successful: {len(raw_questions)} questions")
-                                questions = self._format_chapter_2_questions(raw_questions)
-                                if questions and len(questions) >= 10:  # Require at least 10 questions
-                                    return questions
-                                else:
-                                    print(f"DEBUG: Fixed JSON only got {len(questions)} questions, need at least 10")
-                            except json.JSONDecodeError as e3:
-                                print(f"DEBUG: Fixed JSON parsing also failed: {e3}")
-            
-            # Strategy 3: Try direct parsing of the cleaned response (fallback)
-            try:
-                raw_questions = json.loads(response_clean)
-                print(f"DEBUG: Direct JSON parsing successful: {len(raw_questions)} questions")
-                questions = self._format_chapter_2_questions(raw_questions)
-                if questions:
-                    return questions
-            except json.JSONDecodeError as e:
-                print(f"DEBUG: Direct JSON parsing failed: {e}")
-                        
-            # Strategy 4: Parse individual question objects from text
-            questions = self._parse_questions_from_text(response_clean)
-            if questions:
-                print(f"DEBUG: Text parsing successful: {len(questions)} questions")
-                return questions
-                        
+            # Handles prose, markdown fences, one-array-per-question output and truncation
+            raw_questions = list(iter_json_objects(response))
+            logger.debug("Extracted %s question objects", len(raw_questions))
+            return self._format_chapter_2_questions(raw_questions)
         except Exception as e:
-            print(f"DEBUG: JSON parsing failed with exception: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        print(f"DEBUG: All parsing strategies failed, returning empty list")
-        return questions
+            logger.debug("JSON parsing failed with exception: %s", e)
+            return []
 
     def _format_chapter_2_questions(self, raw_questions: List[Dict]) -> List[Dict[str, Any]]:
         """Format raw question data into expected format"""
         questions = []
         
         if not isinstance(raw_questions, list):
-            print(f"DEBUG: Expected list, got {type(raw_questions)}")
+            logger.debug("Expected list, got %s", type(raw_questions))
             return questions
             
         for i, q in enumerate(raw_questions):
             if not isinstance(q, dict):
-                print(f"DEBUG: Question {i+1} is not a dict: {type(q)}")
+                logger.debug("Question %s is not a dict: %s", i+1, type(q))
                 continue
                 
             formatted_question = {
                 'QuestionID': q.get('QuestionID', f'Q{i+1}'),
-                'QuestionText': q.get('Prompt', '').strip(),
-                'Prompt': q.get('Prompt', '').strip(),
+                'QuestionText': str(q.get('Prompt') or '').strip(),
+                'Prompt': str(q.get('Prompt') or '').strip(),
                 'Type': 'multiple_choice',
-                'Option1': q.get('Option1', '').strip(),
-                'Option2': q.get('Option2', '').strip(),
-                'Option3': q.get('Option3', '').strip(),
-                'Option4': q.get('Option4', '').strip()
+                'Option1': str(q.get('Option1') or '').strip(),
+                'Option2': str(q.get('Option2') or '').strip(),
+                'Option3': str(q.get('Option3') or '').strip(),
+                'Option4': str(q.get('Option4') or '').strip()
             }
             
+            # Trait tags let the question be banked; unknown names are dropped
+            if isinstance(q.get('Traits'), list):
+                traits = [trait for trait in q['Traits'] if isinstance(trait, str) and trait in trait_registry.index]
+                if traits:
+                    formatted_question['Traits'] = traits
+            
             # Validate that all required fields are present and non-empty
             if all(formatted_question[key] for key in ['QuestionText', 'Option1', 'Option2', 'Option3', 'Option4']):
                 questions.append(formatted_question)
-                print(f"DEBUG: Added valid question {i+1}: {formatted_question['QuestionText'][:50]}...")
+                logger.debug("Added valid question %s: %s...", i+1, formatted_question['QuestionText'][:50])
             else:
                 missing_fields = [key for key in ['QuestionText', 'Option1', 'Option2', 'Option3', 'Option4'] 
                                 if not formatted_question[key]]
-                print(f"DEBUG: Skipped invalid question {i+1}: missing {missing_fields}")
+                logger.debug("Skipped invalid question %s: missing %s", i+1, missing_fields)
         
-        print(f"DEBUG: Successfully formatted {len(questions)} valid questions from JSON")
-        return questions
-
-    def _fix_malformed_json(self, json_text: str) -> str:
-        """Attempt to fix common JSON syntax issues"""
-        try:
-            # Remove trailing commas before closing brackets/braces
-            fixed = re.sub(r',(\s*[}\]])', r'\1', json_text)
-            
-            # Fix missing quotes around keys (basic attempt)
-            fixed = re.sub(r'(\w+):', r'"\1":', fixed)
-            
-            # Fix unescaped quotes in strings (basic attempt)
-            # This is tricky and might not work for all cases
-            
-            # Ensure the JSON is properly terminated
-            if not fixed.strip().endswith(']'):
-                # Try to close the array properly
-                last_brace = fixed.rfind('}')
-                if last_brace > 0:
-                    fixed = fixed[:last_brace+1] + ']'
-            
-            print(f"DEBUG: Attempting to fix JSON: {fixed[:200]}...")
-            return fixed
-            
-        except Exception as e:
-            print(f"DEBUG: Failed to fix JSON: {e}")
-            return None
-
-    def _parse_questions_from_text(self, text: str) -> List[Dict[str, Any]]:
-        """Parse questions from malformed or partial text response"""
-        questions = []
-        
-        try:
-            # Look for question patterns in the text
-            # This is a fallback method for when JSON parsing completely fails
-            
-            # Try to find individual question objects with regex
-            question_pattern = r'\{\s*"QuestionID"\s*:\s*"([^"]+)"\s*,\s*"Prompt"\s*:\s*"([^"]+)"\s*,.*?"Option1"\s*:\s*"([^"]+)"\s*,\s*"Option2"\s*:\s*"([^"]+)"\s*,\s*"Option3"\s*:\s*"([^"]+)"\s*,\s*"Option4"\s*:\s*"([^"]+)"\s*[,}]'
-            
-            matches = re.findall(question_pattern, text, re.DOTALL)
-            print(f"DEBUG: Found {len(matches)} question patterns in text")
-            
-            for i, match in enumerate(matches):
-                if len(match) >= 6:
-                    question = {
-                        'QuestionID': match[0] or f'Q{i+1}',
-                        'QuestionText': match[1].strip(),
-                        'Prompt': match[1].strip(),
-                        'Type': 'multiple_choice',
-                        'Option1': match[2].strip(),
-                        'Option2': match[3].strip(),
-                        'Option3': match[4].strip(),
-                        'Option4': match[5].strip()
-                    }
-                    
-                    if all(question[key] for key in ['QuestionText', 'Option1', 'Option2', 'Option3', 'Option4']):
-                        questions.append(question)
-                        print(f"DEBUG: Extracted question {i+1}: {question['QuestionText'][:50]}...")
-            
-        except Exception as e:
-            print(f"DEBUG: Text parsing failed: {e}")
-            
+        logger.debug("Successfully formatted %s valid questions from JSON", len(questions))
         return questions
 
     def _parse_chapter_3_questions(self, response: str) -> List[Dict[str, Any]]:
         """Parse Chapter 3 questions from AI response"""
-        print(f"DEBUG: Parsing Chapter 3 response length: {len(response)}")
-        print(f"DEBUG: First 300 chars: {response[:300]}")
+        logger.debug("Parsing Chapter 3 response length: %s", len(response))
+        log_payload(logger, "Chapter 3 response", response)
         
         questions = []
         
@@ -979,7 +864,7 @@ Return ONLY the JSON array. Nothing else."""
         question_pattern = r'Q(\d+):\s*(.+?)(?=\n(?:Q\d+:|$)|$)'
         matches = re.findall(question_pattern, response, re.DOTALL | re.MULTILINE)
         
-        print(f"DEBUG: Found {len(matches)} question matches")
+        logger.debug("Found %s question matches", len(matches))
         
         for num, question_text in matches:
             question_text = question_text.strip()
@@ -993,11 +878,11 @@ Return ONLY the JSON array. Nothing else."""
                     'Prompt': question_text,
                     'Type': 'open_ended'
                 })
-                print(f"DEBUG: Added question {num}: {question_text[:50]}...")
+                logger.debug("Added question %s: %s...", num, question_text[:50])
         
         # If no matches found, try alternative parsing
         if not questions:
-            print("DEBUG: No Q format found, trying line-by-line parsing")
+            logger.debug("No Q format found, trying line-by-line parsing")
             lines = response.split('\n')
             question_count = 1
             
@@ -1024,7 +909,7 @@ Return ONLY the JSON array. Nothing else."""
                                 'Prompt': cleaned_question,
                                 'Type': 'open_ended'
                             })
-                            print(f"DEBUG: Added parsed question: {cleaned_question[:50]}...")
+                            logger.debug("Added parsed question: %s...", cleaned_question[:50])
                             question_count += 1
                     continue
                 
@@ -1047,141 +932,14 @@ Return ONLY the JSON array. Nothing else."""
                             'Type': 'open_ended'
                         })
                         question_count += 1
-                        print(f"DEBUG: Added parsed question: {cleaned_line[:50]}...")
+                        logger.debug("Added parsed question: %s...", cleaned_line[:50])
                         
                         if len(questions) >= 7:
                             break
         
-        print(f"DEBUG: Final parsed questions count: {len(questions)}")
+        logger.debug("Final parsed questions count: %s", len(questions))
         return questions
 
-    def _generate_fallback_chapter_2_questions(self, top_traits: List[str], count: int) -> List[Dict[str, Any]]:
-        """Generate fallback Chapter 2 questions if AI fails"""
-        fallback_questions = [
-            {
-                'QuestionID': 'Q1',
-                'QuestionText': 'Your team missed an important deadline and stakeholders are frustrated. What\'s your immediate response?',
-                'Prompt': 'Your team missed an important deadline and stakeholders are frustrated. What\'s your immediate response?',
-                'Type': 'multiple_choice',
-                'Option1': 'Take charge and create a recovery plan with clear next steps',
-                'Option2': 'Analyze what went wrong to prevent future issues',
-                'Option3': 'Focus on maintaining team morale and motivation',
-                'Option4': 'Ensure everyone understands their responsibilities moving forward'
-            },
-            {
-                'QuestionID': 'Q2',
-                'QuestionText': 'You discover a colleague is struggling with their workload but hasn\'t asked for help. What do you do?',
-                'Prompt': 'You discover a colleague is struggling with their workload but hasn\'t asked for help. What do you do?',
-                'Type': 'multiple_choice',
-                'Option1': 'Offer specific assistance with tasks you can handle',
-                'Option2': 'Help them organize and prioritize their workload',
-                'Option3': 'Connect them with others who might provide support',
-                'Option4': 'Encourage them to communicate their needs to management'
-            },
-            {
-                'QuestionID': 'Q3',
-                'QuestionText': 'During a brainstorming session, the discussion becomes chaotic with too many ideas. How do you respond?',
-                'Prompt': 'During a brainstorming session, the discussion becomes chaotic with too many ideas. How do you respond?',
-                'Type': 'multiple_choice',
-                'Option1': 'Suggest a structured approach to evaluate each idea',
-                'Option2': 'Build on the most promising ideas to develop them further',
-                'Option3': 'Help synthesize different viewpoints into cohesive themes',
-                'Option4': 'Focus the group on ideas that align with strategic goals'
-            },
-            {
-                'QuestionID': 'Q4',
-                'QuestionText': 'You\'re assigned to lead a project with team members you\'ve never worked with before. What\'s your first priority?',
-                'Prompt': 'You\'re assigned to lead a project with team members you\'ve never worked with before. What\'s your first priority?',
-                'Type': 'multiple_choice',
-                'Option1': 'Establish clear roles, responsibilities, and timelines',
-                'Option2': 'Get to know each person\'s strengths and working style',
-                'Option3': 'Create opportunities for the team to build relationships',
-                'Option4': 'Define the project vision and success metrics'
-            },
-            {
-                'QuestionID': 'Q5',
-                'QuestionText': 'A long-standing company process is inefficient, but changing it would disrupt many people. What do you do?',
-                'Prompt': 'A long-standing company process is inefficient, but changing it would disrupt many people. What do you do?',
-                'Type': 'multiple_choice',
-                'Option1': 'Research and present data supporting the need for change',
-                'Option2': 'Gradually implement small improvements to minimize disruption',
-                'Option3': 'Build consensus by involving stakeholders in the solution',
-                'Option4': 'Focus on training people to work more effectively within the current system'
-            },
-            {
-                'QuestionID': 'Q6',
-                'QuestionText': 'You receive harsh criticism about your work in front of your peers. How do you handle it?',
-                'Prompt': 'You receive harsh criticism about your work in front of your peers. How do you handle it?',
-                'Type': 'multiple_choice',
-                'Option1': 'Stay calm and ask clarifying questions to understand the specific issues',
-                'Option2': 'Thank them for the feedback and discuss how to improve privately',
-                'Option3': 'Address any valid points while professionally defending your approach',
-                'Option4': 'Focus on what you can learn and how to apply it going forward'
-            },
-            {
-                'QuestionID': 'Q7',
-                'QuestionText': 'Your team is celebrating a major win, but you notice the success was largely due to one person\'s efforts. What do you do?',
-                'Prompt': 'Your team is celebrating a major win, but you notice the success was largely due to one person\'s efforts. What do you do?',
-                'Type': 'multiple_choice',
-                'Option1': 'Make sure that person gets proper recognition for their contribution',
-                'Option2': 'Use this as a learning opportunity to improve team collaboration',
-                'Option3': 'Celebrate the team while privately acknowledging the key contributor',
-                'Option4': 'Focus on how to replicate this success in future projects'
-            },
-            {
-                'QuestionID': 'Q8',
-                'QuestionText': 'You\'re in a meeting where a controversial decision needs to be made quickly. How do you contribute?',
-                'Prompt': 'You\'re in a meeting where a controversial decision needs to be made quickly. How do you contribute?',
-                'Type': 'multiple_choice',
-                'Option1': 'Present the facts and logical implications of each option',
-                'Option2': 'Advocate strongly for the option you believe is best',
-                'Option3': 'Help the group find common ground and areas of agreement',
-                'Option4': 'Ask questions to ensure all perspectives are considered'
-            },
-            {
-                'QuestionID': 'Q9',
-                'QuestionText': 'A new team member seems hesitant to participate in discussions and appears overwhelmed. What\'s your approach?',
-                'Prompt': 'A new team member seems hesitant to participate in discussions and appears overwhelmed. What\'s your approach?',
-                'Type': 'multiple_choice',
-                'Option1': 'Give them specific, manageable tasks to build their confidence',
-                'Option2': 'Spend time one-on-one understanding their concerns and background',
-                'Option3': 'Include them directly in conversations and actively seek their input',
-                'Option4': 'Connect them with resources and people who can help them succeed'
-            },
-            {
-                'QuestionID': 'Q10',
-                'QuestionText': 'Your organization is implementing a major change that you disagree with. How do you respond?',
-                'Prompt': 'Your organization is implementing a major change that you disagree with. How do you respond?',
-                'Type': 'multiple_choice',
-                'Option1': 'Voice your concerns through proper channels with supporting evidence',
-                'Option2': 'Focus on helping your team adapt and find opportunities within the change',
-                'Option3': 'Work to understand the reasoning behind the decision',
-                'Option4': 'Commit to making the change successful despite your reservations'
-            },
-            {
-                'QuestionID': 'Q11',
-                'QuestionText': 'You have multiple high-priority projects with competing deadlines. How do you handle this situation?',
-                'Prompt': 'You have multiple high-priority projects with competing deadlines. How do you handle this situation?',
-                'Type': 'multiple_choice',
-                'Option1': 'Create a detailed schedule and systematically work through each task',
-                'Option2': 'Negotiate with stakeholders to adjust expectations and timelines',
-                'Option3': 'Focus intensely on one project at a time to ensure quality',
-                'Option4': 'Identify which projects will have the greatest impact and prioritize accordingly'
-            },
-            {
-                'QuestionID': 'Q12',
-                'QuestionText': 'During a team presentation, a colleague makes a factual error that could mislead the audience. What do you do?',
-                'Prompt': 'During a team presentation, a colleague makes a factual error that could mislead the audience. What do you do?',
-                'Type': 'multiple_choice',
-                'Option1': 'Politely correct the information immediately to prevent confusion',
-                'Option2': 'Make a note to address it privately with your colleague afterward',
-                'Option3': 'Find a diplomatic way to introduce the correct information',
-                'Option4': 'Support your colleague publicly and clarify details in follow-up communication'
-            }
-        ]
-        
-        return fallback_questions[:count]
-
     def _generate_fallback_chapter_3_questions(self, top_traits: List[str], count: int) -> List[Dict[str, Any]]:
         """Generate fallback Chapter 3 questions if AI fails"""
         fallback_questions = []
@@ -1209,7 +967,7 @@ Return ONLY the JSON array. Nothing else."""
     def _refine_rankings_from_chapter_2(self, chapter_2_responses: List[Dict[str, Any]], 
                                       initial_rankings: Dict[str, int]) -> Dict[str, int]:
         """Refine trait rankings based on Chapter 2 dual-choice responses"""
-        print("DEBUG: Refining rankings based on Chapter 2 responses")
+        logger.debug("Refining rankings based on Chapter 2 responses")
         
         if not chapter_2_responses:
             return initial_rankings
@@ -1226,25 +984,32 @@ Return ONLY the JSON array. Nothing else."""
                 choice_analysis[second_choice] = choice_analysis.get(second_choice, 0) + 1
         
         # Get top traits based on initial rankings
-        sorted_traits = sorted(initial_rankings.items(), key=lambda x: x[1])
-        top_15_traits = dict(sorted_traits[:15])
+        initial_ranking = TraitRanking.coerce(initial_rankings)
+        top_15_traits = {trait: initial_ranking[trait] for trait in initial_ranking.top(15)}
         
-        print(f"DEBUG: Refined to top 15 traits: {list(top_15_traits.keys())}")
+        logger.debug("Refined to top 15 traits: %s", list(top_15_traits.keys()))
         
         return top_15_traits
     
-    async def generate_summary(self, user_id: str, initial_responses: List[Dict[str, Any]], trait_rankings: Dict[str, int], summary_type: str = "initial") -> str:
+    @traced()
+    def fallback_summary(self, trait_rankings: Dict[str, int]) -> str:
+        """Canned summary naming the top three traits, used when the LLM call fails"""
+        top_traits = TraitRanking.coerce(trait_rankings).top(3)
+        return f"Based on your assessment, your top strengths are {', '.join(top_traits)}. These traits indicate strong potential in execution and strategic thinking, making you a valuable team contributor."
+
+    async def generate_summary(self, user_id: str, initial_responses: List[Dict[str, Any]], trait_rankings: Dict[str, int],
+                               summary_type: str = "initial", allow_fallback: bool = True) -> Optional[str]:
         """
-        Generate a personality summary based on trait rankings and responses
+        Generate a personality summary based on trait rankings and responses.
+        With allow_fallback=False a failed call returns None instead of the canned summary.
         """
-        print(f"DEBUG: Generating {summary_type} summary for user {user_id}")
-        print(f"DEBUG: Got {len(trait_rankings)} traits and {len(initial_responses)} responses")
+        logger.debug("Generating %s summary for user %s", summary_type, user_id)
+        logger.debug("Got %s traits and %s responses", len(trait_rankings), len(initial_responses))
         
         # Get top 5 traits for summary
-        sorted_traits = sorted(trait_rankings.items(), key=lambda x: x[1])
-        top_traits = [trait for trait, _ in sorted_traits[:5]]
+        top_traits = TraitRanking.coerce(trait_rankings).top(5)
         
-        print(f"DEBUG: Top 5 traits for summary: {top_traits}")
+        logger.debug("Top 5 traits for summary: %s", top_traits)
         
         # Create summary prompt with specific format
         summary_prompt = f"""
@@ -1275,22 +1040,26 @@ Return ONLY the JSON array. Nothing else."""
         ]
         
         try:
-            response = self._make_api_call(messages, max_tokens=200, temperature=0.7)
+            response = await self._in_llm_thread(
+                self._make_api_call, messages, max_tokens=200, temperature=0.7, call_site=f"summary_{summary_type}"
+            )
             return response.strip()
         except Exception as e:
-            print(f"Error generating summary: {e}")
-            # Fallback summary
-            return f"Based on your assessment, your top strengths are {', '.join(top_traits[:3])}. These traits indicate strong potential in execution and strategic thinking, making you a valuable team contributor."
+            logger.error("Error generating summary: %s", e)
+            return self.fallback_summary(trait_rankings) if allow_fallback else None
 
+    @traced()
     async def update_trait_rankings(self, current_rankings: Dict[str, int],
                                   new_responses: List[Dict[str, Any]],
-                                  round_num: int) -> Dict[str, int]:
+                                  round_num: int,
+                                  allow_fallback: bool = True) -> Optional[Dict[str, int]]:
         """
-        Update trait rankings based on follow-up responses
+        Update trait rankings based on follow-up responses.
+        With allow_fallback=False a failed update returns None instead of the unchanged rankings.
         """
-        print(f"DEBUG: Updating trait rankings for round {round_num}")
-        print(f"DEBUG: Current rankings: {len(current_rankings)} traits")
-        print(f"DEBUG: New responses: {len(new_responses)} responses")
+        logger.debug("Updating trait rankings for round %s", round_num)
+        logger.debug("Current rankings: %s traits", len(current_rankings))
+        logger.debug("New responses: %s responses", len(new_responses))
         
         try:
             if round_num == 1:
@@ -1298,19 +1067,23 @@ Return ONLY the JSON array. Nothing else."""
                 return self._update_rankings_from_chapter_2(current_rankings, new_responses)
             elif round_num == 2:
                 # Chapter 3: Open-ended responses
-                return self._update_rankings_from_chapter_3(current_rankings, new_responses)
+                return await self._in_llm_thread(
+                    self._update_rankings_from_chapter_3, current_rankings, new_responses, allow_fallback
+                )
             else:
-                print(f"DEBUG: Unknown round number: {round_num}, returning current rankings")
+                logger.debug("Unknown round number: %s, returning current rankings", round_num)
                 return current_rankings
                 
         except Exception as e:
-            print(f"ERROR: Failed to update trait rankings: {e}")
+            logger.error("Failed to update trait rankings: %s", e)
+            if not allow_fallback:
+                return None
             return current_rankings or self._get_fallback_rankings()
 
     def _update_rankings_from_chapter_2(self, current_rankings: Dict[str, int], 
                                        responses: List[Dict[str, Any]]) -> Dict[str, int]:
         """Update rankings based on Chapter 2 dual-choice responses"""
-        print(f"DEBUG: Processing Chapter 2 dual-choice responses")
+        logger.debug("Processing Chapter 2 dual-choice responses")
         
         # Create weighted scores based on choice selections
         trait_scores = {}
@@ -1323,7 +1096,7 @@ Return ONLY the JSON array. Nothing else."""
             first_choice = response.get('firstChoice')
             second_choice = response.get('secondChoice')
             
-            print(f"DEBUG: Processing response - First: {first_choice}, Second: {second_choice}")
+            logger.debug("Processing response - First: %s, Second: %s", first_choice, second_choice)
             
             # Apply choice-based scoring (this is simplified - in production you'd map choices to specific traits)
             # For now, we'll apply small adjustments based on choice patterns
@@ -1338,19 +1111,16 @@ Return ONLY the JSON array. Nothing else."""
                         trait_scores[trait] = max(1, trait_scores[trait] - 1)
         
         # Convert scores back to rankings (1-34)
-        sorted_traits = sorted(trait_scores.items(), key=lambda x: x[1])
-        updated_rankings = {}
+        updated_rankings = TraitRanking.from_scores(trait_scores)
         
-        for rank, (trait, _) in enumerate(sorted_traits, 1):
-            updated_rankings[trait] = rank
-        
-        print(f"DEBUG: Updated rankings completed with {len(updated_rankings)} traits")
+        logger.debug("Updated rankings completed with %s traits", len(updated_rankings))
         return updated_rankings
 
     def _update_rankings_from_chapter_3(self, current_rankings: Dict[str, int], 
-                                       responses: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Update rankings based on Chapter 3 open-ended responses"""
-        print(f"DEBUG: Processing Chapter 3 open-ended responses")
+                                       responses: List[Dict[str, Any]],
+                                       allow_fallback: bool = True) -> Optional[Dict[str, int]]:
+        """Update rankings based on Chapter 3 open-ended responses (None on failure unless allow_fallback)"""
+        logger.debug("Processing Chapter 3 open-ended responses")
         
         # For Chapter 3, we analyze the text responses with AI to refine rankings
         response_texts = []
@@ -1359,14 +1129,14 @@ Return ONLY the JSON array. Nothing else."""
                 response_texts.append(f"Q{resp.get('questionId', 'X')}: {resp.get('response')}")
         
         if not response_texts:
-            print("DEBUG: No text responses found, returning current rankings")
+            logger.debug("No text responses found, returning current rankings")
             return current_rankings
         
         # Use AI to analyze the depth responses and refine rankings
         analysis_prompt = f"""
         Based on these detailed Chapter 3 responses, refine the CliftonStrengths trait rankings.
         
-        Current top traits: {', '.join([trait for trait, rank in sorted(current_rankings.items(), key=lambda x: x[1])[:10]])}
+        Current top traits: {', '.join(TraitRanking.coerce(current_rankings).top(10))}
         
         User's detailed responses:
         {chr(10).join(response_texts)}
@@ -1375,7 +1145,22 @@ Return ONLY the JSON array. Nothing else."""
         Look for:
         1. Consistency with current rankings
         2. New insights that might elevate certain traits
-        3. Evidence that some traits might be less prominent
+        3. Evidence that some traits might be less prominent"""
+        
+        if self.uses_structured_output:
+            try:
+                structured_rankings = self._rank_with_structured_output(
+                    analysis_prompt, "chapter_3_rankings", fallback_rankings=current_rankings
+                )
+                if structured_rankings:
+                    logger.debug("Successfully refined rankings with structured AI analysis")
+                    return structured_rankings
+            except Exception as e:
+                logger.error("Structured ranking refinement failed: %s", e)
+            logger.debug("Structured refinement unusable, returning current rankings")
+            return current_rankings if allow_fallback else None
+        
+        analysis_prompt += """
         
         CRITICAL JSON REQUIREMENTS:
         - Return ONLY a valid JSON object with ALL 34 traits ranked 1-34
@@ -1387,15 +1172,15 @@ Return ONLY the JSON array. Nothing else."""
         - Use EXACTLY these trait names (copy them exactly): Achiever, Activator, Adaptability, Analytical, Arranger, Belief, Command, Communication, Competition, Connectedness, Consistency, Context, Deliberative, Developer, Discipline, Empathy, Focus, Futuristic, Harmony, Ideation, Includer, Individualization, Input, Intellection, Learner, Maximizer, Positivity, Relator, Responsibility, Restorative, Self-Assurance, Significance, Strategic, Woo
         
         WRONG FORMAT EXAMPLES (DO NOT USE):
-        {{"Significance": 6, "Communication": 5, "Strategic": "Revised from #5 to #4"}}
-        {{"LearnerStrategic": 1, "Achiever": 2}}  <!-- NEVER combine traits
-        {{"learner": 1, "strategic": 2}}  <!-- NEVER use lowercase
-        {{"Achiever": 4, "Activator": 6, "Significance": "6 (tied with Activator)"}}
+        {"Significance": 6, "Communication": 5, "Strategic": "Revised from #5 to #4"}
+        {"LearnerStrategic": 1, "Achiever": 2}  <!-- NEVER combine traits
+        {"learner": 1, "strategic": 2}  <!-- NEVER use lowercase
+        {"Achiever": 4, "Activator": 6, "Significance": "6 (tied with Activator)"}
         
         CORRECT FORMAT (USE THIS):
-        {{"Achiever": 1, "Activator": 2, "Adaptability": 3, "Analytical": 4, "Arranger": 5, "Belief": 6, "Command": 7, "Communication": 8, "Competition": 9, "Connectedness": 10, "Consistency": 11, "Context": 12, "Deliberative": 13, "Developer": 14, "Discipline": 15, "Empathy": 16, "Focus": 17, "Futuristic": 18, "Harmony": 19, "Ideation": 20, "Includer": 21, "Individualization": 22, "Input": 23, "Intellection": 24, "Learner": 25, "Maximizer": 26, "Positivity": 27, "Relator": 28, "Responsibility": 29, "Restorative": 30, "Self-Assurance": 31, "Significance": 32, "Strategic": 33, "Woo": 34}}
+        {"Achiever": 1, "Activator": 2, "Adaptability": 3, "Analytical": 4, "Arranger": 5, "Belief": 6, "Command": 7, "Communication": 8, "Competition": 9, "Connectedness": 10, "Consistency": 11, "Context": 12, "Deliberative": 13, "Developer": 14, "Discipline": 15, "Empathy": 16, "Focus": 17, "Futuristic": 18, "Harmony": 19, "Ideation": 20, "Includer": 21, "Individualization": 22, "Input": 23, "Intellection": 24, "Learner": 25, "Maximizer": 26, "Positivity": 27, "Relator": 28, "Responsibility": 29, "Restorative": 30, "Self-Assurance": 31, "Significance": 32, "Strategic": 33, "Woo": 34}
         
-        Return ONLY the JSON object starting with {{ and ending with }}. No other text."""
+        Return ONLY the JSON object starting with { and ending with }. No other text."""
         
         messages = [
             {"role": "system", "content": self.system_prompt},
@@ -1403,139 +1188,53 @@ Return ONLY the JSON array. Nothing else."""
         ]
         
         try:
-            response = self._make_api_call(messages, max_tokens=800, temperature=0.3)
+            response = self._make_api_call(messages, max_tokens=800, temperature=0.3, call_site="chapter_3_rankings")
             refined_rankings = self._parse_trait_rankings(response)
             
             if self._validate_rankings(refined_rankings):
-                print(f"DEBUG: Successfully refined rankings with AI analysis")
+                logger.debug("Successfully refined rankings with AI analysis")
+                llm_metrics.record_outcome("chapter_3_rankings", "ok")
                 return refined_rankings
+            elif not allow_fallback and len(refined_rankings or {}) < MIN_REPAIRABLE_INDICES:
+                # Re-scoring only: a reply this short would be mostly the current ranks filled back in
+                logger.debug("AI rankings too incomplete to re-score from")
+                llm_metrics.record_outcome("chapter_3_rankings", "invalid")
+                return None
             else:
-                print("DEBUG: AI rankings validation failed, attempting to fix rankings")
+                logger.debug("AI rankings validation failed, attempting to fix rankings")
                 # Try to fix the rankings if they're close but not perfect
                 fixed_rankings = self._fix_invalid_rankings(refined_rankings, current_rankings)
                 if self._validate_rankings(fixed_rankings):
-                    print("DEBUG: Successfully fixed invalid rankings")
+                    logger.debug("Successfully fixed invalid rankings")
+                    llm_metrics.record_outcome("chapter_3_rankings", "fixed")
                     return fixed_rankings
                 else:
-                    print("DEBUG: Could not fix rankings, returning current rankings")
-                    return current_rankings
+                    logger.debug("Could not fix rankings, returning current rankings")
+                    llm_metrics.record_outcome("chapter_3_rankings", "invalid")
+                    return current_rankings if allow_fallback else None
                 
         except Exception as e:
-            print(f"ERROR: Failed to refine rankings with AI: {e}")
-            return current_rankings
+            logger.error("Failed to refine rankings with AI: %s", e)
+            return current_rankings if allow_fallback else None
 
     def _parse_trait_rankings(self, response: str) -> Dict[str, int]:
         """Parse trait rankings from AI response"""
         try:
-            import json
-            import re
+            log_payload(logger, "Parsing response", response)
             
-            print(f"DEBUG: Parsing response: {response[:300]}...")
+            # Comments like "(tied with Activator)", "-> revised" and **markup** are skipped by the extractor
+            raw_rankings = extract_json(response, dict)
+            if not raw_rankings:
+                logger.debug("No valid JSON found in response")
+                return {}
             
-            # Pre-clean the response to remove common issues
-            cleaned_response = response.strip()
+            rankings = self._coerce_rankings(raw_rankings)
+            logger.debug("Parsed %s valid traits", len(rankings))
             
-            # Remove any text before the first { and after the last }
-            start_idx = cleaned_response.find('{')
-            end_idx = cleaned_response.rfind('}')
-            
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                cleaned_response = cleaned_response[start_idx:end_idx + 1]
-                print(f"DEBUG: Extracted JSON section: {cleaned_response[:200]}...")
-            
-            # Remove problematic patterns before JSON parsing
-            # Remove markdown formatting
-            cleaned_response = re.sub(r'\*\*[^*]*\*\*', '', cleaned_response)
-            # Remove parenthetical explanations like "(tied with Activator)"
-            cleaned_response = re.sub(r'\([^)]*\)', '', cleaned_response)
-            # Remove explanatory text after values like "-> 5 (swapped with Communication..."
-            cleaned_response = re.sub(r'->.*?(?=[,}])', '', cleaned_response)
-            # Remove any text that looks like revisions: "Revised from #5 to #4"
-            cleaned_response = re.sub(r'"[^"]*(?:Revised|revised|->)[^"]*"', '', cleaned_response)
-            # Clean up any double commas or malformed separators
-            cleaned_response = re.sub(r',\s*,', ',', cleaned_response)
-            # Remove trailing commas before }
-            cleaned_response = re.sub(r',\s*}', '}', cleaned_response)
-            # Clean up whitespace
-            cleaned_response = re.sub(r'\s+', ' ', cleaned_response)
-            
-            print(f"DEBUG: Pre-cleaned response: {cleaned_response[:300]}...")
-            
-            # Try direct JSON parsing first
-            try:
-                rankings = json.loads(cleaned_response)
-                if isinstance(rankings, dict):
-                    cleaned_rankings = {}
-                    for trait, rank in rankings.items():
-                        # Only include valid CliftonStrengths traits
-                        if trait in self.all_traits:
-                            try:
-                                # Handle both int and string values
-                                if isinstance(rank, str):
-                                    # Extract just the number from strings like "6 (tied with...)"
-                                    rank_match = re.search(r'\d+', rank)
-                                    if rank_match:
-                                        rank = int(rank_match.group())
-                                    else:
-                                        continue
-                                cleaned_rankings[trait] = int(rank)
-                            except (ValueError, TypeError):
-                                continue
-                        else:
-                            print(f"DEBUG: Skipping invalid trait in direct parsing: {trait}")
-                    
-                    print(f"DEBUG: Direct JSON parsing successful: {len(cleaned_rankings)} traits")
-                    
-                    # If we have exactly 34 valid traits, return them
-                    if len(cleaned_rankings) == 34:
-                        return cleaned_rankings
-                    elif len(cleaned_rankings) > 34:
-                        print(f"DEBUG: Too many traits ({len(cleaned_rankings)}), filtering to top 34")
-                        # Sort by rank and take top 34
-                        sorted_traits = sorted(cleaned_rankings.items(), key=lambda x: x[1])[:34]
-                        return dict(sorted_traits)
-                    else:
-                        print(f"DEBUG: Not enough valid traits ({len(cleaned_rankings)}), continuing to regex parsing")
-                        
-            except json.JSONDecodeError as e:
-                print(f"DEBUG: Direct JSON parsing failed: {e}")
-            
-            # If direct parsing fails, try to reconstruct valid JSON
-            # Extract key-value pairs using regex
-            pattern = r'"([^"]+)":\s*(\d+)'
-            matches = re.findall(pattern, cleaned_response)
-            
-            if matches:
-                reconstructed = {}
-                for trait, rank in matches:
-                    # Only include valid CliftonStrengths traits
-                    if trait in self.all_traits:
-                        try:
-                            reconstructed[trait] = int(rank)
-                        except (ValueError, TypeError):
-                            continue
-                    else:
-                        print(f"DEBUG: Skipping invalid trait: {trait}")
-                
-                if len(reconstructed) > 0:
-                    print(f"DEBUG: Regex parsing successful: {len(reconstructed)} traits")
-                    
-                    # If we have exactly 34 valid traits, return them
-                    if len(reconstructed) == 34:
-                        return reconstructed
-                    elif len(reconstructed) > 34:
-                        print(f"DEBUG: Too many traits ({len(reconstructed)}), filtering to top 34")
-                        # Sort by rank and take top 34
-                        sorted_traits = sorted(reconstructed.items(), key=lambda x: x[1])[:34]
-                        return dict(sorted_traits)
-                    else:
-                        print(f"DEBUG: Not enough valid traits ({len(reconstructed)}), need 34")
-                        return {}
-            
-            print("DEBUG: No valid JSON found in response")
-            return {}
+            # Partial (e.g. truncated) rankings are returned as-is and completed by _fix_invalid_rankings
+            return rankings
         except Exception as e:
-            print(f"Error parsing trait rankings: {e}")
+            logger.error("Error parsing trait rankings: %s", e)
             return {}
 
     def _map_choices_to_traits(self, first_choice: str, second_choice: str) -> List[str]:
@@ -0,0 +1,210 @@
+"""
+Prompt Assembly with Precomputed Fragments
+Static prompt text (system prompt, priming, methodology and behavioral
+indicators) is assembled once at import. Every analysis prompt starts with
+a byte-identical static prefix followed by the per-user responses, so
+providers that cache prompt prefixes can reuse the expensive part.
+"""
+
+from typing import Any, Dict, List
+
+from .logging_service import get_logger
+from .ai_prompts_service import (
+    get_system_prompt,
+    get_all_strengths,
+    get_trait_behavioral_patterns,
+    get_structured_ranking_instructions,
+    PRIMING_1_IDENTITY,
+    PRIMING_2_METHODOLOGY
+)
+
+logger = get_logger(__name__)
+
+# Rough average for English prose; used for budgeting and metrics, not billing (no tokenizer is bundled)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a prompt fragment (len / CHARS_PER_TOKEN, not a tokenizer count)"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _build_initial_analysis_prefix() -> str:
+    behavioral_patterns = get_trait_behavioral_patterns()
+    key_patterns = "\n".join(
+        f"{trait}: {'; '.join(patterns[:3])}"  # Top 3 patterns
+        for trait, patterns in behavioral_patterns.items()
+    )
+
+    return f"""
+{PRIMING_1_IDENTITY}
+
+{PRIMING_2_METHODOLOGY}
+
+DETAILED ANALYSIS REQUIREMENTS:
+1. RESPONSE PATTERN ANALYSIS: Examine the specific choices made for each question
+2. STRENGTH IDENTIFICATION: Look for clear behavioral indicators of each trait
+3. TRAIT DIFFERENTIATION: Apply the critical differentiation rules for commonly confused traits
+4. EVIDENCE VALIDATION: Ensure top-ranked traits have multiple supporting responses
+5. PSYCHOLOGICAL COHERENCE: Verify trait combinations make sense together
+
+KEY BEHAVIORAL INDICATORS TO IDENTIFY:
+{key_patterns}
+
+SPECIFIC ANALYSIS METHODOLOGY:
+1. For each response, identify which traits are most strongly indicated by the behavioral choice
+2. Weight extreme responses (1-2 or 4-5) more heavily than moderate responses (3)
+3. Look for consistency patterns across multiple responses that indicate natural behavioral preferences
+4. Consider the psychological profile emerging from the complete set of responses
+5. Rank traits based on strength of behavioral evidence, not assumptions or generalizations
+
+CRITICAL TRAIT DIFFERENTIATION FOCUS:
+- Command behaviors (taking charge, authority comfort) vs Significance (impact seeking)
+- Competition patterns (comparison, winning) vs Achiever (personal productivity)
+- Futuristic thinking (future vision) vs Strategic (systematic planning)
+- Self-Assurance (internal confidence) vs Command (external authority)
+
+RANKING VALIDATION:
+- Top 5 traits should have clear, strong behavioral evidence
+- Traits 6-15 should have moderate supporting evidence
+- Traits 16-25 should show situational or developing patterns
+- Traits 26-34 should show minimal evidence or contrary patterns
+"""
+
+
+def _build_response_analysis_prefix() -> str:
+    behavioral_patterns = get_trait_behavioral_patterns()
+    key_indicators = "\n".join(
+        f"- {trait}: {patterns[0]}"  # Use first key pattern
+        for trait, patterns in behavioral_patterns.items()
+    )
+
+    return f"""
+{PRIMING_1_IDENTITY}
+
+{PRIMING_2_METHODOLOGY}
+
+Based on these user responses to assessment questions, analyze and rank the 34 CliftonStrengths traits from 1 (strongest/most evident) to 34 (weakest/least evident).
+
+BEHAVIORAL PATTERN MATCHING:
+Look for these key behavioral indicators in the responses:
+{key_indicators}
+
+ANALYSIS REQUIREMENTS:
+1. EVIDENCE-BASED RANKING: Each ranking must be supported by specific patterns in the responses
+2. BEHAVIORAL FOCUS: Analyze what the person actually does/prefers, not what they think they should do
+3. PATTERN RECOGNITION: Look for consistent themes across multiple responses
+4. TRAIT DIFFERENTIATION: Carefully distinguish between similar traits using behavioral evidence
+5. INTENSITY WEIGHTING: Strong preferences (selecting extreme ends) indicate stronger traits
+6. DOMAIN BALANCE: Ensure rankings reflect natural distribution unless responses clearly indicate concentration
+
+SPECIFIC ANALYSIS STEPS:
+1. Identify the 5-7 strongest behavioral patterns from responses
+2. Map these patterns to specific CliftonStrengths traits using the behavioral indicators
+3. Look for evidence of commonly misidentified traits (Command, Competition, Futuristic, Self-Assurance)
+4. Verify trait combinations make psychological sense together
+5. Ensure bottom-ranked traits show clear absence of related behaviors
+
+CRITICAL DIFFERENTIATION FOCUS:
+- Leadership behaviors → Command (authority comfort), Self-Assurance (inner confidence), Significance (impact seeking)
+- Competition-focused responses → Competition (comparison with others) vs Achiever (personal productivity)
+- Future-oriented thinking → Futuristic (vision excitement) vs Strategic (systematic planning)
+- Authority comfort → Command (taking charge) vs Responsibility (duty/ownership)
+- Recognition-seeking → Significance (meaningful impact) vs Achiever (personal accomplishment)
+
+CliftonStrengths Traits to Rank:
+{', '.join(get_all_strengths())}
+"""
+
+
+INITIAL_ANALYSIS_SUFFIX = """
+Analyze each response carefully and rank traits based on the behavioral evidence present in the user's actual choices and preferences.
+"""
+
+INITIAL_ANALYSIS_JSON_FORMAT = f"""
+CRITICAL: Return ONLY a valid JSON object with ALL 34 traits ranked from 1-34 (1=strongest).
+Use the exact trait names: {', '.join(sorted(get_all_strengths()))}.
+
+Format: {{"Achiever": 1, "Activator": 2, ...}}
+"""
+
+RESPONSE_ANALYSIS_JSON_FORMAT = """
+CRITICAL: Return ONLY a valid JSON object with evidence-based rankings.
+
+Format: {"TraitName": ranking_number, ...}
+
+Example: {"Achiever": 1, "Strategic": 2, "Command": 3, ...}
+"""
+
+
+class PromptBuilder:
+    """Assembles analysis prompts from fragments that are built once"""
+
+    def __init__(self):
+        self.system_prompt = get_system_prompt()
+        self.initial_analysis_prefix = _build_initial_analysis_prefix()
+        self.response_analysis_prefix = _build_response_analysis_prefix()
+        self.structured_ranking_instructions = get_structured_ranking_instructions()
+
+        self.template_tokens = {
+            "system_prompt": estimate_tokens(self.system_prompt),
+            "initial_analysis_prefix": estimate_tokens(self.initial_analysis_prefix),
+            "response_analysis_prefix": estimate_tokens(self.response_analysis_prefix),
+            "structured_ranking_instructions": estimate_tokens(self.structured_ranking_instructions),
+            "initial_analysis_json_format": estimate_tokens(INITIAL_ANALYSIS_JSON_FORMAT),
+            "response_analysis_json_format": estimate_tokens(RESPONSE_ANALYSIS_JSON_FORMAT)
+        }
+        logger.debug("Prompt templates built", extra={"fields": {"template_tokens": self.template_tokens}})
+
+    def messages(self, user_prompt: str) -> List[Dict[str, str]]:
+        """Wrap a user prompt with the shared system prompt"""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def initial_analysis_prompt(self, responses: List[Dict[str, Any]],
+                                questions: List[Dict[str, Any]]) -> str:
+        """Chapter 1 analysis prompt: static prefix, then the user's slider responses"""
+        questions_by_id = {}
+        for question in questions:
+            # First match wins, as with the original linear scan
+            for key in (question.get('QuestionID'), question.get('Prompt')):
+                if key and key not in questions_by_id:
+                    questions_by_id[key] = question
+
+        lines = []
+        for i, response in enumerate(responses):
+            question = questions_by_id.get(response.get('questionId', ''))
+            if not question:
+                continue
+
+            lines.append(f"Question {i+1} ({question.get('Theme', '')}): ")
+            lines.append(f"Left: {question.get('LeftStatement', '')}")
+            lines.append(f"Right: {question.get('RightStatement', '')}")
+            lines.append(f"Response: {response.get('response', '')} (1=Strongly Left, 5=Strongly Right)\n")
+
+        return (
+            f"{self.initial_analysis_prefix}\n"
+            f"Now analyze these Chapter 1 responses and provide the 34 Gallup Clifton Strengths rankings:\n\n"
+            f"{chr(10).join(lines)}\n"
+            f"{INITIAL_ANALYSIS_SUFFIX}"
+        )
+
+    def response_analysis_prompt(self, responses: List[Dict[str, Any]]) -> str:
+        """Generic response analysis prompt: static prefix, then the user's responses"""
+        response_data = "\n".join(
+            f"Q{resp.get('questionId', 'Unknown')}: {resp.get('response', 'No response')}"
+            for resp in responses
+        )
+        return f"{self.response_analysis_prefix}\nUser Responses:\n{response_data}\n"
+
+    def with_structured_format(self, prompt: str) -> str:
+        """Append the compact trait-index output instructions"""
+        return f"{prompt}\n\n{self.structured_ranking_instructions}"
+
+
+# Built once at import so every request reuses the same fragments
+prompt_builder = PromptBuilder()
@@ -0,0 +1,354 @@
+"""
+Chapter 2 Question Bank
+Generated dual-choice questions that passed validation are kept with the
+traits their options distinguish between and indexed by trait, so the 13
+Chapter 2 questions for a top-8 trait signature can be assembled from the
+bank. The LLM is only asked to top up signature traits the bank cannot cover
+yet, which cuts the per-candidate generation from a 3000-token call to a
+short one (or none at all).
+
+Selection is greedy coverage: each pick maximises the number of signature
+traits it tests, weighted towards traits with the fewest questions so far.
+Questions are bucketed by the signature traits they test, so a selection
+only compares a few dozen buckets however large the bank is, and is cached
+per signature until the bank changes.
+
+The bank starts from SEED_QUESTIONS (the former inline fallback list) and
+is persisted in the Question_Bank worksheet.
+"""
+
+import hashlib
+import math
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logging_service import get_logger
+from .metrics_service import metrics_registry
+from .trait_ranking_service import trait_registry
+
+logger = get_logger(__name__)
+
+QUESTION_BANK_SHEET = "Question_Bank"
+QUESTION_BANK_HEADERS = ["QuestionKey", "Traits", "Prompt", "Option1", "Option2", "Option3", "Option4",
+                         "Source", "CreatedAt"]
+
+CHAPTER_2_QUESTION_COUNT = 13
+SIGNATURE_SIZE = 8
+
+# A signature trait tested by fewer selected questions than this is topped up by the LLM
+MIN_QUESTIONS_PER_TRAIT = 2
+
+# Traits a generated question is expected to test (sizes LLM top-ups)
+TRAITS_PER_GENERATED_QUESTION = 2
+
+# Questions tagged with more traits than this are too unspecific to bank
+MAX_TAGS = 4
+
+# New questions are only banked while one of their traits has fewer than this many
+MAX_QUESTIONS_PER_TRAIT = 40
+
+# Signatures whose selection is cached (C(34, 8) is far too many to keep them all)
+SELECTION_CACHE_SIZE = 4096
+
+# Greedy gain for testing a trait that already has 0, 1, 2, 3 or more selected questions
+_W0, _W1, _W2, _W3 = 12, 6, 4, 3
+
+SEED_QUESTIONS = [
+    {
+        "Prompt": "Your team missed an important deadline and stakeholders are frustrated. What's your immediate response?",
+        "Options": ["Take charge and create a recovery plan with clear next steps",
+                    "Analyze what went wrong to prevent future issues",
+                    "Focus on maintaining team morale and motivation",
+                    "Ensure everyone understands their responsibilities moving forward"],
+        "Traits": ["Command", "Analytical", "Positivity", "Responsibility"]
+    },
+    {
+        "Prompt": "You discover a colleague is struggling with their workload but hasn't asked for help. What do you do?",
+        "Options": ["Offer specific assistance with tasks you can handle",
+                    "Help them organize and prioritize their workload",
+                    "Connect them with others who might provide support",
+                    "Encourage them to communicate their needs to management"],
+        "Traits": ["Empathy", "Arranger", "Includer", "Developer"]
+    },
+    {
+        "Prompt": "During a brainstorming session, the discussion becomes chaotic with too many ideas. How do you respond?",
+        "Options": ["Suggest a structured approach to evaluate each idea",
+                    "Build on the most promising ideas to develop them further",
+                    "Help synthesize different viewpoints into cohesive themes",
+                    "Focus the group on ideas that align with strategic goals"],
+        "Traits": ["Discipline", "Maximizer", "Ideation", "Strategic"]
+    },
+    {
+        "Prompt": "You're assigned to lead a project with team members you've never worked with before. What's your first priority?",
+        "Options": ["Establish clear roles, responsibilities, and timelines",
+                    "Get to know each person's strengths and working style",
+                    "Create opportunities for the team to build relationships",
+                    "Define the project vision and success metrics"],
+        "Traits": ["Arranger", "Individualization", "Relator", "Futuristic"]
+    },
+    {
+        "Prompt": "A long-standing company process is inefficient, but changing it would disrupt many people. What do you do?",
+        "Options": ["Research and present data supporting the need for change",
+                    "Gradually implement small improvements to minimize disruption",
+                    "Build consensus by involving stakeholders in the solution",
+                    "Focus on training people to work more effectively within the current system"],
+        "Traits": ["Analytical", "Deliberative", "Harmony", "Consistency"]
+    },
+    {
+        "Prompt": "You receive harsh criticism about your work in front of your peers. How do you handle it?",
+        "Options": ["Stay calm and ask clarifying questions to understand the specific issues",
+                    "Thank them for the feedback and discuss how to improve privately",
+                    "Address any valid points while professionally defending your approach",
+                    "Focus on what you can learn and how to apply it going forward"],
+        "Traits": ["Deliberative", "Harmony", "Self-Assurance", "Learner"]
+    },
+    {
+        "Prompt": "Your team is celebrating a major win, but you notice the success was largely due to one person's efforts. What do you do?",
+        "Options": ["Make sure that person gets proper recognition for their contribution",
+                    "Use this as a learning opportunity to improve team collaboration",
+                    "Celebrate the team while privately acknowledging the key contributor",
+                    "Focus on how to replicate this success in future projects"],
+        "Traits": ["Consistency", "Developer", "Includer", "Maximizer"]
+    },
+    {
+        "Prompt": "You're in a meeting where a controversial decision needs to be made quickly. How do you contribute?",
+        "Options": ["Present the facts and logical implications of each option",
+                    "Advocate strongly for the option you believe is best",
+                    "Help the group find common ground and areas of agreement",
+                    "Ask questions to ensure all perspectives are considered"],
+        "Traits": ["Analytical", "Command", "Harmony", "Includer"]
+    },
+    {
+        "Prompt": "A new team member seems hesitant to participate in discussions and appears overwhelmed. What's your approach?",
+        "Options": ["Give them specific, manageable tasks to build their confidence",
+                    "Spend time one-on-one understanding their concerns and background",
+                    "Include them directly in conversations and actively seek their input",
+                    "Connect them with resources and people who can help them succeed"],
+        "Traits": ["Developer", "Individualization", "Includer", "Connectedness"]
+    },
+    {
+        "Prompt": "Your organization is implementing a major change that you disagree with. How do you respond?",
+        "Options": ["Voice your concerns through proper channels with supporting evidence",
+                    "Focus on helping your team adapt and find opportunities within the change",
+                    "Work to understand the reasoning behind the decision",
+                    "Commit to making the change successful despite your reservations"],
+        "Traits": ["Belief", "Adaptability", "Context", "Responsibility"]
+    },
+    {
+        "Prompt": "You have multiple high-priority projects with competing deadlines. How do you handle this situation?",
+        "Options": ["Create a detailed schedule and systematically work through each task",
+                    "Negotiate with stakeholders to adjust expectations and timelines",
+                    "Focus intensely on one project at a time to ensure quality",
+                    "Identify which projects will have the greatest impact and prioritize accordingly"],
+        "Traits": ["Discipline", "Communication", "Focus", "Strategic"]
+    },
+    {
+        "Prompt": "During a team presentation, a colleague makes a factual error that could mislead the audience. What do you do?",
+        "Options": ["Politely correct the information immediately to prevent confusion",
+                    "Make a note to address it privately with your colleague afterward",
+                    "Find a diplomatic way to introduce the correct information",
+                    "Support your colleague publicly and clarify details in follow-up communication"],
+        "Traits": ["Activator", "Deliberative", "Communication", "Relator"]
+    },
+    {
+        "Prompt": "Your company announces an internal contest for new product ideas, with the winner presenting to leadership. What draws you in first?",
+        "Options": ["The chance to win and see how your idea ranks against the others",
+                    "Meeting people from other teams and rallying them behind an idea",
+                    "Gathering articles, data and examples to build the strongest case",
+                    "Imagining what the product could become in five years"],
+        "Traits": ["Competition", "Woo", "Input", "Futuristic"]
+    }
+]
+
+
+def question_key(prompt: str) -> str:
+    """Stable id of a question, insensitive to case and whitespace"""
+    normalized = " ".join(prompt.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class BankedQuestion:
+    """A validated Chapter 2 question and the traits its options distinguish between"""
+
+    __slots__ = ("key", "prompt", "options", "traits", "mask", "source")
+
+    def __init__(self, prompt: str, options: Sequence[str], traits: Sequence[str], source: str = "seed"):
+        self.key = question_key(prompt)
+        self.prompt = prompt
+        self.options = tuple(options)
+        self.traits = tuple(trait for trait in traits if trait in trait_registry.index)
+        self.mask = trait_registry.mask(self.traits)
+        self.source = source
+
+    def as_question(self, question_id: str) -> Dict[str, Any]:
+        """The question in the shape _format_chapter_2_questions produces"""
+        question = {
+            "QuestionID": question_id,
+            "QuestionText": self.prompt,
+            "Prompt": self.prompt,
+            "Type": "multiple_choice"
+        }
+        for number, option in enumerate(self.options, 1):
+            question[f"Option{number}"] = option
+        return question
+
+    def as_row(self) -> List[str]:
+        return [self.key, ", ".join(self.traits), self.prompt, *self.options, self.source, datetime.now().isoformat()]
+
+
+class QuestionSelection:
+    """Bank questions chosen for a signature, and what the LLM still has to generate"""
+
+    __slots__ = ("questions", "uncovered", "needed")
+
+    def __init__(self, questions: List[BankedQuestion], uncovered: List[str], needed: int):
+        self.questions = questions
+        self.uncovered = uncovered
+        self.needed = needed
+
+
+class QuestionBank:
+    """Chapter 2 questions indexed by trait, with greedy coverage selection per signature"""
+
+    def __init__(self, seeds: Iterable[Dict[str, Any]] = ()):
+        self._lock = threading.Lock()
+        self._questions: Dict[str, BankedQuestion] = {}
+        # trait slot -> questions testing it, in bank order
+        self._by_trait: List[List[BankedQuestion]] = [[] for _ in range(trait_registry.size)]
+        self._selections: Dict[Tuple[int, int], QuestionSelection] = {}
+        self._pending: List[BankedQuestion] = []
+        self.sheets_service = None
+
+        metrics_registry.counter("question_bank_selections_total",
+                                 "Chapter 2 question sets by how they were assembled (bank or top_up)")
+        for seed in seeds:
+            self._add(BankedQuestion(seed["Prompt"], seed["Options"], seed["Traits"]))
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def _add(self, question: BankedQuestion) -> bool:
+        """Index a question (caller holds the lock or owns the bank); False if it is not banked"""
+        if question.key in self._questions or not question.mask or len(question.traits) > MAX_TAGS:
+            return False
+        slots = [trait_registry.index[trait] for trait in question.traits]
+        if all(len(self._by_trait[slot]) >= MAX_QUESTIONS_PER_TRAIT for slot in slots):
+            return False
+        self._questions[question.key] = question
+        for slot in slots:
+            self._by_trait[slot].append(question)
+        self._selections.clear()
+        return True
+
+    def add(self, questions: Iterable[Dict[str, Any]], source: str = "llm") -> int:
+        """Bank validated questions that carry a "Traits" list; they are persisted on the next flush"""
+        added = 0
+        with self._lock:
+            for question in questions:
+                options = [question.get(f"Option{number}", "") for number in range(1, 5)]
+                banked = BankedQuestion(question.get("Prompt") or question.get("QuestionText", ""), options,
+                                        question.get("Traits") or (), source)
+                if self._add(banked):
+                    self._pending.append(banked)
+                    added += 1
+        return added
+
+    def select(self, signature: Sequence[str], count: int = CHAPTER_2_QUESTION_COUNT) -> QuestionSelection:
+        """Up to count bank questions covering the signature traits, and how many to generate instead"""
+        signature_mask = trait_registry.mask(signature)
+        cache_key = (signature_mask, count)
+        selection = self._selections.get(cache_key)
+        if selection is None:
+            with self._lock:
+                selection = self._select(signature_mask, count)
+                if len(self._selections) >= SELECTION_CACHE_SIZE:
+                    self._selections.clear()
+                self._selections[cache_key] = selection
+        return selection
+
+    def _select(self, signature_mask: int, count: int) -> QuestionSelection:
+        # Bucket candidates by the signature traits they test; within a bucket prefer fewer off-signature tags
+        buckets: Dict[int, List[BankedQuestion]] = {}
+        seen = set()
+        for slot in range(trait_registry.size):
+            if not signature_mask >> slot & 1:
+                continue
+            for question in self._by_trait[slot]:
+                if question.key not in seen:
+                    seen.add(question.key)
+                    buckets.setdefault(question.mask & signature_mask, []).append(question)
+        for questions in buckets.values():
+            questions.sort(key=lambda question: (question.mask & ~signature_mask).bit_count(), reverse=True)
+
+        # Signature traits tested by 0, 1, 2, and 3 or more of the selected questions
+        l0, l1, l2, l3 = signature_mask, 0, 0, 0
+        off_signature = ~signature_mask
+        selected = []
+        while len(selected) < count and buckets:
+            best_mask, best_gain = None, -1
+            for mask, questions in buckets.items():
+                gain = (_W0 * (mask & l0).bit_count() + _W1 * (mask & l1).bit_count()
+                        + _W2 * (mask & l2).bit_count() + _W3 * (mask & l3).bit_count()
+                        - (questions[-1].mask & off_signature).bit_count())
+                if gain > best_gain:
+                    best_mask, best_gain = mask, gain
+            questions = buckets[best_mask]
+            selected.append(questions.pop())
+            if not questions:
+                del buckets[best_mask]
+            # Every tested trait moves up one level
+            l0, l1, l2, l3 = (l0 & ~best_mask, (l1 & ~best_mask) | (l0 & best_mask),
+                              (l2 & ~best_mask) | (l1 & best_mask), l3 | (l2 & best_mask))
+        levels = [l0, l1, l2, l3]
+
+        under_covered = 0
+        for level in levels[:MIN_QUESTIONS_PER_TRAIT]:
+            under_covered |= level
+        uncovered = [trait_registry.names[slot] for slot in range(trait_registry.size) if under_covered >> slot & 1]
+        deficit = sum((MIN_QUESTIONS_PER_TRAIT - k) * level.bit_count()
+                      for k, level in enumerate(levels[:MIN_QUESTIONS_PER_TRAIT]))
+        needed = max(count - len(selected), min(count, math.ceil(deficit / TRAITS_PER_GENERATED_QUESTION)))
+        # The weakest picks make room for the generated questions
+        return QuestionSelection(selected[:count - needed], uncovered, needed)
+
+    def fill(self, questions: List[Dict[str, Any]], signature: Sequence[str],
+             count: int = CHAPTER_2_QUESTION_COUNT) -> List[Dict[str, Any]]:
+        """Pad questions to count from the bank (best coverage first, then any banked question)"""
+        if len(questions) >= count:
+            return questions[:count]
+        used = {question_key(question.get("Prompt") or question.get("QuestionText", "")) for question in questions}
+        extra = [question for question in self.select(signature, count).questions if question.key not in used]
+        used.update(question.key for question in extra)
+        extra += [question for question in list(self._questions.values()) if question.key not in used]
+        return questions + [question.as_question("") for question in extra[:count - len(questions)]]
+
+    async def load(self, sheets_service):
+        """Load banked questions from the Question_Bank worksheet; later additions are persisted there"""
+        self.sheets_service = sheets_service
+        loaded = 0
+        async for rows in sheets_service.iter_rows(QUESTION_BANK_SHEET, "I"):
+            with self._lock:
+                for row in rows:
+                    if len(row) < 7 or row[0] == QUESTION_BANK_HEADERS[0]:
+                        continue
+                    traits = [trait.strip() for trait in row[1].split(",")]
+                    source = row[7] if len(row) > 7 else "llm"
+                    loaded += self._add(BankedQuestion(row[2], row[3:7], traits, source))
+        logger.info("Loaded %s banked questions (%s in the bank)", loaded, len(self))
+
+    async def flush(self) -> int:
+        """Persist questions banked since the last flush with one append"""
+        if self.sheets_service is None or not self._pending:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if await self.sheets_service.append_rows(QUESTION_BANK_SHEET, QUESTION_BANK_HEADERS,
+                                                 [question.as_row() for question in pending]):
+            return len(pending)
+        with self._lock:
+            self._pending = pending + self._pending
+        return 0
+
+
+question_bank = QuestionBank(SEED_QUESTIONS)
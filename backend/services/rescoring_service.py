@@ -0,0 +1,234 @@
+"""
+Bulk Re-Scoring of Historical Candidates
+Re-runs the ranking stages (initial analysis, then the chapter 2 and 3
+updates) over the responses already stored in the response sheets and writes
+the rankings to a versioned results worksheet, so changes to the prompts or
+the model can be applied to past candidates and compared side by side.
+
+All responses are read with one batch request. A bounded pool of workers
+re-scores candidates; provider concurrency is further governed by the shared
+AIMD limiter. Results are appended in batches, and after every successful
+append the completed user ids are recorded in a local checkpoint file, so an
+interrupted run resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .logging_service import get_logger
+from .metrics_service import metrics_registry
+from .sheets_service import response_from_record
+from .trait_ranking_service import TraitRanking, trait_registry
+
+logger = get_logger(__name__)
+
+# Logical response sheets, in assessment order
+RESPONSE_SHEETS = ("initial", "follow_up_1", "follow_up_2")
+
+RESULTS_SHEET_PREFIX = "Rescored_Results_"
+RESULTS_HEADERS = ["UserId", "ScoringVersion", "Model", "RescoredAt"] + list(trait_registry.names)
+
+
+class RescoringError(Exception):
+    """A candidate could not be re-scored (it is retried on the next run)"""
+
+
+def results_sheet_name(version: str) -> str:
+    """Worksheet title for a scoring version (Sheets titles allow at most 100 characters)"""
+    safe_version = re.sub(r"[^A-Za-z0-9._-]+", "_", version).strip("_")
+    if not safe_version:
+        raise ValueError(f"Invalid scoring version: {version!r}")
+    return (RESULTS_SHEET_PREFIX + safe_version)[:100]
+
+
+class RescoringCheckpoint:
+    """Completed and failed user ids for one scoring version, persisted atomically as JSON"""
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self.completed: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+
+    def load(self) -> "RescoringCheckpoint":
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != self.version:
+            raise ValueError(f"Checkpoint {self.path} belongs to version {data.get('version')!r}, not {self.version!r}")
+        self.completed = set(data.get("completed", []))
+        self.failed = dict(data.get("failed", {}))
+        return self
+
+    def save(self):
+        data = {
+            "version": self.version,
+            "updatedAt": datetime.now().isoformat(),
+            "completed": sorted(self.completed),
+            "failed": self.failed
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(temp_path, self.path)
+
+
+class RescoringService:
+    """Resumable, batched re-scoring of stored assessments into a versioned results worksheet"""
+
+    def __init__(self, sheets_service, ai_service, version: str, checkpoint_path: str = None,
+                 concurrency: int = None, batch_size: int = None, flush_interval: float = None):
+        self.sheets_service = sheets_service
+        self.ai_service = ai_service
+        self.version = version
+        self.results_sheet = results_sheet_name(version)
+        self.checkpoint = RescoringCheckpoint(
+            checkpoint_path or f".rescore-{self.results_sheet[len(RESULTS_SHEET_PREFIX):]}.json", version
+        )
+        self.concurrency = concurrency or int(os.getenv("RESCORE_CONCURRENCY", "4"))
+        self.batch_size = batch_size or int(os.getenv("RESCORE_BATCH_SIZE", "25"))
+        self.flush_interval = flush_interval or float(os.getenv("RESCORE_FLUSH_INTERVAL_SECONDS", "30"))
+
+        self._pending: List[Tuple[str, List[Any]]] = []
+        self._flush_lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+        self.counts = {"rescored": 0, "written": 0, "failed": 0, "skipped": 0}
+
+        metrics_registry.counter("rescoring_candidates_total", "Historical candidates re-scored, by outcome")
+
+    async def run(self, user_ids: List[str] = None, limit: int = None) -> Dict[str, int]:
+        """Re-score every stored candidate not yet completed for this version"""
+        self.checkpoint.load()
+
+        # Rows appended just before a crash, before the checkpoint caught up, are not written twice
+        already_written = set(await self.sheets_service.get_column_values(self.results_sheet, 1))
+        self.checkpoint.completed |= already_written - {"UserId"}
+
+        responses = await self.sheets_service.get_all_user_responses(list(RESPONSE_SHEETS))
+        questions = await self.sheets_service.get_fixed_questions()
+
+        candidates = self._candidates(responses, user_ids, limit)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def produce():
+            for candidate in candidates:
+                await queue.put(candidate)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        workers = [asyncio.create_task(self._worker(queue, questions)) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(produce(), *workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self._flush(force=True)
+            self.checkpoint.save()
+
+        logger.info("Re-scoring %s finished: %s", self.version, self.counts)
+        return dict(self.counts, pending_failures=len(self.checkpoint.failed))
+
+    def _candidates(self, responses: Dict[str, Dict[str, List[Dict[str, Any]]]], user_ids: Optional[List[str]],
+                    limit: Optional[int]) -> Iterator[Tuple[str, Dict[str, List[Dict[str, Any]]]]]:
+        """Candidates still to do, in the order they took the assessment"""
+        initial = responses.get("initial", {})
+        selected = user_ids if user_ids else list(initial)
+        yielded = 0
+        for user_id in selected:
+            if user_id in self.checkpoint.completed:
+                continue
+            if limit is not None and yielded >= limit:
+                return
+            yielded += 1
+            yield user_id, {
+                sheet: [response_from_record(record) for record in responses.get(sheet, {}).get(user_id, [])]
+                for sheet in RESPONSE_SHEETS
+            }
+
+    async def _worker(self, queue: asyncio.Queue, questions: List[Dict[str, Any]]):
+        while True:
+            candidate = await queue.get()
+            if candidate is None:
+                return
+            user_id, responses = candidate
+
+            try:
+                rankings = await self._rescore(responses, questions)
+            except RescoringError as e:
+                self._record(user_id, "skipped" if not responses["initial"] else "failed", str(e))
+                continue
+            except Exception as e:
+                logger.exception("Re-scoring %s failed: %s", user_id, e)
+                self._record(user_id, "failed", str(e))
+                continue
+
+            self.counts["rescored"] += 1
+            self._pending.append((user_id, self._result_row(user_id, rankings)))
+            await self._flush()
+
+    async def _rescore(self, responses: Dict[str, List[Dict[str, Any]]],
+                       questions: List[Dict[str, Any]]) -> TraitRanking:
+        """The same ranking stages the live assessment runs, without falling back to random rankings"""
+        if not responses["initial"]:
+            raise RescoringError("no initial responses")
+
+        rankings = await self.ai_service.analyze_initial_responses(responses["initial"], questions,
+                                                                   allow_fallback=False)
+        if not rankings:
+            raise RescoringError("initial analysis failed")
+
+        for round_num, sheet in ((1, "follow_up_1"), (2, "follow_up_2")):
+            if responses[sheet]:
+                rankings = await self.ai_service.update_trait_rankings(rankings, responses[sheet], round_num,
+                                                                       allow_fallback=False)
+                if not rankings:
+                    raise RescoringError(f"chapter {round_num + 1} update failed")
+
+        return TraitRanking.coerce(rankings)
+
+    def _result_row(self, user_id: str, rankings: TraitRanking) -> List[Any]:
+        ranks = [rankings.rank(name) or "" for name in trait_registry.names]
+        return [user_id, self.version, self.ai_service.model, datetime.now().isoformat()] + ranks
+
+    def _record(self, user_id: str, outcome: str, reason: str = None):
+        self.counts[outcome] += 1
+        metrics_registry.inc("rescoring_candidates_total", version=self.version, outcome=outcome)
+        if outcome == "failed":
+            self.checkpoint.failed[user_id] = reason
+        else:
+            self.checkpoint.failed.pop(user_id, None)
+        if outcome == "skipped":
+            self.checkpoint.completed.add(user_id)
+
+    async def _flush(self, force: bool = False):
+        """Append pending rows once a batch is full (or the interval passed), then checkpoint them"""
+        due = len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval
+        if not self._pending or not (force or due):
+            return
+
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+
+            if not await self.sheets_service.append_rows(self.results_sheet, RESULTS_HEADERS,
+                                                         [row for _, row in batch]):
+                # Keep the rows and retry with the next flush
+                self._pending = batch + self._pending
+                if force:
+                    for user_id, _ in batch:
+                        self._record(user_id, "failed", "results write failed")
+                return
+
+            for user_id, _ in batch:
+                self.checkpoint.completed.add(user_id)
+                self._record(user_id, "written")
+            self.checkpoint.save()
+            self._last_flush = time.monotonic()
+            logger.info("Re-scoring %s: %s candidates written", self.version, self.counts["written"])
@@ -0,0 +1,81 @@
+"""
+Fast JSON Responses
+FastJSONResponse renders with orjson instead of the standard library encoder.
+Pydantic models are written straight to bytes by their compiled pydantic-core
+serializer, skipping model_dump() and jsonable_encoder. Trait lists can also
+be sent column-oriented ({"name": [...], "ranking": [...], "score": [...]}),
+which avoids repeating the keys 34 times.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from models.schemas import FinalReport, FinalResults, TraitScore
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Query parameter value that selects the column-oriented trait layout
+COLUMNS_LAYOUT = "columns"
+
+
+def _default(value: Any) -> Any:
+    """orjson fallback for types it does not know natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Mapping):
+        # e.g. TraitRanking
+        return dict(value.items())
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes (pydantic models use their compiled serializer)"""
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson / pydantic-core"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def columnar_traits(traits: List[TraitScore]) -> Dict[str, list]:
+    """Column-oriented trait list: one array per field, strongest trait first"""
+    return {
+        "name": [trait.name for trait in traits],
+        "ranking": [trait.ranking for trait in traits],
+        "score": [trait.score for trait in traits]
+    }
+
+
+def results_content(results: FinalResults, layout: str = None) -> Any:
+    """FinalResults as response content in the requested layout"""
+    if layout != COLUMNS_LAYOUT:
+        return results
+    content = results.model_dump(exclude={"traits"})
+    content["traits"] = columnar_traits(results.traits)
+    return content
+
+
+def report_content(report: FinalReport, layout: str = None) -> Any:
+    """FinalReport as response content in the requested layout"""
+    if layout != COLUMNS_LAYOUT:
+        return report
+    content = report.model_dump(exclude={"results"})
+    content["results"] = results_content(report.results, layout)
+    return content
+
+
+def layout_etag(etag: str, layout: str = None) -> str:
+    """Distinct ETag per representation, so a cached row layout never satisfies a columns request"""
+    if layout != COLUMNS_LAYOUT:
+        return etag
+    return f'{etag[:-1]}-{COLUMNS_LAYOUT}"'
@@ -1,21 +1,186 @@
 import gspread
+from gspread.utils import absolute_range_name, numericise_all, to_records
 from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import AuthorizedSession
+import requests
 from datetime import datetime
 import json
 import os
 import asyncio
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from .logging_service import get_logger
+from .tracing_service import traced
+from .cassette_service import cassette_registry
+
+logger = get_logger(__name__)
+
+# First header cell of the Final_Results sheet: "UserID & Name" | Traits | Ranking | Summary
+FINAL_RESULTS_HEADER = "UserID & Name"
+
+def response_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """A stored sheet record in the shape the API hands to the AI service (QuestionResponse.model_dump())"""
+    return {
+        "questionId": str(record.get("QuestionID", "")),
+        "response": record.get("Response"),
+        "firstChoice": record.get("FirstChoice"),
+        "secondChoice": record.get("SecondChoice"),
+        "timestamp": str(record.get("Timestamp", ""))
+    }
 
 class SheetsService:
+    # Logical worksheet names and the titles they may be stored under (first match wins)
+    WORKSHEET_ALIASES = {
+        "User_Profiles": ["User_Profiles", "User_Info", "Sheet1", "Users", "UserData"],
+        "initial": ["User_Response_Initial"],
+        "User_Responses": ["User_Response_Initial"],
+        "follow_up_1": ["User_Response_Follow_Up_1"],
+        "follow_up_2": ["User_Response_Follow_Up_2"]
+    }
+    
     def __init__(self):
-        """Initialize Google Sheets service with credentials"""
+        """Initialize Google Sheets service state (the connection itself is opened lazily)"""
         self.spreadsheet_name = "Your_Hiring_System_Data"
         self.gc = None
-        self.spreadsheet = None
+        self._spreadsheet = None
         self.last_write_time = 0
         self.min_write_interval = 2
-        self._initialize_credentials()
+        
+        # Lazy connection state - failed attempts are not retried more often than this
+        self._connect_lock = threading.Lock()
+        self._last_connect_error = None
+        self._last_connect_attempt = 0
+        self.connect_retry_interval = 30
+        
+        # Question catalog cache (fixed questions rarely change)
+        self._fixed_questions = None
+        
+        # Worksheet registry: handles for every worksheet, loaded with one metadata request
+        self._registry_lock = threading.Lock()
+        self._worksheets = {}
+        self._worksheet_titles_by_id = {}
+        self._resolved_aliases = {}
+        self._worksheets_loaded_at = 0
+        # A name still missing after a refresh is not refreshed for again within this interval
+        self._worksheet_misses = {}
+        self.worksheet_refresh_interval = 10
+        
+        # Concurrent reads run in worker threads, bounded to stay inside the read quota
+        self.max_concurrent_reads = int(os.getenv("SHEETS_MAX_CONCURRENT_READS", "4"))
+        self._read_slots = asyncio.Semaphore(self.max_concurrent_reads)
+    
+    @property
+    def spreadsheet(self):
+        """Spreadsheet handle, or None until connected (never connects: await _ensure_connected() first)"""
+        return self._spreadsheet
+    
+    @spreadsheet.setter
+    def spreadsheet(self, value):
+        self._spreadsheet = value
+    
+    @property
+    def is_connected(self) -> bool:
+        """Whether the Google Sheets connection has been established"""
+        return self._spreadsheet is not None
+    
+    @traced()
+    def connect(self):
+        """Authorize and open the spreadsheet (blocking, safe to call repeatedly)"""
+        with self._connect_lock:
+            if self._spreadsheet is not None:
+                return
+            
+            # Don't hammer Google with reconnects when credentials or network are broken
+            if self._last_connect_error and time.time() - self._last_connect_attempt < self.connect_retry_interval:
+                raise self._last_connect_error
+            
+            self._last_connect_attempt = time.time()
+            try:
+                self._initialize_credentials()
+                self._last_connect_error = None
+            except Exception as e:
+                self._last_connect_error = e
+                raise
+    
+    async def _ensure_connected(self):
+        """Connect in a worker thread so the event loop is never blocked by auth"""
+        if self._spreadsheet is None:
+            await asyncio.to_thread(self.connect)
+    
+    async def warm_up(self):
+        """Open the connection and preload caches before traffic arrives"""
+        await self._ensure_connected()
+        await asyncio.to_thread(self.refresh_worksheets)
+        await self.get_fixed_questions()
+    
+    @traced()
+    def refresh_worksheets(self):
+        """Load handles for all worksheets with a single fetch_sheet_metadata call"""
+        with self._registry_lock:
+            self._load_worksheets()
+    
+    def _load_worksheets(self):
+        """Rebuild the registry (caller must hold the registry lock)"""
+        worksheets = self.spreadsheet.worksheets()
+        self._worksheets = {worksheet.title: worksheet for worksheet in worksheets}
+        self._worksheet_titles_by_id = {worksheet.id: worksheet.title for worksheet in worksheets}
+        self._resolved_aliases = {}
+        self._worksheets_loaded_at = time.time()
+    
+    def _lookup_worksheet(self, name: str):
+        """Resolve a worksheet title or logical alias against the registry"""
+        title = self._resolved_aliases.get(name)
+        if title is None:
+            for candidate in self.WORKSHEET_ALIASES.get(name, [name]):
+                if candidate in self._worksheets:
+                    title = candidate
+                    self._resolved_aliases[name] = title
+                    break
+        return self._worksheets.get(title) if title else None
+    
+    def _worksheet(self, name: str, force_refresh: bool = False):
+        """Get a cached worksheet handle, refreshing the registry once on a miss
+        (repeated misses for the same name refresh at most once per worksheet_refresh_interval)"""
+        worksheet = None if force_refresh else self._lookup_worksheet(name)
+        if worksheet is not None:
+            return worksheet
+        
+        with self._registry_lock:
+            # Another caller may have refreshed while we waited for the lock
+            worksheet = None if force_refresh else self._lookup_worksheet(name)
+            missed_at = self._worksheet_misses.get(name, 0)
+            throttled = time.time() - missed_at < self.worksheet_refresh_interval
+            if worksheet is None and (force_refresh or not throttled):
+                self._load_worksheets()
+                worksheet = self._lookup_worksheet(name)
+                if worksheet is None:
+                    self._worksheet_misses[name] = time.time()
+            if worksheet is not None:
+                self._worksheet_misses.pop(name, None)
+        
+        if worksheet is None:
+            raise gspread.WorksheetNotFound(name)
+        return worksheet
+    
+    def _get_or_create_worksheet(self, title: str, headers: List[str]):
+        """Get a worksheet from the registry, creating it with headers if it doesn't exist"""
+        try:
+            return self._worksheet(title)
+        except gspread.WorksheetNotFound:
+            pass
+        
+        try:
+            worksheet = self.spreadsheet.add_worksheet(title=title, rows=1000, cols=max(10, len(headers)))
+        except gspread.exceptions.APIError:
+            # Most likely created by another worker since our last refresh
+            return self._worksheet(title, force_refresh=True)
+        
+        worksheet.append_row(headers)
+        with self._registry_lock:
+            self._worksheets[worksheet.title] = worksheet
+            self._worksheet_titles_by_id[worksheet.id] = worksheet.title
+        return worksheet
     
     async def _rate_limit(self):
         """Ensure we don't exceed Google Sheets rate limits"""
@@ -40,8 +205,11 @@ class SheetsService:
             credentials_path = os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
             spreadsheet_id = os.getenv('GOOGLE_SHEET_ID', '14eHVi6M0nkRf9u2SJ26FFqWp0dNYw05hsFcuCi5rty0')
             
+            if cassette_registry.replaying:
+                # Replayed calls never reach Google, so no credentials are needed
+                creds = None
             # Try environment variables first (for production)
-            if all([
+            elif all([
                 os.getenv('GOOGLE_TYPE'),
                 os.getenv('GOOGLE_PROJECT_ID'),
                 os.getenv('GOOGLE_PRIVATE_KEY'),
@@ -67,59 +235,53 @@ class SheetsService:
             else:
                 raise Exception("No Google credentials found")
             
-            self.gc = gspread.authorize(creds)
+            # Sheets traffic is recorded or replayed when HTTP_CASSETTE_MODE is set
+            session = AuthorizedSession(creds) if creds is not None else requests.Session()
+            self.gc = gspread.authorize(None, session=cassette_registry.mount(session, "sheets"))
             self.spreadsheet = self.gc.open_by_key(spreadsheet_id)
-            print(f"Successfully connected to Google Sheets: {spreadsheet_id}")
+            logger.info("Successfully connected to Google Sheets: %s", spreadsheet_id)
             
         except Exception as e:
-            print(f"CRITICAL: Failed to initialize Google Sheets: {e}")
-            print("Environment variables check:")
-            print(f"GOOGLE_TYPE: {os.getenv('GOOGLE_TYPE')}")
-            print(f"GOOGLE_PROJECT_ID: {os.getenv('GOOGLE_PROJECT_ID')}")
-            print(f"GOOGLE_CLIENT_EMAIL: {os.getenv('GOOGLE_CLIENT_EMAIL')}")
-            print(f"GOOGLE_SHEET_ID: {spreadsheet_id}")
+            logger.critical(
+                "Failed to initialize Google Sheets: %s", e,
+                extra={"fields": {
+                    "google_type": os.getenv('GOOGLE_TYPE'),
+                    "google_project_id": os.getenv('GOOGLE_PROJECT_ID'),
+                    "google_client_email": os.getenv('GOOGLE_CLIENT_EMAIL'),
+                    "google_sheet_id": spreadsheet_id
+                }}
+            )
             # Don't fall back to mock - raise the error
             raise Exception(f"Google Sheets connection failed: {e}")
     
     def _create_mock_service(self):
         """Create a mock service for development/testing"""
-        print("Using mock Google Sheets service")
+        logger.info("Using mock Google Sheets service")
         self.gc = None
         self.spreadsheet = None
 
+    @traced()
     async def save_user_info(self, user_data: Dict[str, Any]) -> bool:
         """Save user information to the first available sheet"""
         try:
+            await self._ensure_connected()
             await self._rate_limit()
             
             if not self.spreadsheet:
-                print("Mock mode: Would save user data to Google Sheets")
-                print(f"User data: {user_data}")
+                logger.info("Mock mode: Would save user data to Google Sheets")
                 return True
             
-            print(f"Saving user data to Google Sheets: {user_data}")
-            
-            # Try different possible worksheet names
-            worksheet = None
-            possible_names = ["User_Profiles", "User_Info", "Sheet1", "Users", "UserData"]
+            logger.info("Saving user to Google Sheets", extra={"fields": {"user_id": user_data.get('userId')}})
             
-            for sheet_name in possible_names:
-                try:
-                    worksheet = self.spreadsheet.worksheet(sheet_name)
-                    print(f"Found worksheet: {sheet_name}")
-                    break
-                except Exception as e:
-                    print(f"Worksheet '{sheet_name}' not found: {e}")
-                    continue
-            
-            if not worksheet:
+            # Resolve the profile worksheet through its aliases (User_Profiles, User_Info, Sheet1, ...)
+            try:
+                worksheet = self._worksheet("User_Profiles")
+            except gspread.WorksheetNotFound:
                 # Get the first available worksheet
-                worksheets = self.spreadsheet.worksheets()
-                if worksheets:
-                    worksheet = worksheets[0]
-                    print(f"Using first available worksheet: {worksheet.title}")
-                else:
+                if not self._worksheets:
                     raise Exception("No worksheets found in spreadsheet")
+                worksheet = next(iter(self._worksheets.values()))
+                logger.info("Using first available worksheet: %s", worksheet.title)
             
             # Map to your actual Google Sheets columns: UserID | Name | Email | Age | Experience | Phone | Consent | Timestamp
             row_data = [
@@ -133,30 +295,34 @@ class SheetsService:
                 user_data.get('timestamp', '')
             ]
             
-            print(f"Attempting to append row with correct column mapping: {row_data}")
             result = worksheet.append_row(row_data)
-            print(f"Google Sheets append result: {result}")
+            logger.debug("Google Sheets append result: %s", result)
             
             return True
             
         except Exception as e:
-            print(f"ERROR saving to Google Sheets: {str(e)}")
-            print(f"Exception type: {type(e)}")
+            logger.error("Error saving to Google Sheets: %s (%s)", e, type(e).__name__)
             # Re-raise the exception so we know about failures
             raise e
 
+    @traced()
     async def get_fixed_questions(self) -> List[Dict[str, Any]]:
         """Get Likert scale questions from the spreadsheet"""
         try:
+            await self._ensure_connected()
+            
+            if self._fixed_questions is not None:
+                return self._fixed_questions
+            
             if not self.spreadsheet:
                 return self._get_mock_likert_questions()
             
-            worksheet = self.spreadsheet.worksheet("Fixed_Questions")
+            worksheet = self._worksheet("Fixed_Questions")
             # Get all values and skip the header row (first row)
             all_values = worksheet.get_all_values()
             
             if len(all_values) <= 1:  # Only header or empty
-                print("No data rows found, using mock questions")
+                logger.info("No data rows found, using mock questions")
                 return self._get_mock_likert_questions()
             
             # Skip header row (index 0) and process data rows
@@ -170,11 +336,12 @@ class SheetsService:
                         "Theme": row[3].strip()
                     })
             
-            print(f"Loaded {len(questions)} questions from Google Sheets")
+            logger.info("Loaded %s questions from Google Sheets", len(questions))
+            self._fixed_questions = questions
             return questions
             
         except Exception as e:
-            print(f"Error loading questions from sheets: {e}")
+            logger.error("Error loading questions from sheets: %s", e)
             return self._get_mock_likert_questions()
     
     def _get_mock_likert_questions(self) -> List[Dict[str, Any]]:
@@ -282,15 +449,17 @@ class SheetsService:
             }
         ]
 
+    @traced()
     async def save_initial_responses(self, user_id: str, responses: List[Dict[str, Any]]) -> bool:
         """Save initial assessment responses"""
         try:
+            await self._ensure_connected()
             await self._rate_limit()
             
             if not self.spreadsheet:
                 return True
             
-            worksheet = self.spreadsheet.worksheet("User_Response_Initial")
+            worksheet = self._worksheet("User_Response_Initial")
             
             for response in responses:
                 row_data = [
@@ -307,9 +476,11 @@ class SheetsService:
         except Exception as e:
             return False
 
+    @traced()
     async def save_follow_up_questions(self, user_id: str, questions: List[Dict[str, Any]], round_num: int) -> bool:
         """Save generated follow-up questions"""
         try:
+            await self._ensure_connected()
             await self._rate_limit()
             
             if not self.spreadsheet:
@@ -320,11 +491,10 @@ class SheetsService:
             
             sheet_name = f"Follow_Up_Questions{round_num}"
             
-            try:
-                worksheet = self.spreadsheet.worksheet(sheet_name)
-            except:
-                worksheet = self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=10)
-                worksheet.append_row(["UserID", "Name", "QuestionID", "QuestionText", "OptionA", "OptionB", "OptionC", "OptionD"])
+            worksheet = self._get_or_create_worksheet(
+                sheet_name,
+                ["UserID", "Name", "QuestionID", "QuestionText", "OptionA", "OptionB", "OptionC", "OptionD"]
+            )
             
             for question in questions:
                 row_data = [
@@ -345,9 +515,11 @@ class SheetsService:
         except Exception as e:
             return False
 
+    @traced()
     async def save_follow_up_responses(self, user_id: str, responses: List[Dict[str, Any]], round_num: int) -> bool:
         """Save follow-up responses - handles both single responses and dual choices"""
         try:
+            await self._ensure_connected()
             await self._rate_limit()
             
             if not self.spreadsheet:
@@ -358,18 +530,15 @@ class SheetsService:
             
             sheet_name = f"User_Response_Follow_Up_{round_num}"
             
-            try:
-                worksheet = self.spreadsheet.worksheet(sheet_name)
-            except:
-                worksheet = self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=10)
-                
-                # Create appropriate headers based on round
-                if round_num == 1:
-                    # Chapter 2: Dual-choice format (round 1)
-                    worksheet.append_row(["UserId", "Name", "QuestionID", "FirstChoice", "SecondChoice", "Timestamp"])
-                else:
-                    # Chapter 3: Regular text response format (round 2)
-                    worksheet.append_row(["UserId", "Name", "QuestionID", "Response", "Timestamp"])
+            # Create appropriate headers based on round
+            if round_num == 1:
+                # Chapter 2: Dual-choice format (round 1)
+                headers = ["UserId", "Name", "QuestionID", "FirstChoice", "SecondChoice", "Timestamp"]
+            else:
+                # Chapter 3: Regular text response format (round 2)
+                headers = ["UserId", "Name", "QuestionID", "Response", "Timestamp"]
+            
+            worksheet = self._get_or_create_worksheet(sheet_name, headers)
             
             for response in responses:
                 if round_num == 1:
@@ -398,18 +567,22 @@ class SheetsService:
             return True
             
         except Exception as e:
-            print(f"Error saving follow-up responses: {e}")
+            logger.error("Error saving follow-up responses: %s", e)
             return False
 
+    @traced()
     async def get_user_responses(self, user_id: str, sheet_name: str) -> List[Dict[str, Any]]:
         """Get user responses from a specific sheet"""
         try:
+            await self._ensure_connected()
+            
             if not self.spreadsheet:
                 return []
             
             try:
-                worksheet = self.spreadsheet.worksheet(sheet_name)
-                records = worksheet.get_all_records()
+                worksheet = self._worksheet(sheet_name)
+                async with self._read_slots:
+                    records = await asyncio.to_thread(worksheet.get_all_records)
                 
                 user_responses = []
                 for record in records:
@@ -423,87 +596,242 @@ class SheetsService:
         except Exception as e:
             return []
 
+    @traced()
+    async def batch_get(self, sheet_names: List[str]) -> Dict[str, List[List[str]]]:
+        """Fetch all rows of several worksheets with a single values:batchGet request"""
+        await self._ensure_connected()
+        
+        if not self.spreadsheet:
+            return {}
+        
+        # Missing worksheets are left out, like get_user_responses returning [] for them
+        titles = {}
+        for name in sheet_names:
+            try:
+                titles[name] = self._worksheet(name).title
+            except gspread.WorksheetNotFound:
+                continue
+        
+        if not titles:
+            return {}
+        
+        ranges = [absolute_range_name(title) for title in titles.values()]
+        async with self._read_slots:
+            response = await asyncio.to_thread(self.spreadsheet.values_batch_get, ranges)
+        
+        # valueRanges come back in request order
+        value_ranges = response.get("valueRanges", [])
+        return {name: value_range.get("values", []) for name, value_range in zip(titles, value_ranges)}
+    
+    @staticmethod
+    def _user_records(rows: List[List[str]], user_id: str) -> List[Dict[str, Any]]:
+        """Turn raw rows (header first) into the user's records, as get_all_records would"""
+        if not rows or "UserId" not in rows[0]:
+            return []
+        
+        headers = rows[0]
+        width = len(headers)
+        user_column = headers.index("UserId")
+        user_rows = [
+            numericise_all(row[:width] + [""] * (width - len(row)), default_blank="")
+            for row in rows[1:]
+            if len(row) > user_column and row[user_column] == user_id
+        ]
+        return to_records(headers, user_rows)
+    
+    @traced()
+    async def get_user_responses_batch(self, user_id: str, sheet_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get user responses from several sheets with one API call, keyed by sheet name"""
+        try:
+            tables = await self.batch_get(sheet_names)
+            return {name: self._user_records(tables.get(name, []), user_id) for name in sheet_names}
+        except Exception as e:
+            # Fall back to one read per sheet, still issued concurrently
+            logger.warning("Batch read of %s failed, reading sheets individually: %s", sheet_names, e)
+            responses = await asyncio.gather(*(self.get_user_responses(user_id, name) for name in sheet_names))
+            return dict(zip(sheet_names, responses))
+
+    async def iter_rows(self, sheet_name: str, last_column: str, page_rows: int = None) -> AsyncIterator[List[List[str]]]:
+        """Yield a worksheet's rows (header included) a page at a time, one read request per page"""
+        await self._ensure_connected()
+        
+        if not self.spreadsheet:
+            return
+        
+        try:
+            title = self._worksheet(sheet_name).title
+        except gspread.WorksheetNotFound:
+            return
+        
+        page_rows = page_rows or int(os.getenv("SHEETS_PAGE_ROWS", "1000"))
+        start = 1
+        while True:
+            range_name = absolute_range_name(title, f"A{start}:{last_column}{start + page_rows - 1}")
+            async with self._read_slots:
+                response = await asyncio.to_thread(self.spreadsheet.values_batch_get, [range_name])
+            rows = response.get("valueRanges", [{}])[0].get("values", [])
+            # Trailing empty rows are trimmed, so a page can be short without being the last one
+            if not rows:
+                return
+            yield rows
+            start += page_rows
+    
+    async def iter_final_results(self) -> AsyncIterator[Tuple[str, str, Dict[str, int]]]:
+        """Yield (user_id, name, {trait: rank}) for every Final_Results block, reading a page at a time.
+        Only columns A:C are read; the summaries in column D are the bulk of the sheet."""
+        current = None
+        
+        async for rows in self.iter_rows("Final_Results", "C"):
+            for row in rows:
+                first = row[0].strip() if row else ""
+                if first == FINAL_RESULTS_HEADER:
+                    continue
+                if first:
+                    # "UserID & Name" cell starts a new block
+                    if current is not None:
+                        yield current
+                    user_id, _, name = first.partition(" ")
+                    current = (user_id, name, {})
+                elif current is not None and len(row) >= 3 and row[1]:
+                    try:
+                        current[2][row[1]] = int(row[2])
+                    except ValueError:
+                        continue
+        
+        if current is not None:
+            yield current
+    
+    @staticmethod
+    def _records_by_user(rows: List[List[str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Turn raw rows (header first) into records grouped by UserId, users in first-seen order"""
+        if not rows or "UserId" not in rows[0]:
+            return {}
+        
+        headers = rows[0]
+        width = len(headers)
+        user_column = headers.index("UserId")
+        records_by_user = {}
+        for row in rows[1:]:
+            if len(row) <= user_column or not row[user_column]:
+                continue
+            values = numericise_all(row[:width] + [""] * (width - len(row)), default_blank="")
+            records_by_user.setdefault(row[user_column], []).append(dict(zip(headers, values)))
+        return records_by_user
+    
+    @traced()
+    async def get_all_user_responses(self, sheet_names: List[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Every user's records from several sheets with one API call, keyed by sheet name then user"""
+        tables = await self.batch_get(sheet_names)
+        return {name: self._records_by_user(tables.get(name, [])) for name in sheet_names}
+    
+    @traced()
+    async def get_column_values(self, sheet_name: str, col: int = 1) -> List[str]:
+        """All values in one column of a worksheet ([] if it doesn't exist)"""
+        await self._ensure_connected()
+        
+        if not self.spreadsheet:
+            return []
+        
+        try:
+            worksheet = self._worksheet(sheet_name)
+        except gspread.WorksheetNotFound:
+            return []
+        
+        async with self._read_slots:
+            return await asyncio.to_thread(worksheet.col_values, col)
+    
+    @traced()
+    async def append_rows(self, sheet_name: str, headers: List[str], rows: List[List[Any]]) -> bool:
+        """Append rows with a single API call, creating the worksheet with headers if needed"""
+        try:
+            await self._ensure_connected()
+            await self._rate_limit()
+            
+            if not self.spreadsheet:
+                logger.info("Mock mode: Would append %s rows to %s", len(rows), sheet_name)
+                return True
+            
+            worksheet = await asyncio.to_thread(self._get_or_create_worksheet, sheet_name, headers)
+            await asyncio.to_thread(worksheet.append_rows, rows)
+            return True
+            
+        except Exception as e:
+            logger.error("Error appending rows to %s: %s", sheet_name, e)
+            return False
+
+    @traced()
     async def get_user_name(self, user_id: str) -> str:
         """Get user name from User_Profiles sheet"""
         try:
+            await self._ensure_connected()
+            
             if not self.spreadsheet:
                 return "Unknown User"
             
             
-            # Try User_Profiles first, then User_Info as fallback
-            for sheet_name in ["User_Profiles", "User_Info"]:
-                try:
-                    worksheet = self.spreadsheet.worksheet(sheet_name)
-                    records = worksheet.get_all_records()
-                    
+            # Same profile worksheet that save_user_info writes to (resolved via aliases)
+            try:
+                worksheet = self._worksheet("User_Profiles")
+                records = worksheet.get_all_records()
+            except Exception as e:
+                return "Unknown User"
+            
+            for record in records:
+                
+                # Check both userId and UserId fields - handle case variations
+                record_user_id = (record.get('userId') or record.get('UserId') or 
+                                record.get('UserID') or record.get('userid'))
+                
+                if record_user_id == user_id:
+                    # Try different possible name fields - check Name first (capital N)
+                    name = (record.get('Name') or record.get('name') or 
+                          record.get('UserName') or record.get('username'))
                     
-                    for i, record in enumerate(records):
-                        
-                        # Check both userId and UserId fields - handle case variations
-                        record_user_id = (record.get('userId') or record.get('UserId') or 
-                                        record.get('UserID') or record.get('userid'))
-                        
-                        if record_user_id == user_id:
-                            # Try different possible name fields - check Name first (capital N)
-                            name = (record.get('Name') or record.get('name') or 
-                                  record.get('UserName') or record.get('username'))
-                            
-                            if name:
-                                return name
-                            
-                            # Fallback to firstName + lastName
-                            first_name = record.get('firstName', '') or record.get('FirstName', '')
-                            last_name = record.get('lastName', '') or record.get('LastName', '')
-                            full_name = f"{first_name} {last_name}".strip()
-                            if full_name:
-                                return full_name
+                    if name:
+                        return name
                     
-                    break  # If we found the sheet, don't try the fallback
-                except Exception as e:
-                    continue
+                    # Fallback to firstName + lastName
+                    first_name = record.get('firstName', '') or record.get('FirstName', '')
+                    last_name = record.get('lastName', '') or record.get('LastName', '')
+                    full_name = f"{first_name} {last_name}".strip()
+                    if full_name:
+                        return full_name
             
             return "Unknown User"
             
         except Exception as e:
-            print(f"Error getting user name: {e}")
+            logger.error("Error getting user name: %s", e)
             return "Unknown User"
     
+    @traced()
     async def save_final_results(self, user_id: str, name: str, trait_rankings: Dict[str, int], summary_text: str = "") -> bool:
         """Save final trait rankings and summary to Final_Results sheet with all 34 CliftonStrengths"""
         try:
+            await self._ensure_connected()
             await self._rate_limit()
             
             if not self.spreadsheet:
-                print(f"Mock mode: Would save final results for {user_id} - {name}")
-                print(f"Trait rankings: {trait_rankings}")
-                print(f"Summary: {summary_text[:100]}...")
+                logger.info("Mock mode: Would save final results for %s - %s", user_id, name)
                 return True
             
-            worksheet = self.spreadsheet.worksheet("Final_Results")
+            worksheet = self._worksheet("Final_Results")
             
-            # Check if this user's results already exist
-            existing_data = worksheet.get_all_values()
-            for row in existing_data:
-                if row and user_id in str(row[0]):
-                    print(f"Results for user {user_id} already exist, skipping...")
+            # Check if this user's results already exist (only the ID column is needed)
+            existing_ids = worksheet.col_values(1)
+            for cell in existing_ids:
+                if self._matches_user_cell(cell, user_id):
+                    logger.info("Results for user %s already exist, skipping...", user_id)
                     return True
             
+            rows = []
+            
             # Check if this is the first entry (add headers)
-            try:
-                if not existing_data or (len(existing_data) == 1 and not existing_data[0][0]):
-                    # Add headers
-                    headers = ["UserID & Name", "Traits", "Ranking", "Summary"]
-                    worksheet.clear()
-                    worksheet.append_row(headers)
-            except Exception:
-                # If worksheet doesn't exist or is empty, create headers
-                headers = ["UserID & Name", "Traits", "Ranking", "Summary"]
+            if not existing_ids or (len(existing_ids) == 1 and not existing_ids[0]):
                 worksheet.clear()
-                worksheet.append_row(headers)
+                rows.append([FINAL_RESULTS_HEADER, "Traits", "Ranking", "Summary"])
             
             # Add user info row with summary in the last column
-            user_info_row = [f"{user_id} {name}", "", "", summary_text]
-            worksheet.append_row(user_info_row)
+            rows.append([f"{user_id} {name}", "", "", summary_text])
             
             # Add all 34 traits with their rankings
             # Define the standard order of CliftonStrengths
@@ -520,28 +848,37 @@ class SheetsService:
             # Add each trait with its ranking
             for trait in all_clifton_strengths:
                 ranking = trait_rankings.get(trait, 35)  # Default to 35 if trait not found
-                trait_row = ["", trait, ranking, ""]
-                worksheet.append_row(trait_row)
+                rows.append(["", trait, ranking, ""])
             
             # Add empty row for separation
-            worksheet.append_row(["", "", "", ""])
+            rows.append(["", "", "", ""])
+            
+            # Write the whole block in a single API call instead of one append per row
+            worksheet.append_rows(rows)
             
             return True
             
         except Exception as e:
-            print(f"Error saving final results: {e}")
+            logger.error("Error saving final results: %s", e)
             return False
 
+    def _matches_user_cell(self, cell: str, user_id: str) -> bool:
+        """Check whether a "UserID & Name" cell belongs to exactly this user"""
+        cell = str(cell).strip()
+        return cell == user_id or cell.startswith(f"{user_id} ")
+
+    @traced()
     async def get_final_results(self, user_id: str) -> Dict:
         """Retrieve final results and summary from Final_Results sheet"""
         try:
+            await self._ensure_connected()
             await self._rate_limit()
             
             if not self.spreadsheet:
-                print(f"Mock mode: Would get final results for {user_id}")
+                logger.info("Mock mode: Would get final results for %s", user_id)
                 return None
             
-            worksheet = self.spreadsheet.worksheet("Final_Results")
+            worksheet = self._worksheet("Final_Results")
             all_data = worksheet.get_all_values()
             
             if not all_data:
@@ -550,7 +887,7 @@ class SheetsService:
             # Find the user's data
             user_data_start = None
             for i, row in enumerate(all_data):
-                if row and user_id in str(row[0]):
+                if row and self._matches_user_cell(row[0], user_id):
                     user_data_start = i
                     break
             
@@ -584,5 +921,5 @@ class SheetsService:
             }
             
         except Exception as e:
-            print(f"Error getting final results: {e}")
+            logger.error("Error getting final results: %s", e)
             return None
@@ -0,0 +1,160 @@
+"""
+Team-Fit Scoring
+Scores how well candidates complement existing teams. Each team member's
+ranking vector is turned into per-trait strengths (rank 1 is 1.0, fading
+linearly to 0 past COVERAGE_DEPTH), and a team covers a trait as strongly as
+its strongest member does. A candidate's fit is the coverage they would add,
+with traits in the team's weaker CLIFTON_STRENGTHS domains counting more.
+
+Everything is computed with NumPy over (teams x candidates x 34) blocks, a
+chunk of candidates at a time, keeping a running top-K per team, so one call
+can score many teams against the whole candidate pool.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .logging_service import get_logger
+from .trait_ranking_service import TraitRanking, trait_registry
+
+logger = get_logger(__name__)
+
+# Ranks that still count towards covering a trait (Gallup reports the top 10 as the dominant themes)
+COVERAGE_DEPTH = 10
+
+# Upper bound on teams x candidates x traits cells evaluated per step (~16MB of float32)
+MAX_BLOCK_CELLS = 4_000_000
+
+# Traits reported as the main gaps a hire fills
+FILLED_TRAITS = 3
+
+
+class TeamFitUnavailable(Exception):
+    """Raised when team-fit scoring is requested but NumPy is not installed"""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise TeamFitUnavailable("Team-fit scoring requires the numpy package")
+    return numpy
+
+
+class TeamFitService:
+    """Vectorized complementarity of candidates against team rosters"""
+
+    def __init__(self, analytics_service=None):
+        # Finalized candidates, used when profiles are given by user id only
+        self.analytics_service = analytics_service
+
+    def resolve(self, profiles: Sequence[Tuple[Optional[str], Optional[Dict[str, int]]]]) -> List[Tuple[Optional[str], bytes]]:
+        """(user id, rankings) pairs as compact rankings; rankings omitted are looked up among finalized candidates"""
+        members = self.analytics_service.aggregates.members if self.analytics_service else {}
+        resolved = []
+        for user_id, trait_rankings in profiles:
+            if trait_rankings is not None:
+                resolved.append((user_id, TraitRanking.coerce(trait_rankings).to_bytes()))
+            elif user_id in members:
+                resolved.append((user_id, members[user_id]))
+            else:
+                raise KeyError(user_id)
+        return resolved
+
+    def finalized_candidates(self) -> List[Tuple[str, bytes]]:
+        """Every finalized candidate known to cohort analytics"""
+        if self.analytics_service is None:
+            return []
+        return list(self.analytics_service.aggregates.members.items())
+
+    def score(self, teams: List[Tuple[str, List[Tuple[Optional[str], bytes]]]],
+              candidates: List[Tuple[Optional[str], bytes]],
+              top_k: int = 5) -> Dict[str, Any]:
+        """Best top_k complementary hires for each team"""
+        np = _numpy()
+        size = trait_registry.size
+        domains = list(trait_registry.domain_masks)
+        # (34, domains) membership, and per-trait domain index
+        domain_members = np.array([[domain_of == domain for domain in domains]
+                                   for domain_of in trait_registry.domain_of], dtype=np.float32)
+        domain_sizes = domain_members.sum(axis=0)
+        trait_domain = domain_members.argmax(axis=1)
+
+        coverage = np.zeros((len(teams), size), dtype=np.float32)
+        for t, (_, members) in enumerate(teams):
+            if members:
+                coverage[t] = self._strengths(np, [ranking for _, ranking in members]).max(axis=0)
+        domain_coverage = coverage @ domain_members / domain_sizes
+        # Traits in weaker domains count up to twice as much
+        weights = 2.0 - domain_coverage[:, trait_domain]
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        # Anonymous candidates are reported by their position in the request
+        candidate_ids = [user_id or f"#{index + 1}" for index, (user_id, _) in enumerate(candidates)]
+        strengths = self._strengths(np, [ranking for _, ranking in candidates])
+        # Candidates already on a team are not proposed to it
+        candidate_index = {user_id: index for index, (user_id, _) in enumerate(candidates) if user_id}
+        on_team = np.array([(t, candidate_index[user_id]) for t, (_, members) in enumerate(teams)
+                            for user_id, _ in members if user_id in candidate_index], dtype=np.int64).reshape(-1, 2)
+
+        top_k = max(1, min(top_k, len(candidates)))
+        best_scores = np.full((len(teams), 0), -np.inf, dtype=np.float32)
+        best_index = np.zeros((len(teams), 0), dtype=np.int64)
+        chunk = max(1, MAX_BLOCK_CELLS // (max(1, len(teams)) * size))
+        for start in range(0, len(candidates), chunk):
+            block = strengths[start:start + chunk]
+            # Coverage added per team, candidate and trait: max(0, candidate strength - team coverage)
+            added = np.maximum(block[None, :, :] - coverage[:, None, :], 0)
+            scores = np.einsum("tnk,tk->tn", added, weights)
+            excluded = on_team[(on_team[:, 1] >= start) & (on_team[:, 1] < start + block.shape[0])]
+            scores[excluded[:, 0], excluded[:, 1] - start] = -np.inf
+
+            # Merge the block into the running top-K
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_index = np.concatenate([best_index, np.broadcast_to(
+                np.arange(start, start + block.shape[0]), (len(teams), block.shape[0]))], axis=1)
+            if best_scores.shape[1] > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1, axis=1)[:, :top_k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_index = np.take_along_axis(best_index, keep, axis=1)
+
+        results = []
+        for t, (team_id, members) in enumerate(teams):
+            order = np.argsort(-best_scores[t], kind="stable")
+            hires = []
+            for position in order:
+                if not np.isfinite(best_scores[t, position]):
+                    continue
+                index = int(best_index[t, position])
+                after = np.maximum(coverage[t], strengths[index])
+                filled = np.argsort(coverage[t] - after, kind="stable")[:FILLED_TRAITS]
+                hires.append({
+                    "userId": candidate_ids[index],
+                    "fitScore": round(float(best_scores[t, position]) * 100, 2),
+                    "coverage": round(float(after.mean()) * 100, 2),
+                    "domainCoverage": self._by_domain(domains, after @ domain_members / domain_sizes),
+                    "traitsFilled": [trait_registry.names[slot] for slot in filled if after[slot] > coverage[t, slot]]
+                })
+            results.append({
+                "teamId": team_id,
+                "members": len(members),
+                "coverage": round(float(coverage[t].mean()) * 100, 2),
+                "domainCoverage": self._by_domain(domains, domain_coverage[t]),
+                "gaps": [trait_registry.names[slot] for slot in np.flatnonzero(coverage[t] == 0)],
+                "hires": hires
+            })
+
+        logger.info("Scored %s candidates against %s teams", len(candidates), len(teams))
+        return {"topK": top_k, "coverageDepth": COVERAGE_DEPTH, "candidates": len(candidates), "teams": results}
+
+    @staticmethod
+    def _strengths(np, rankings: List[bytes]):
+        """(n, 34) float32 strengths: 1.0 at rank 1, fading linearly to 0 after COVERAGE_DEPTH"""
+        if not rankings:
+            return np.zeros((0, trait_registry.size), dtype=np.float32)
+        ranks = np.frombuffer(b"".join(rankings), dtype=np.int8).reshape(len(rankings), -1).astype(np.float32)
+        strengths = (COVERAGE_DEPTH + 1 - ranks) / COVERAGE_DEPTH
+        return np.where(ranks > 0, np.clip(strengths, 0, 1), 0).astype(np.float32)
+
+    @staticmethod
+    def _by_domain(domains: List[str], values) -> Dict[str, float]:
+        return {domain: round(float(value) * 100, 2) for domain, value in zip(domains, values)}
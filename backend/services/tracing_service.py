@@ -0,0 +1,252 @@
+"""
+Lightweight Request Tracing
+A trace id and the current span are carried in contextvars, so timings from
+AssessmentService, SheetsService and NvidiaAIService (including work run in
+asyncio.to_thread) nest under the request that caused them. Finished traces
+can be exported as OTLP/JSON to stdout or a local file, and summarised in a
+Server-Timing header.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from .logging_service import get_logger
+
+logger = get_logger(__name__)
+
+# "none" (default), "stdout" or "file"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "hiring-system-api")
+
+# Server-Timing entries per response, largest first
+SERVER_TIMING_MAX_ENTRIES = 12
+
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any] = None):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    """All spans recorded while handling one request"""
+
+    def __init__(self, name: str, trace_id: str = None, parent_span_id: str = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+        self.root = Span(name, parent_span_id)
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def server_timing(self) -> str:
+        """Summarise spans as a Server-Timing header value (durations summed per span name)"""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                entry = totals.setdefault(span.name, [0.0, 0])
+                entry[0] += span.duration_ms
+                entry[1] += 1
+
+        largest = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:SERVER_TIMING_MAX_ENTRIES]
+        parts = [
+            f'{_timing_token(name)};dur={duration:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+            for name, (duration, count) in largest
+        ]
+        parts.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(parts)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Render the trace as an OTLP/JSON ExportTraceServiceRequest"""
+        with self._lock:
+            spans = [self.root] + list(self.spans)
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "hiring.tracing"},
+                    "spans": [self._otlp_span(span) for span in spans]
+                }]
+            }]
+        }
+
+    def _otlp_span(self, span: Span) -> Dict[str, Any]:
+        otlp_span = {
+            "traceId": self.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 2 if span is self.root else 1,  # SERVER / INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        return otlp_span
+
+
+def _timing_token(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.\-]", "_", name)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class _TraceExporter:
+    """Writes finished traces as OTLP/JSON lines from a background thread"""
+
+    def __init__(self, target: str, path: str):
+        self._queue = queue.SimpleQueue()
+        self._stream = sys.stdout if target == "stdout" else open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def export(self, trace: Trace):
+        self._queue.put(trace)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                break
+            try:
+                self._stream.write(json.dumps(trace.to_otlp(), separators=(",", ":")) + "\n")
+                self._stream.flush()
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+
+_exporter: Optional[_TraceExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter() -> Optional[_TraceExporter]:
+    global _exporter
+    if TRACE_EXPORTER not in ("stdout", "file"):
+        return None
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _TraceExporter(TRACE_EXPORTER, TRACE_EXPORT_PATH)
+    return _exporter
+
+
+def start_trace(name: str, traceparent: str = None) -> Trace:
+    """Start a trace for the current context, continuing a W3C traceparent if one is given"""
+    trace_id = parent_span_id = None
+    if traceparent:
+        match = _TRACEPARENT.match(traceparent.strip().lower())
+        if match:
+            trace_id, parent_span_id = match.groups()
+
+    trace = Trace(name, trace_id, parent_span_id)
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    return trace
+
+
+def end_trace(trace: Trace, **attributes):
+    """Close the root span and hand the trace to the exporter, if one is configured"""
+    trace.root.end_ns = time.time_ns()
+    trace.root.attributes.update(attributes)
+
+    exporter = _get_exporter()
+    if exporter:
+        exporter.export(trace)
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the request being handled, if any"""
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span; a no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def traced(name: str = None):
+    """Decorator that records a span named after the method (e.g. "SheetsService.get_user_name")"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
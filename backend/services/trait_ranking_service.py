@@ -0,0 +1,203 @@
+"""
+Trait Registry and Compact Trait Rankings
+The registry fixes an index for each of the 34 CliftonStrengths, plus a
+bitmask of the trait indices in each domain. TraitRanking stores a profile as
+one signed byte per trait (its rank, 0 = unranked) and is a read-only
+Mapping[str, int], so it can be passed anywhere a {trait: rank} dict is read.
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .ai_prompts_service import CLIFTON_STRENGTHS
+
+# Ranks are stored as signed bytes
+MAX_RANK = 127
+
+
+class TraitRegistry:
+    """Fixed trait <-> index table with per-domain bitmasks"""
+
+    __slots__ = ("names", "index", "domain_of", "domain_masks", "size")
+
+    def __init__(self, strengths_by_domain: Dict[str, List[str]]):
+        names = []
+        domain_of = []
+        domain_masks = {}
+        for domain, traits in strengths_by_domain.items():
+            mask = 0
+            for trait in traits:
+                mask |= 1 << len(names)
+                names.append(trait)
+                domain_of.append(domain)
+            domain_masks[domain] = mask
+
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: slot for slot, name in enumerate(names)}
+        self.domain_of: Tuple[str, ...] = tuple(domain_of)
+        self.domain_masks: Dict[str, int] = domain_masks
+        self.size = len(names)
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitmask of the given trait names (unknown names are ignored)"""
+        mask = 0
+        for name in names:
+            slot = self.index.get(name)
+            if slot is not None:
+                mask |= 1 << slot
+        return mask
+
+
+trait_registry = TraitRegistry(CLIFTON_STRENGTHS)
+
+# Every slot ranked exactly once
+_ALL_SLOTS_MASK = (1 << trait_registry.size) - 1
+
+
+class TraitRanking(Mapping):
+    """Immutable {trait: rank} profile backed by array('b'); rank 1 is the strongest"""
+
+    __slots__ = ("_ranks", "_order")
+
+    def __init__(self, ranks: array = None):
+        self._ranks = ranks if ranks is not None else array("b", bytes(trait_registry.size))
+        self._order: Optional[Tuple[str, ...]] = None
+
+    # --- Construction --------------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, rankings: Mapping) -> "TraitRanking":
+        """Build from {trait: rank}; unknown traits are dropped and ranks clamped to 1..127"""
+        ranks = array("b", bytes(trait_registry.size))
+        index = trait_registry.index
+        for name, rank in rankings.items():
+            slot = index.get(name)
+            if slot is not None:
+                rank = int(rank)
+                ranks[slot] = rank if 0 < rank <= MAX_RANK else (1 if rank < 1 else MAX_RANK)
+        return cls(ranks)
+
+    @classmethod
+    def coerce(cls, rankings: Mapping) -> "TraitRanking":
+        """Return rankings unchanged if it already is a TraitRanking, else convert it"""
+        return rankings if isinstance(rankings, TraitRanking) else cls.from_dict(rankings)
+
+    @classmethod
+    def from_order(cls, names: Iterable[str]) -> "TraitRanking":
+        """Build from trait names ordered strongest first"""
+        ranks = array("b", bytes(trait_registry.size))
+        index = trait_registry.index
+        rank = 0
+        for name in names:
+            slot = index.get(name)
+            if slot is not None and not ranks[slot]:
+                rank += 1
+                ranks[slot] = rank
+        return cls(ranks)
+
+    @classmethod
+    def from_scores(cls, scores: Mapping) -> "TraitRanking":
+        """Rank traits by ascending score (lower = stronger); ties keep the mapping's order"""
+        return cls.from_order(sorted(scores, key=scores.__getitem__))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TraitRanking":
+        ranks = array("b")
+        ranks.frombytes(data)
+        if len(ranks) != trait_registry.size:
+            raise ValueError(f"Expected {trait_registry.size} bytes, got {len(ranks)}")
+        return cls(ranks)
+
+    # --- Mapping interface ---------------------------------------------------
+
+    def __getitem__(self, name: str) -> int:
+        slot = trait_registry.index.get(name)
+        if slot is None or not self._ranks[slot]:
+            raise KeyError(name)
+        return self._ranks[slot]
+
+    def __contains__(self, name) -> bool:
+        slot = trait_registry.index.get(name)
+        return slot is not None and self._ranks[slot] != 0
+
+    def __iter__(self) -> Iterator[str]:
+        names = trait_registry.names
+        return (names[slot] for slot, rank in enumerate(self._ranks) if rank)
+
+    def __len__(self) -> int:
+        return trait_registry.size - self._ranks.count(0)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TraitRanking):
+            return self._ranks == other._ranks
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TraitRanking({', '.join(f'{name}={self[name]}' for name in self.order())})"
+
+    # --- Queries -------------------------------------------------------------
+
+    def rank(self, name: str) -> Optional[int]:
+        """O(1) rank lookup; None if the trait is unknown or unranked"""
+        slot = trait_registry.index.get(name)
+        if slot is None:
+            return None
+        return self._ranks[slot] or None
+
+    def order(self) -> Tuple[str, ...]:
+        """Ranked traits strongest first (computed once, ties in registry order)"""
+        if self._order is None:
+            ranks = self._ranks
+            # Unranked slots (0) sort first; stable sort keeps ties in registry order
+            slots = sorted(range(len(ranks)), key=ranks.__getitem__)[ranks.count(0):]
+            self._order = tuple(map(trait_registry.names.__getitem__, slots))
+        return self._order
+
+    def ranked_items(self) -> List[Tuple[str, int]]:
+        """(trait, rank) pairs strongest first"""
+        ranks = self._ranks
+        index = trait_registry.index
+        return [(name, ranks[index[name]]) for name in self.order()]
+
+    def top(self, k: int) -> List[str]:
+        """The k strongest traits"""
+        return list(self.order()[:k])
+
+    def top_mask(self, k: int) -> int:
+        """Registry bitmask of the k strongest traits"""
+        return trait_registry.mask(self.order()[:k])
+
+    def domain_counts(self, k: int = None) -> Dict[str, int]:
+        """How many of the k strongest traits (default: all ranked) fall in each domain"""
+        mask = self.top_mask(k if k is not None else trait_registry.size)
+        return {domain: bin(mask & domain_mask).count("1")
+                for domain, domain_mask in trait_registry.domain_masks.items()}
+
+    def is_complete(self) -> bool:
+        """Every trait ranked, with ranks exactly 1..34"""
+        seen = 0
+        for rank in self._ranks:
+            if not 1 <= rank <= trait_registry.size:
+                return False
+            seen |= 1 << (rank - 1)
+        return seen == _ALL_SLOTS_MASK
+
+    # --- Conversion ----------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, int]:
+        names = trait_registry.names
+        return {names[slot]: rank for slot, rank in enumerate(self._ranks) if rank}
+
+    def to_bytes(self) -> bytes:
+        return self._ranks.tobytes()
+
+    def as_numpy(self):
+        """Zero-copy, read-only int8 NumPy view of the ranks, indexed by registry slot (requires numpy)"""
+        import numpy
+        view = numpy.frombuffer(self._ranks, dtype=numpy.int8)
+        # Rankings are immutable (and cache their order), so the view must not write through
+        view.flags.writeable = False
+        return view
@@ -49,15 +49,12 @@ function FinalSummary() {
     try {
       setLoading(true);
       
-      // Load final summary and results
-      const [summaryData, resultsData] = await Promise.all([
-        apiService.getFinalSummary(state.userInfo.userId),
-        apiService.getFinalResults(state.userInfo.userId),
-      ]);
-      
-      setFinalSummary(summaryData.summary);
-      setFinalResults(resultsData);
-      actions.setSummary('final', summaryData.summary);
+      // Summary and results arrive together; the backend commits results if that step was missed
+      const report = await apiService.getFinalReport(state.userInfo.userId);
+
+      setFinalSummary(report.summary);
+      setFinalResults(report.results);
+      actions.setSummary('final', report.summary);
     } catch (error) {
       console.error('Error loading final results:', error);
       setError('Failed to load your final results. Please try again.');
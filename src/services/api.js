@@ -31,6 +31,28 @@ api.interceptors.response.use(
   }
 );
 
+// Long-running calls are queued server-side (202 + job id) and polled until done,
+// so a slow LLM step never holds a request open past the proxy timeout
+const ASYNC_HEADERS = { Prefer: 'respond-async' };
+const JOB_LONG_POLL_SECONDS = 20;
+
+const waitForJob = async (response) => {
+  if (response.status !== 202) {
+    return response.data;
+  }
+
+  let job = response.data;
+  while (job.status === 'queued' || job.status === 'running') {
+    const { data } = await api.get(`/jobs/${job.jobId}`, { params: { wait: JOB_LONG_POLL_SECONDS } });
+    job = data;
+  }
+
+  if (job.status === 'failed') {
+    throw new Error(job.error || 'Background job failed');
+  }
+  return job.result;
+};
+
 // API endpoints
 export const apiService = {
   // User management
@@ -46,33 +68,33 @@ export const apiService = {
   },
 
   getFollowUpQuestions: async (userId, round) => {
-    const response = await api.post(`/questions/follow-up/${round}`, { userId });
-    return response.data;
+    const response = await api.post(`/questions/follow-up/${round}`, { userId }, { headers: ASYNC_HEADERS });
+    return waitForJob(response);
   },
 
   // Responses
   submitInitialResponses: async (userId, responses) => {
-    const response = await api.post('/responses/initial', { userId, responses });
-    return response.data;
+    const response = await api.post('/responses/initial', { userId, responses }, { headers: ASYNC_HEADERS });
+    return waitForJob(response);
   },
 
   submitFollowUpResponses: async (userId, responses, round) => {
     const response = await api.post(`/responses/follow-up/${round}`, { 
       userId, 
       responses 
-    });
-    return response.data;
+    }, { headers: ASYNC_HEADERS });
+    return waitForJob(response);
   },
 
   // Summaries
   getInitialSummary: async (userId) => {
-    const response = await api.get(`/summary/initial/${userId}`);
-    return response.data;
+    const response = await api.get(`/summary/initial/${userId}`, { headers: ASYNC_HEADERS });
+    return waitForJob(response);
   },
 
   getFollowUpSummary: async (userId, round) => {
-    const response = await api.get(`/summary/follow-up/${userId}/${round}`);
-    return response.data;
+    const response = await api.get(`/summary/follow-up/${userId}/${round}`, { headers: ASYNC_HEADERS });
+    return waitForJob(response);
   },
 
   getFinalSummary: async (userId) => {
@@ -86,6 +108,17 @@ export const apiService = {
     return response.data;
   },
 
+  finalizeResults: async (userId) => {
+    const response = await api.post(`/results/${userId}/finalize`);
+    return response.data;
+  },
+
+  // Final summary, results and profile in a single request
+  getFinalReport: async (userId) => {
+    const response = await api.get(`/report/${userId}`);
+    return response.data;
+  },
+
   // Health check
   healthCheck: async () => {
     const response = await api.get('/health');